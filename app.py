@@ -2,6 +2,7 @@ import streamlit as st
 from streamlit_navigation_bar import st_navbar
 from streamlit_extras.bottom_container import bottom
 from pathlib import Path
+from src.components.assets import read_text
 
 st.set_page_config(
     layout="wide",
@@ -10,8 +11,7 @@ st.set_page_config(
 
 BASE_DIR = Path(__file__).parent
 
-with open(BASE_DIR / "assets" / "style.css") as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+st.markdown(f'<style>{read_text(BASE_DIR / "assets" / "style.css")}</style>', unsafe_allow_html=True)
 
 ALL_PAGES = [
     st.Page(
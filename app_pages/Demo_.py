@@ -2,6 +2,9 @@ import streamlit as st
 from src.components.sections import show_header, show_search_results, show_ebay_search_form, show_cart
 from src.components.chatbot import show_chatbot
 from src.components.footer import streamlit_footer
+from src.components.profiling import begin_rerun, show_timings_panel
+
+begin_rerun()
 
 st.header("Input Your Criteria")
 with st.expander("Use our simple form to specify product requirements, budget, and delivery preferences.", expanded=True):
@@ -32,4 +35,6 @@ show_header(
     "Track communications and negotiation progress in the real-time dashboard, then finalize deals with ease."
 )
 
+show_timings_panel()
+
 streamlit_footer()
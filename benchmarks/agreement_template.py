@@ -0,0 +1,173 @@
+"""
+Agreement filling: per-call BeautifulSoup rewrite vs the compiled template.
+
+Run from the repository root:
+
+    python benchmarks/agreement_template.py [--repeat 20]
+
+Fills the Word export Supply_Agreement_Arial.html for orders of 1, 10 and
+100 line items with the BeautifulSoup implementation fill_agreement_template
+used before the template was compiled (kept below), and with the compiled
+Jinja2 template. Both read the export itself (read_template_source), so the
+speedup compares the two fill paths on the same input. Reports the one-off
+compile cost, mean fill time of each path, and checks that both produce the
+same document text.
+
+The last column fills the normalized build that the app now loads
+(read_agreement_template, see scripts/build_agreement_template.py), for
+reference; it is not part of the speedup.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from markupsafe import Markup
+
+from src.components.agreement_template import agreement_context, agreement_stylesheet, compile_agreement_template
+from src.components.conf_variables import ROOT_DIR
+from src.components.document_viewer import read_agreement_template, read_template_source
+
+TEMPLATE_PATH = ROOT_DIR / "assets" / "document_to_edit" / "Supply_Agreement_Arial.html"
+SIZES = (1, 10, 100)
+ADDRESS = "Germany, Berlin"
+
+
+def legacy_fill_agreement_template(html_content, seller_info):
+    """fill_agreement_template before the template was compiled, without logging."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    for element in soup.find_all(string=True):
+        if '[DATE]' in str(element):
+            element.replace_with(str(element).replace('[DATE]', current_date))
+        elif '[SUPPLIER NAME]' in str(element):
+            element.replace_with(str(element).replace('[SUPPLIER NAME]', seller_info.get('seller', 'Unknown Seller')))
+        elif '[SUPPLIER ADDRESS]' in str(element):
+            element.replace_with(str(element).replace('[SUPPLIER ADDRESS]', ADDRESS))
+        elif '[CUSTOMER NAME]' in str(element):
+            element.replace_with(str(element).replace('[CUSTOMER NAME]', "AMPA Procurement"))
+        elif '[CUSTOMER ADDRESS]' in str(element):
+            element.replace_with(str(element).replace('[CUSTOMER ADDRESS]', "Dubai, United Arab Emirates"))
+
+    seller_items = seller_info.get('items', []) or [seller_info]
+    total_price = sum(float(item.get('price', 0)) * 3.65 for item in seller_items)
+
+    ordered_list = soup.find('ol')
+    if ordered_list:
+        for item in ordered_list.find_all('li'):
+            item.decompose()
+        for item in seller_items:
+            product_price = float(item.get('price', 0)) * 3.65
+            product_description = (
+                f"{item.get('title', 'Unknown Product')} - {item.get('condition', 'Not specified')} - AED {product_price:.2f}"
+            )
+            new_li = soup.new_tag('li')
+            new_li['class'] = 'MsoNormal'
+            new_li['style'] = 'mso-margin-top-alt:auto;mso-margin-bottom-alt:auto;mso-list:l4 level1 lfo3;tab-stops:list 36.0pt'
+            span = soup.new_tag('span')
+            span['lang'] = 'EN-US'
+            span['style'] = 'font-size:12.0pt;font-family:"Calibri",sans-serif;mso-fareast-font-family:"MS PGothic"'
+            span.string = product_description
+            new_li.append(span)
+            ordered_list.append(new_li)
+
+    price_heading = soup.find('strong', string=lambda text: text and 'PRICE' in text)
+    if price_heading:
+        price_section = price_heading.find_parent('p')
+        if price_section:
+            price_desc_para = price_section.find_next_sibling('p')
+            if price_desc_para:
+                price_display = soup.new_tag('p')
+                price_display['style'] = 'font-size: 18pt; font-weight: bold; text-align: center; color: #000000; margin: 20px 0;'
+                price_label = "Total Agreed Price" if len(seller_items) > 1 else "Agreed Price"
+                price_display.string = f"{price_label}: AED {total_price:.2f}"
+                price_desc_para.insert_after(price_display)
+
+    for section in soup.find_all('td'):
+        if section.find(string=lambda text: text and 'SUPPLIER' in text):
+            signatory = seller_info.get('seller', 'Unknown Seller')
+        elif section.find(string=lambda text: text and 'CUSTOMER' in text):
+            signatory = "AMPA Procurement Representative"
+        else:
+            continue
+        name_field = section.find('u')
+        if name_field:
+            name_field.string = signatory
+        for field in section.find_all('p'):
+            if field.get_text() and 'Date' in field.get_text():
+                field.string = f"Date: {current_date}"
+
+    return str(soup)
+
+
+def compiled_fill(html_content, seller_info):
+    template = compile_agreement_template(html_content)
+    context = agreement_context(seller_info, supplier_address=ADDRESS)
+    context["styles"] = Markup(f"<style>{agreement_stylesheet(html_content)}</style>")
+    return template.render(context)
+
+
+def make_order(count, rng):
+    return {
+        "seller": "tech_outlet & co <uk>",
+        "items": [
+            {
+                "title": f"Refurbished Laptop #{i}",
+                "price": f"{rng.uniform(40, 1200):.2f}",
+                "condition": rng.choice(("New", "Used", "Certified - Refurbished")),
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def document_text(html):
+    return " ".join(BeautifulSoup(html, "html.parser").get_text().split())
+
+
+def mean_ms(fill, html_content, order, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fill(html_content, order)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agreement template fill benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    html_content = read_template_source(TEMPLATE_PATH)
+    built_content = read_agreement_template(TEMPLATE_PATH)
+    start = time.perf_counter()
+    compile_agreement_template(html_content)
+    print(f"template: {len(html_content):,} chars, compiled once in {(time.perf_counter() - start) * 1000:.1f} ms")
+    if built_content != html_content:
+        compile_agreement_template(built_content)
+        print(f"built template: {len(built_content):,} chars")
+
+    print(f"{'items':>5} | {'legacy ms':>9} | {'compiled ms':>11} | {'speedup':>7} | same text | {'built ms':>8}")
+    for size in SIZES:
+        order = make_order(size, rng)
+        legacy_ms = mean_ms(legacy_fill_agreement_template, html_content, order, args.repeat)
+        compiled_ms = mean_ms(compiled_fill, html_content, order, args.repeat)
+        built_ms = mean_ms(compiled_fill, built_content, order, args.repeat)
+        same = document_text(legacy_fill_agreement_template(html_content, order)) == document_text(compiled_fill(html_content, order))
+        print(
+            f"{size:>5} | {legacy_ms:>9.2f} | {compiled_ms:>11.3f} | {legacy_ms / compiled_ms:>6.0f}x | "
+            f"{str(same):>9} | {built_ms:>8.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+End-to-end chat latency and throughput under N concurrent sessions.
+
+Run from the repository root:
+
+    python benchmarks/chat_latency.py [--sessions 20] [--turns 5] [--stream/--no-stream]
+        [--base-url http://127.0.0.1:8808] [--tokens-per-second 400] [--latency 0.2]
+        [--error-rate 0.0] [--tool-call-rate 0.2]
+
+Without --base-url an in-process benchmarks/llm_stub.py server is started
+with the given rate/latency/error settings. Each session is a thread that
+sends `turns` prompts through the shared ChatbotClient from the service
+container (same connection pool, tool executor and packing as the app),
+so the numbers include context packing, pool waits, tool calls and the
+SDK's retries of injected errors. The completion cache is disabled so
+every turn reaches the server.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.llm_stub import StubConfig, serve_in_thread
+from src.components.conf_variables import CHAT_MAX_RESPONSE_TOKENS
+
+PROMPTS = [
+    "Which of these laptops is cheapest?",
+    "Compare the top three suppliers and rank them gold, silver and bronze",
+    "What does the seller of the ThinkPad say about shipping?",
+    "Help me negotiate a volume discount with the best rated seller",
+    "Summarize the reviews for refurbished items under $300",
+]
+
+
+def run_session(session_id: int, turns: int, stream: bool) -> List[Dict[str, Any]]:
+    from src.components.chatbot import SYSTEM_PROMPT
+    from src.components.context_packer import pack_context
+    from src.components.conversation import ConversationLog
+    from src.components.model_router import route_prompt
+    from src.components.services import get_services
+
+    chatbot = get_services().chatbot
+    history = ConversationLog()
+    results = []
+    for turn in range(turns):
+        prompt = f"[session {session_id} turn {turn}] {PROMPTS[(session_id + turn) % len(PROMPTS)]}"
+        history.append({"role": "user", "content": prompt})
+        route = route_prompt(prompt)
+        packed = pack_context(history, SYSTEM_PROMPT, budget=chatbot.context_budget(route.model, CHAT_MAX_RESPONSE_TOKENS))
+
+        start = time.perf_counter()
+        first_token = None
+        try:
+            if stream:
+                parts = []
+                for part in chatbot.stream_messages(packed.messages, model=route.model, max_tokens=CHAT_MAX_RESPONSE_TOKENS):
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    parts.append(part)
+                response = "".join(parts)
+            else:
+                response = chatbot.send_messages(packed.messages, model=route.model, max_tokens=CHAT_MAX_RESPONSE_TOKENS)
+                first_token = time.perf_counter() - start
+            elapsed = time.perf_counter() - start
+            history.append({"role": "assistant", "content": response})
+            results.append({"ok": True, "ttft": first_token, "total": elapsed, "model": route.model})
+        except Exception as e:
+            results.append({"ok": False, "error": type(e).__name__, "total": time.perf_counter() - start})
+    return results
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return f"p50 {p50:7.1f} ms | p95 {p95:7.1f} ms | p99 {p99:7.1f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chat latency benchmark")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--base-url", default=None, help="Use a running server instead of an in-process stub")
+    parser.add_argument("--tokens-per-second", type=float, default=StubConfig.tokens_per_second)
+    parser.add_argument("--latency", type=float, default=StubConfig.latency)
+    parser.add_argument("--error-rate", type=float, default=StubConfig.error_rate)
+    parser.add_argument("--tool-call-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = serve_in_thread(
+            StubConfig(
+                tokens_per_second=args.tokens_per_second,
+                latency=args.latency,
+                error_rate=args.error_rate,
+                tool_call_rate=args.tool_call_rate,
+                seed=0,
+            )
+        )
+    os.environ["CEREBRAS_BASE_URL"] = base_url
+    os.environ.setdefault("CEREBRAS_API_KEY", "stub")
+
+    from src.components.services import get_services
+
+    services = get_services()
+    services.chatbot.cache = None
+
+    print(f"Server: {base_url}")
+    print(f"Sessions: {args.sessions}, turns per session: {args.turns}, streaming: {args.stream}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        futures = [executor.submit(run_session, i, args.turns, args.stream) for i in range(args.sessions)]
+        results = [result for future in futures for result in future.result()]
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+    print(f"Turns: {len(results)} ({len(failed)} failed) in {wall:.2f}s -> {len(ok) / wall:.1f} turns/s")
+    print(f"Time to first token:  {percentiles([r['ttft'] for r in ok if r['ttft'] is not None])}")
+    print(f"Time to full answer:  {percentiles([r['total'] for r in ok])}")
+    for row in services.model_stats.stats():
+        print(
+            f"  {row['model']:<14} {row['requests']:>4} requests | p50 {row['p50_ms']:7.1f} ms | "
+            f"p95 {row['p95_ms']:7.1f} ms | {row['tokens_per_s']:.0f} tokens/s"
+        )
+    print(f"LLM pool: {services.pool_utilization()['llm']}")
+    if failed:
+        errors: Dict[str, int] = {}
+        for r in failed:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+        print(f"Errors: {errors}")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Request-building benchmark: deep-copied list history vs ConversationLog.
+
+Run from the repository root:
+
+    python benchmarks/conversation_log.py [turns]
+
+Builds a conversation of `turns` user/assistant exchanges where every user
+turn pastes a large result listing, then times the parts of building one
+outgoing request separately, with the peak memory allocated while doing it:
+
+    deepcopy only           what show_chatbot used to pay to copy the history
+    pack list               pack_context over a plain list, which counts the
+                            tokens of every message on every request
+    pack ConversationLog    pack_context over the log, which reuses the token
+                            counts cached when each message was appended
+
+It then times packing the log at a quarter, half and all of `turns`, to
+show that the cost does not grow with the length of the history.
+"""
+import copy
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.chatbot import SYSTEM_PROMPT
+from src.components.context_packer import pack_context
+from src.components.conversation import ConversationLog
+
+BUDGET = 8192 - 2048
+REPEATS = 20
+PASTED_RESULTS = "\n".join(
+    f"Refurbished laptop {i}|{199 + i}.99|Used|seller_{i}|['Great value for the money.', 'Fast shipping.']|4"
+    for i in range(150)
+)
+
+
+def build_history(turns: int):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question {i}: compare these\n{PASTED_RESULTS}"})
+        messages.append({"role": "assistant", "content": f"Answer {i}: " + "The best option is X. " * 40})
+    messages.append({"role": "user", "content": "Rank these by price and rating"})
+    return messages
+
+
+def measure(build_request):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        build_request()
+    elapsed = (time.perf_counter() - start) / REPEATS
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    messages = build_history(turns)
+    log = ConversationLog(messages)
+
+    copy_ms, copy_mb = measure(lambda: copy.deepcopy(messages))
+    list_ms, list_mb = measure(lambda: pack_context(messages, SYSTEM_PROMPT, BUDGET))
+    log_ms, log_mb = measure(lambda: pack_context(log, SYSTEM_PROMPT, BUDGET))
+
+    print(f"{turns} turns, {len(messages)} messages, {log.total_tokens:,} history tokens")
+    print(f"deepcopy only:          {copy_ms:8.3f} ms/request, peak {copy_mb:7.2f} MiB")
+    print(f"pack list:              {list_ms:8.3f} ms/request, peak {list_mb:7.2f} MiB")
+    print(f"pack ConversationLog:   {log_ms:8.3f} ms/request, peak {log_mb:7.2f} MiB")
+    print(f"old request (deepcopy + pack list) vs pack ConversationLog: {(copy_ms + list_ms) / log_ms:.0f}x")
+
+    print("pack ConversationLog by history length:")
+    for count in sorted({max(1, turns // 4), max(1, turns // 2), turns}):
+        shorter = ConversationLog(build_history(count))
+        ms, mb = measure(lambda: pack_context(shorter, SYSTEM_PROMPT, BUDGET))
+        print(f"  {count:>5} turns:          {ms:8.3f} ms/request, peak {mb:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Import-time and cold-start benchmark for the Demo page.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py
+
+Measures the cumulative `-X importtime` cost of the modules imported by
+`app_pages/Demo_.py`, checks that the PDF/LLM stack is not pulled in at
+import, and times the first full script run of the page (time-to-first-paint)
+in a fresh interpreter using Streamlit's AppTest harness.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+DEMO_IMPORTS = [
+    "src.components.sections",
+    "src.components.chatbot",
+    "src.components.footer",
+    "src.components.profiling",
+]
+DEFERRED_MODULES = ["weasyprint", "bs4", "chardet", "cerebras"]
+
+# Targets for a cold interpreter on a developer laptop
+IMPORT_TARGET_MS = 1500
+FIRST_PAINT_TARGET_MS = 3000
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+FIRST_PAINT_SCRIPT = """
+import os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, os.getcwd())
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app_pages/Demo_.py", default_timeout=60)
+at.run()
+print(f"{(time.perf_counter() - start) * 1000:.1f}")
+print(",".join(m for m in %r if m in sys.modules))
+""" % (DEFERRED_MODULES,)
+
+
+def measure_imports():
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(DEMO_IMPORTS)],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative_us, indent, module = match.groups()
+        cumulative[module] = int(cumulative_us)
+        # Top-level imports have a single space of indentation
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+    return total_us / 1000, cumulative
+
+
+def measure_first_paint():
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+    env.setdefault("EBAY_CLIENT_ID", "benchmark")
+    env.setdefault("EBAY_CLIENT_SECRET", "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT_SCRIPT],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stdout.strip().splitlines()
+    loaded = [m for m in lines[-1].split(",") if m] if len(lines) > 1 else []
+    return float(lines[-2] if len(lines) > 1 else lines[-1]), loaded
+
+
+def main() -> int:
+    start = time.perf_counter()
+    total_ms, cumulative = measure_imports()
+
+    print(f"Demo page imports: {total_ms:.1f} ms (target {IMPORT_TARGET_MS} ms)")
+    print("Slowest imports (cumulative):")
+    for module, us in sorted(cumulative.items(), key=lambda kv: -kv[1])[:10]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    eager = [m for m in DEFERRED_MODULES if m in cumulative]
+    print(f"Deferred modules imported eagerly: {', '.join(eager) or 'none'}")
+
+    first_paint_ms, loaded = measure_first_paint()
+    print(f"Demo page time-to-first-paint: {first_paint_ms:.1f} ms (target {FIRST_PAINT_TARGET_MS} ms)")
+    print(f"Deferred modules loaded by first paint: {', '.join(loaded) or 'none'}")
+    print(f"Benchmark wall time: {time.perf_counter() - start:.1f} s")
+
+    failed = eager or total_ms > IMPORT_TARGET_MS or first_paint_ms > FIRST_PAINT_TARGET_MS
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
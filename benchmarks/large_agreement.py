@@ -0,0 +1,146 @@
+"""
+Memory and time of a very large agreement: one long list vs the paged schedule.
+
+Run from the repository root:
+
+    python benchmarks/large_agreement.py [--items 5000] [--ceiling-mb 512]
+
+"before" fills every line item into the agreement's list, as the app did
+before large-order mode, so WeasyPrint lays out one document with all of
+them. "after" fills the agreement and its schedule of goods in parts of
+SCHEDULE_ROWS_PER_PART rows, as request_agreement_pdf does, and renders them
+with pdf_renderer.RenderContext, which lays out one part at a time.
+
+Reports fill time, the peak Python allocation of filling (tracemalloc)
+and the largest single document WeasyPrint has to lay out. Each render
+runs in a fresh spawned process, like a render pool worker, and reports
+its peak resident memory (ru_maxrss) against --ceiling-mb; the exit status
+is 1 if "after" goes over it. Renders are skipped when WeasyPrint's system
+libraries (Pango) are missing.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.agreement_template import SCHEDULE_STYLESHEET, agreement_stylesheet
+from src.components.conf_variables import AGREEMENT_TEMPLATE_PATH, SCHEDULE_ROWS_PER_PART
+from src.components.document_viewer import fill_agreement_documents, read_agreement_template
+
+DATE = "2025-01-01"
+CONDITIONS = ("New", "Used", "Certified - Refurbished", "Open box")
+
+
+def make_order(count):
+    return {
+        "seller": "tech_outlet",
+        "items": [
+            {
+                "title": f"Refurbished Dell Latitude 7490 14\" Laptop i5 8GB RAM 256GB SSD #{i}",
+                "price": f"{100 + i % 900:.2f}",
+                "condition": CONDITIONS[i % len(CONDITIONS)],
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def single_document(html_content, order):
+    """The agreement with every line item in its list, as filled before large-order mode."""
+    from markupsafe import Markup
+
+    from src.components.agreement_template import agreement_context, compile_agreement_template
+    from src.components.document_viewer import supplier_address
+
+    context = agreement_context(order, supplier_address=supplier_address(order["seller"]), date=DATE)
+    context["line_items"] = [f"{title} - {condition} - AED {price}" for title, condition, price in context["schedule"]]
+    context["styles"] = Markup(f"<style>{agreement_stylesheet(html_content)}</style>")
+    return [compile_agreement_template(html_content).render(context)]
+
+
+def paged_documents(html_content, order):
+    return fill_agreement_documents(html_content, order, date=DATE, shared_styles=True)
+
+
+def measure_fill(fill, html_content, order):
+    fill(html_content, order)
+    tracemalloc.start()
+    start = time.perf_counter()
+    documents = fill(html_content, order)
+    fill_ms = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return documents, fill_ms, peak
+
+
+def render_in_worker(documents, base_url, stylesheets):
+    """Render in this process and report its peak RSS. Runs in a spawned process."""
+    from src.components.pdf_renderer import RenderContext
+
+    context = RenderContext()
+    baseline_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    pdf = context.render(documents[0], base_url, stylesheets, documents[1:])
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return seconds, len(pdf), baseline_mb, peak_mb
+
+
+def measure_render(documents, base_url, stylesheets):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(render_in_worker, documents, base_url, stylesheets).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Large agreement benchmark")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--ceiling-mb", type=float, default=512)
+    parser.add_argument("--skip-before-render", action="store_true", help="only render the paged agreement")
+    args = parser.parse_args()
+
+    base_url = str(AGREEMENT_TEMPLATE_PATH.parent)
+    html_content = read_agreement_template(AGREEMENT_TEMPLATE_PATH)
+    order = make_order(args.items)
+    variants = (
+        ("before", single_document, ()),
+        ("after", paged_documents, (agreement_stylesheet(html_content), SCHEDULE_STYLESHEET)),
+    )
+
+    print(f"{args.items:,} line items, schedule parts of {SCHEDULE_ROWS_PER_PART} rows, ceiling {args.ceiling_mb:.0f} MB")
+    print(f"{'':>6} | {'docs':>4} | {'largest KB':>10} | {'fill ms':>8} | {'fill peak MB':>12}")
+    filled = {}
+    for name, fill, stylesheets in variants:
+        documents, fill_ms, peak = measure_fill(fill, html_content, order)
+        filled[name] = (documents, stylesheets)
+        largest = max(len(document.encode("utf-8")) for document in documents)
+        print(f"{name:>6} | {len(documents):>4} | {largest / 1024:>10.1f} | {fill_ms:>8.1f} | {peak / 1e6:>12.1f}")
+
+    try:
+        import weasyprint  # noqa: F401
+    except OSError as e:
+        print(f"render skipped: {str(e).splitlines()[0]}")
+        return
+
+    print(f"{'':>6} | {'render s':>8} | {'PDF KB':>7} | {'idle MB':>7} | {'peak MB':>7} | within ceiling")
+    within = True
+    for name, (documents, stylesheets) in filled.items():
+        if name == "before" and args.skip_before_render:
+            continue
+        seconds, size, baseline_mb, peak_mb = measure_render(documents, base_url, stylesheets)
+        print(
+            f"{name:>6} | {seconds:>8.1f} | {size / 1024:>7.0f} | {baseline_mb:>7.0f} | {peak_mb:>7.0f} | "
+            f"{'yes' if peak_mb <= args.ceiling_mb else 'no'}"
+        )
+        if name == "after":
+            within = peak_mb <= args.ceiling_mb
+    sys.exit(0 if within else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Context size of search listings: legacy pipe rows vs the compact listing table.
+
+Run from the repository root:
+
+    python benchmarks/listing_codec.py [--seed 0]
+
+Generates 10, 100 and 1,000 listings with EbayAPI.format_item (five
+random review comments each, as in the app) and reports estimated Llama
+tokens (context_packer.count_tokens) and characters for the legacy
+get_data_string format and for listing_codec.encode_listings.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.context_packer import count_tokens
+from src.components.ebay_api import EbayAPI
+from src.components.listing_codec import encode_listings
+
+SIZES = (10, 100, 1000)
+PRODUCTS = (
+    "Dell Latitude 7490 14\" Laptop i5 8GB RAM 256GB SSD",
+    "Lenovo ThinkPad T480 Business Laptop Intel Core i7",
+    "HP LaserJet Pro M404dn Monochrome Duplex Printer",
+    "Herman Miller Aeron Ergonomic Office Chair Size B",
+    "Apple iPhone 12 64GB Unlocked Smartphone",
+)
+CONDITIONS = ("New", "Used", "Certified - Refurbished", "Open box")
+
+
+def legacy_data_string(items):
+    """The pipe-delimited format get_data_string produced before the listing codec."""
+    return "\n".join(
+        f"{item.get('title', 'N/A')}|{item.get('price', '0.00')}|{item.get('condition', 'Unknown')}|"
+        f"{item.get('seller', 'Unknown')}|{item.get('comments', 'Unknown')}|{item.get('rating', 'Unknown')}"
+        for item in items
+    )
+
+
+def make_listings(count, rng):
+    api = EbayAPI.__new__(EbayAPI)
+    listings = []
+    for i in range(count):
+        listings.append(api.format_item({
+            "title": f"{rng.choice(PRODUCTS)} #{i}",
+            "price": {"value": f"{rng.uniform(40, 1200):.2f}"},
+            "condition": rng.choice(CONDITIONS),
+            "seller": {"username": f"seller_{rng.randint(1, 300)}"},
+            "itemWebUrl": f"https://www.ebay.com/itm/{100000 + i}",
+        }))
+    return listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listing context size benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+
+    print(f"{'listings':>8} | {'legacy tokens':>13} | {'compact tokens':>14} | {'saved':>6} | {'legacy chars':>12} | {'compact chars':>13} | {'encode ms':>9}")
+    for size in SIZES:
+        listings = make_listings(size, rng)
+        legacy = legacy_data_string(listings)
+        start = time.perf_counter()
+        compact = encode_listings(listings)
+        encode_ms = (time.perf_counter() - start) * 1000
+        legacy_tokens = count_tokens(legacy)
+        compact_tokens = count_tokens(compact)
+        print(
+            f"{size:>8} | {legacy_tokens:>13,} | {compact_tokens:>14,} | {1 - compact_tokens / legacy_tokens:>6.1%} | "
+            f"{len(legacy):>12,} | {len(compact):>13,} | {encode_ms:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
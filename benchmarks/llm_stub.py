@@ -0,0 +1,263 @@
+"""
+Local OpenAI-compatible stand-in for the Cerebras chat completions API.
+
+Run from the repository root:
+
+    python benchmarks/llm_stub.py [--port 8808] [--tokens-per-second 400]
+        [--latency 0.2] [--error-rate 0.0] [--tool-call-rate 0.0]
+
+then point the app at it:
+
+    CEREBRAS_BASE_URL=http://127.0.0.1:8808 CEREBRAS_API_KEY=stub streamlit run app.py
+
+Serves POST /v1/chat/completions (blocking and SSE streaming, with optional
+fetch_url tool calls), GET/POST /v1/tcp_warming for the SDK's connection
+warm-up, and GET /page/<n> as a small HTML page for the fetch_url tool.
+Responses are canned text generated at the configured token rate after the
+configured first-token latency; a fraction of requests can fail with 500s.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+WORDS = (
+    "Based on the listings, the refurbished ThinkPad from seller_12 offers the best value "
+    "at its price, with strong ratings and fast shipping. The Dell option is cheaper but "
+    "reviews mention slower delivery. I recommend requesting a volume quote before ordering."
+).split()
+
+
+@dataclass
+class StubConfig:
+    tokens_per_second: float = 400.0
+    latency: float = 0.2
+    error_rate: float = 0.0
+    tool_call_rate: float = 0.0
+    response_tokens: int = 120
+    seed: Optional[int] = None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LLMStub/1.0"
+
+    @property
+    def config(self) -> StubConfig:
+        return self.server.config
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep benchmark output readable
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/v1/tcp_warming"):
+            self._send_json(200, {})
+        elif self.path.startswith("/page/"):
+            body = (
+                f"<html><head><title>Supplier page {self.path[6:]}</title></head><body>"
+                "<h1>Acme Industrial Supply</h1><p>MOQ 50 units. Net 30 terms. Ships in 3 days.</p>"
+                "</body></html>"
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self) -> None:
+        if self.path.startswith("/v1/tcp_warming"):
+            self._read_json()
+            self._send_json(200, {})
+            return
+        if not self.path.startswith("/v1/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        request = self._read_json()
+        rng = self.server.rng
+        with self.server.rng_lock:
+            fail = rng.random() < self.config.error_rate
+            call_tool = rng.random() < self.config.tool_call_rate
+        if fail:
+            self._send_json(500, {"error": {"message": "Injected failure", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        call_tool = (
+            call_tool
+            and request.get("tools")
+            and request.get("tool_choice") != "none"
+            and not any(m.get("role") == "tool" for m in messages)
+        )
+        max_tokens = request.get("max_tokens") or self.config.response_tokens
+        tokens = [] if call_tool else self._answer_tokens(min(max_tokens, self.config.response_tokens))
+        tool_calls = [self._tool_call()] if call_tool else []
+        prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in messages)
+
+        time.sleep(self.config.latency)
+        if request.get("stream"):
+            self._stream(request, tokens, tool_calls, prompt_tokens)
+        else:
+            time.sleep(len(tokens) / self.config.tokens_per_second)
+            self._send_json(200, self._completion(request, tokens, tool_calls, prompt_tokens))
+
+    def _answer_tokens(self, count: int) -> List[str]:
+        return [(" " if i else "") + WORDS[i % len(WORDS)] for i in range(count)]
+
+    def _tool_call(self) -> Dict[str, Any]:
+        host, port = self.server.server_address[:2]
+        page = uuid.uuid4().hex[:8]
+        return {
+            "id": f"call_{page}",
+            "type": "function",
+            "function": {"name": "fetch_url", "arguments": json.dumps({"url": f"http://{host}:{port}/page/{page}"})},
+        }
+
+    @staticmethod
+    def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _completion(self, request: Dict[str, Any], tokens: List[str], tool_calls: List[Dict[str, Any]], prompt_tokens: int) -> Dict[str, Any]:
+        message = {"role": "assistant", "content": "".join(tokens) if tokens else None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "system_fingerprint": "llm-stub",
+            "time_info": {},
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}
+            ],
+            "usage": self._usage(prompt_tokens, len(tokens)),
+        }
+
+    def _stream(self, request: Dict[str, Any], tokens: List[str], tool_calls: List[Dict[str, Any]], prompt_tokens: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "system_fingerprint": "llm-stub",
+        }
+
+        def send(delta: Dict[str, Any], finish_reason: Optional[str] = None, usage: Optional[Dict[str, int]] = None) -> None:
+            chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            if usage:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            send({"role": "assistant", "content": ""})
+            for index, call in enumerate(tool_calls):
+                send({"tool_calls": [{"index": index, **call}]})
+            interval = 1 / self.config.tokens_per_second
+            for token in tokens:
+                time.sleep(interval)
+                send({"content": token})
+            send({}, "tool_calls" if tool_calls else "stop", self._usage(prompt_tokens, len(tokens)))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients dropping idle keep-alive connections is expected under load
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None) -> StubServer:
+    """Create (but don't start) a stub server. Port 0 picks a free port."""
+    server = StubServer((host, port), StubHandler)
+    server.config = config or StubConfig()
+    server.rng = random.Random(server.config.seed)
+    server.rng_lock = threading.Lock()
+    return server
+
+
+def serve_in_thread(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> Tuple[StubServer, str]:
+    """
+    Start a stub server on a daemon thread.
+
+    Returns:
+        Tuple[StubServer, str]: The server (call shutdown() when done) and its base URL
+    """
+    server = make_server(host, port, config)
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--tokens-per-second", type=float, default=StubConfig.tokens_per_second)
+    parser.add_argument("--latency", type=float, default=StubConfig.latency, help="Seconds before the first token")
+    parser.add_argument("--error-rate", type=float, default=StubConfig.error_rate, help="Fraction of requests that fail with 500")
+    parser.add_argument("--tool-call-rate", type=float, default=StubConfig.tool_call_rate, help="Fraction of tool-enabled turns that call fetch_url")
+    parser.add_argument("--response-tokens", type=int, default=StubConfig.response_tokens)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        tokens_per_second=args.tokens_per_second,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        tool_call_rate=args.tool_call_rate,
+        response_tokens=args.response_tokens,
+        seed=args.seed,
+    )
+    server = make_server(args.host, args.port, config)
+    print(f"LLM stub listening on http://{args.host}:{server.server_address[1]} ({config})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
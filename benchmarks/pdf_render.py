@@ -0,0 +1,90 @@
+"""
+Per-PDF agreement render time: a fresh WeasyPrint setup per call vs RenderContext.
+
+Run from the repository root (needs WeasyPrint's system libraries, e.g. Pango):
+
+    python benchmarks/pdf_render.py [--renders 10] [--items 10]
+
+"before" renders the self-contained agreement with
+`HTML(string=...).write_pdf()`, as the app did, so every call re-parses the
+template's stylesheet and builds a new FontConfiguration. "after" renders
+the same agreement without its <style> block through one
+pdf_renderer.RenderContext, which keeps the FontConfiguration and the parsed
+stylesheet between renders, as each worker of the render pool does.
+Both run in this process, one render at a time.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.agreement_template import agreement_stylesheet
+from src.components.conf_variables import AGREEMENT_TEMPLATE_PATH
+from src.components.document_viewer import fill_agreement_template, read_agreement_template
+from src.components.pdf_renderer import RenderContext
+
+DATE = "2025-01-01"
+
+
+def make_order(count):
+    return {
+        "seller": "tech_outlet",
+        "items": [
+            {"title": f"Refurbished Laptop #{i}", "price": f"{100 + i:.2f}", "condition": "Used"}
+            for i in range(count)
+        ],
+    }
+
+
+def time_renders(render, renders):
+    samples = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        pdf = render()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, len(pdf)
+
+
+def report(name, samples, size):
+    rest = samples[1:] or samples
+    print(
+        f"{name:>6} | {samples[0]:>8.1f} | {statistics.mean(rest):>8.1f} | "
+        f"{statistics.median(rest):>8.1f} | {size / 1024:>7.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agreement PDF render benchmark")
+    parser.add_argument("--renders", type=int, default=10)
+    parser.add_argument("--items", type=int, default=10)
+    args = parser.parse_args()
+
+    from weasyprint import HTML
+
+    base_url = str(AGREEMENT_TEMPLATE_PATH.parent)
+    html_content = read_agreement_template(AGREEMENT_TEMPLATE_PATH)
+    order = make_order(args.items)
+    full_html = fill_agreement_template(html_content, order, date=DATE)
+    shared_html = fill_agreement_template(html_content, order, date=DATE, shared_styles=True)
+    stylesheets = (agreement_stylesheet(html_content),)
+
+    before, before_size = time_renders(
+        lambda: HTML(string=full_html, base_url=base_url).write_pdf(), args.renders
+    )
+    context = RenderContext()
+    after, after_size = time_renders(
+        lambda: context.render(shared_html, base_url, stylesheets), args.renders
+    )
+
+    print(f"{args.items} line items, {args.renders} renders each")
+    print(f"{'':>6} | {'first ms':>8} | {'mean ms':>8} | {'p50 ms':>8} | {'PDF KB':>7}")
+    report("before", before, before_size)
+    report("after", after, after_size)
+    print(f"mean per-PDF saving after the first render: {1 - statistics.mean(after[1:] or after) / statistics.mean(before[1:] or before):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Build the optimized supply agreement template.
+
+Run from the repository root whenever Supply_Agreement_Arial.html changes:
+
+    python scripts/build_agreement_template.py
+
+Normalizes the Word export into minimal HTML/CSS with the same rendering:
+drops conditional comments (VML shapes, Word XML, IE-only styles), Word
+metadata links, `mso-*` and other Word-only declarations, Word list and
+font definitions without a source, `<o:p>` wrappers and spans left without
+attributes, and collapses whitespace. Images are downscaled to print
+resolution for their displayed width and inlined as data URIs.
+
+Writes Supply_Agreement_Arial.min.html (UTF-8) next to the source, with the
+source's SHA-256 so the app can tell when the build is stale, and
+Supply_Agreement_Arial.build.json with size and timing deltas. PDF render
+times are recorded when WeasyPrint's system libraries are available.
+"""
+import base64
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tinycss2
+from bs4 import BeautifulSoup, Comment, Declaration, NavigableString
+from PIL import Image
+
+from src.components.agreement_template import _compile, agreement_stylesheet
+from src.components.conf_variables import (
+    AGREEMENT_TEMPLATE_BUILD_PATH,
+    AGREEMENT_TEMPLATE_PATH,
+    AGREEMENT_TEMPLATE_SOURCE_META,
+)
+from src.components.document_viewer import fill_agreement_template, read_template_source
+
+REPORT_PATH = AGREEMENT_TEMPLATE_BUILD_PATH.with_suffix("").with_suffix(".build.json")
+# Word-only properties that no browser or WeasyPrint applies
+WORD_ONLY_PROPERTIES = {
+    "tab-stops", "tab-interval", "layout-grid-mode", "punctuation-wrap", "text-justify-trim",
+    "text-autospace", "text-underline", "panose-1",
+}
+# Whitespace between these is insignificant and can be dropped
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "style", "div", "p", "table", "colgroup",
+    "col", "tbody", "thead", "tr", "td", "th", "ol", "ul", "li",
+}
+# Pixels of image per CSS pixel it is displayed at; about 290 dpi in print
+IMAGE_SCALE = 3
+SAMPLE_ORDER = {
+    "seller": "tech_outlet",
+    "items": [
+        {"title": f"Refurbished Laptop #{i}", "price": f"{100 + i:.2f}", "condition": "Used"}
+        for i in range(10)
+    ],
+}
+
+
+def _minify(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _keep_declaration(name):
+    name = name.lower()
+    return not name.startswith("mso-") and name not in WORD_ONLY_PROPERTIES
+
+
+def clean_declarations(tokens):
+    """Serialize a declaration list without Word-only properties."""
+    declarations = []
+    for declaration in tinycss2.parse_declaration_list(tokens, skip_comments=True, skip_whitespace=True):
+        if declaration.type != "declaration" or not _keep_declaration(declaration.name):
+            continue
+        value = _minify(tinycss2.serialize(declaration.value))
+        important = "!important" if declaration.important else ""
+        declarations.append(f"{declaration.lower_name}:{value}{important}")
+    return ";".join(declarations)
+
+
+def clean_stylesheet(css):
+    """Drop Word list and font definitions and Word-only declarations; minify the rest."""
+    rules = []
+    for rule in tinycss2.parse_stylesheet(css, skip_comments=True, skip_whitespace=True):
+        if rule.type == "qualified-rule":
+            body = clean_declarations(rule.content)
+            if body:
+                rules.append(f"{_minify(tinycss2.serialize(rule.prelude))}{{{body}}}")
+        elif rule.type == "at-rule":
+            if rule.lower_at_keyword == "list":
+                continue
+            if rule.lower_at_keyword in ("font-face", "page"):
+                body = clean_declarations(rule.content or [])
+                # Word's font definitions only describe installed fonts and have no src
+                if rule.lower_at_keyword == "font-face" and not re.search(r"(^|;)src:", body):
+                    continue
+                prelude = _minify(tinycss2.serialize(rule.prelude))
+                rules.append(f"@{rule.at_keyword}{' ' + prelude if prelude else ''}{{{body}}}")
+            else:
+                rules.append(_minify(tinycss2.serialize([rule])))
+    return "".join(rules)
+
+
+def inline_image(path, display_width):
+    """Return a data URI for the image, downscaled for its displayed width, in its smallest encoding."""
+    original = path.read_bytes()
+    candidates = [(original, mimetypes.guess_type(path.name)[0] or "application/octet-stream")]
+    with Image.open(path) as image:
+        image.load()
+        if display_width and image.width > display_width * IMAGE_SCALE:
+            height = round(image.height * display_width * IMAGE_SCALE / image.width)
+            image = image.convert("RGBA").resize((display_width * IMAGE_SCALE, height), Image.LANCZOS)
+            image = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+        for image_format, mime in (("PNG", "image/png"), ("GIF", "image/gif")):
+            buffer = io.BytesIO()
+            image.save(buffer, format=image_format, optimize=True)
+            candidates.append((buffer.getvalue(), mime))
+    data, mime = min(candidates, key=lambda candidate: len(candidate[0]))
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}", len(original), len(data)
+
+
+def _display_width(img):
+    match = re.search(r"(?:^|;)\s*width\s*:\s*(\d+)px", img.get("style", ""))
+    if match:
+        return int(match.group(1))
+    return int(img["width"]) if str(img.get("width", "")).isdigit() else None
+
+
+def normalize(html, assets_dir):
+    """
+    Normalize a Word HTML export.
+
+    Returns:
+        Tuple[str, dict]: The normalized document and per-image size notes
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Conditional comments hold VML shapes, Word XML and IE-only styles; the
+    # <![if ...]> markers around content every other renderer shows go too
+    for node in soup.find_all(string=lambda text: isinstance(text, (Comment, Declaration))):
+        node.extract()
+    for tag in soup.find_all(["meta", "link", "xml"]):
+        tag.decompose()
+    for tag in soup.find_all(lambda tag: tag.name.startswith(("o:", "v:", "w:"))):
+        tag.unwrap()
+
+    html_tag = soup.find("html")
+    for attribute in list(html_tag.attrs):
+        del html_tag[attribute]
+    html_tag["lang"] = "en-US"
+    head = soup.find("head")
+    head.insert(0, soup.new_tag("meta", charset="utf-8"))
+    body = soup.find("body")
+    for attribute in ("lang", "link", "vlink"):
+        body.attrs.pop(attribute, None)
+
+    for style in soup.find_all("style"):
+        style.string = clean_stylesheet(style.string or "")
+    for tag in soup.find_all(True):
+        if "style" in tag.attrs:
+            cleaned = clean_declarations(tag["style"])
+            if cleaned:
+                tag["style"] = cleaned
+            else:
+                del tag["style"]
+        # The whole document is English now that <html> says so
+        if tag.get("lang", "").lower() == "en-us":
+            del tag["lang"]
+    for span in soup.find_all("span"):
+        if not span.attrs:
+            span.unwrap()
+
+    images = {}
+    for img in soup.find_all("img"):
+        path = assets_dir / img["src"]
+        if path.is_file():
+            img["src"], before, after = inline_image(path, _display_width(img))
+            images[path.name] = {"bytes_before": before, "bytes_after": after}
+    # Word keeps a fallback copy of each picture for its VML shapes; note the ones no longer used
+    for path in sorted((assets_dir / f"{AGREEMENT_TEMPLATE_PATH.stem}_files").glob("*")):
+        if path.suffix.lower() in (".png", ".gif", ".jpg", ".jpeg") and path.name not in images:
+            images[path.name] = {"bytes_before": path.stat().st_size, "bytes_after": 0, "note": "only used by Word's VML shapes"}
+
+    soup.smooth()
+    for text in soup.find_all(string=True):
+        if type(text) is not NavigableString or text.parent.name == "style":
+            continue
+        collapsed = re.sub(r"\s+", " ", str(text))
+        if collapsed == " ":
+            previous, following = text.previous_sibling, text.next_sibling
+            if all(sibling is None or getattr(sibling, "name", None) in BLOCK_TAGS for sibling in (previous, following)):
+                text.extract()
+                continue
+        if collapsed != str(text):
+            text.replace_with(collapsed)
+
+    return "<!DOCTYPE html>" + str(soup), images
+
+
+def time_call(function, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def render_times(source, built):
+    """Mean PDF render time of the sample order with both templates, if WeasyPrint can load."""
+    try:
+        from weasyprint import HTML
+    except OSError as e:
+        return {"skipped": str(e).splitlines()[0]}
+    base_url = str(AGREEMENT_TEMPLATE_PATH.parent)
+    times = {}
+    for name, html_content in (("source", source), ("built", built)):
+        document = fill_agreement_template(html_content, SAMPLE_ORDER, date="2025-01-01")
+        HTML(string=document, base_url=base_url).write_pdf()
+        times[f"{name}_ms"], pdf = time_call(lambda: HTML(string=document, base_url=base_url).write_pdf(), repeat=3)
+        times[f"{name}_pdf_bytes"] = len(pdf)
+    return times
+
+
+def main():
+    source = read_template_source(AGREEMENT_TEMPLATE_PATH)
+    source_digest = hashlib.sha256(AGREEMENT_TEMPLATE_PATH.read_bytes()).hexdigest()
+
+    built, images = normalize(source, AGREEMENT_TEMPLATE_PATH.parent)
+    built = built.replace(
+        '<meta charset="utf-8"/>',
+        f'<meta charset="utf-8"/><meta content="{source_digest}" name="{AGREEMENT_TEMPLATE_SOURCE_META}"/>',
+        1,
+    )
+    AGREEMENT_TEMPLATE_BUILD_PATH.write_text(built, encoding="utf-8")
+
+    # Same agreement text from both, and the normalized one must still have every slot
+    document_text = lambda html: " ".join(BeautifulSoup(html, "html.parser").get_text(" ").split())
+    if document_text(fill_agreement_template(source, SAMPLE_ORDER, date="2025-01-01")) != document_text(
+        fill_agreement_template(built, SAMPLE_ORDER, date="2025-01-01")
+    ):
+        raise SystemExit("The normalized template fills to different text than the source")
+    source_compile_ms, _ = time_call(lambda: _compile.__wrapped__(source))
+    built_compile_ms, _ = time_call(lambda: _compile.__wrapped__(built))
+
+    report = {
+        "source": AGREEMENT_TEMPLATE_PATH.name,
+        "source_sha256": source_digest,
+        "source_file_bytes": AGREEMENT_TEMPLATE_PATH.stat().st_size,
+        "source_chars": len(source),
+        "source_assets_bytes": sum(image["bytes_before"] for image in images.values()),
+        "built_file_bytes": AGREEMENT_TEMPLATE_BUILD_PATH.stat().st_size,
+        "built_chars": len(built),
+        "stylesheet_chars": {"source": len(agreement_stylesheet(source)), "built": len(agreement_stylesheet(built))},
+        "images": images,
+        "compile_ms": {"source": round(source_compile_ms, 2), "built": round(built_compile_ms, 2)},
+        "render": render_times(source, built),
+    }
+    REPORT_PATH.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"wrote {AGREEMENT_TEMPLATE_BUILD_PATH.name} and {REPORT_PATH.name}")
+    print(f"template: {report['source_file_bytes'] + report['source_assets_bytes']:,} bytes with images -> {report['built_file_bytes']:,} bytes self-contained")
+    print(f"stylesheet: {report['stylesheet_chars']['source']:,} -> {report['stylesheet_chars']['built']:,} chars")
+    print(f"compile: {report['compile_ms']['source']:.1f} -> {report['compile_ms']['built']:.1f} ms")
+    print(f"render: {report['render']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Share of the contract budget saved with AMPA (new contract = 75% of current)
+SAVINGS_RATE = 0.25
+# AI-assisted supplier discovery is this many times faster than manual
+AI_SPEEDUP = 52
+
+BAND_PERCENTILES = (5, 50, 95)
+
+
+def roi_metrics(current_contract_value, manual_time, events_per_year) -> Dict[str, np.ndarray]:
+    """
+    Compute ROI metrics for scalars or broadcastable arrays of inputs.
+
+    Args:
+        current_contract_value: Total contract budget per year (AED)
+        manual_time: Manual time per supplier event (hours)
+        events_per_year: Procurement events per year
+
+    Returns:
+        Dict[str, np.ndarray]: cost_savings, monetary_roi, ai_time,
+            total_time_saved and time_efficiency_percentage
+    """
+    contract = np.asarray(current_contract_value, dtype=float)
+    manual = np.asarray(manual_time, dtype=float)
+    events = np.asarray(events_per_year, dtype=float)
+
+    cost_savings = contract * SAVINGS_RATE
+    monetary_roi = np.where(contract > 0, SAVINGS_RATE * 100, 0.0)
+    ai_time = manual / AI_SPEEDUP
+    total_time_saved = (manual - ai_time) * events
+    time_efficiency_percentage = np.where(manual > 0, AI_SPEEDUP * 100, 0.0)
+
+    # Every metric gets the shape of the broadcast inputs, so grids index the same way
+    shape = np.broadcast_shapes(contract.shape, manual.shape, events.shape)
+    return {
+        "cost_savings": np.broadcast_to(cost_savings, shape),
+        "monetary_roi": np.broadcast_to(monetary_roi, shape),
+        "ai_time": np.broadcast_to(ai_time, shape),
+        "total_time_saved": np.broadcast_to(total_time_saved, shape),
+        "time_efficiency_percentage": np.broadcast_to(time_efficiency_percentage, shape),
+    }
+
+
+def _freeze(results: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Make memoized arrays read-only so callers can't corrupt the cache."""
+    frozen = {}
+    for name, values in results.items():
+        values = np.array(values)
+        values.flags.writeable = False
+        frozen[name] = values
+    return frozen
+
+
+@lru_cache(maxsize=128)
+def roi_grid(
+    contract_values: Tuple[float, ...],
+    manual_times: Tuple[float, ...],
+    events: Tuple[float, ...],
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every combination of the given inputs.
+
+    Returns:
+        Dict[str, np.ndarray]: Each metric with shape
+            (len(contract_values), len(manual_times), len(events))
+    """
+    contract = np.asarray(contract_values, dtype=float)[:, None, None]
+    manual = np.asarray(manual_times, dtype=float)[None, :, None]
+    event_counts = np.asarray(events, dtype=float)[None, None, :]
+    return _freeze(roi_metrics(contract, manual, event_counts))
+
+
+@lru_cache(maxsize=128)
+def roi_monte_carlo(
+    current_contract_value: float,
+    manual_time: float,
+    events_per_year: float,
+    spread: float = 0.2,
+    samples: int = 10000,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Sample every input from a triangular distribution of +/- `spread` around its value.
+
+    Returns:
+        Dict[str, np.ndarray]: Each metric as a vector of `samples` outcomes
+    """
+    rng = np.random.default_rng(seed)
+
+    def sample(mode: float) -> np.ndarray:
+        low, high = mode * (1 - spread), mode * (1 + spread)
+        if high <= low:
+            return np.full(samples, mode, dtype=float)
+        return rng.triangular(low, mode, high, size=samples)
+
+    return _freeze(roi_metrics(
+        sample(current_contract_value),
+        sample(manual_time),
+        sample(events_per_year),
+    ))
+
+
+def sensitivity_bands(
+    current_contract_value: float,
+    manual_time: float,
+    events_per_year: float,
+    spread: float = 0.2,
+    samples: int = 10000,
+) -> Dict[str, Dict[int, float]]:
+    """
+    Summarize a Monte Carlo run as percentile bands.
+
+    Returns:
+        Dict[str, Dict[int, float]]: Metric name mapped to {percentile: value}
+            for each of BAND_PERCENTILES
+    """
+    results = roi_monte_carlo(
+        float(current_contract_value), float(manual_time), float(events_per_year), spread, samples
+    )
+    return {
+        name: dict(zip(BAND_PERCENTILES, np.percentile(values, BAND_PERCENTILES).tolist()))
+        for name, values in results.items()
+    }
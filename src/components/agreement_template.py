@@ -0,0 +1,322 @@
+import json
+import hashlib
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from src.components.conf_variables import LARGE_ORDER_ITEMS, SCHEDULE_ROWS_PER_PART, USD_TO_AED
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_NAME = "AMPA Procurement"
+CUSTOMER_ADDRESS = "Dubai, United Arab Emirates"
+CUSTOMER_SIGNATORY = "AMPA Procurement Representative"
+
+# Bump when compile_agreement_template changes its output, to retire cached PDFs
+COMPILER_VERSION = 2
+
+# Marks where a slot goes while the template is still a soup; never occurs in Word HTML
+_MARK = "\x00"
+
+# Bracketed placeholders in the Word document and the slot each one becomes
+PLACEHOLDERS = {
+    "[DATE]": "date",
+    "[SUPPLIER NAME]": "supplier_name",
+    "[SUPPLIER ADDRESS]": "supplier_address",
+    "[CUSTOMER NAME]": "customer_name",
+    "[CUSTOMER ADDRESS]": "customer_address",
+}
+
+# Jinja source for every slot
+SLOTS = {
+    "date": "{{ date }}",
+    "supplier_name": "{{ supplier_name }}",
+    "supplier_address": "{{ supplier_address }}",
+    "customer_name": "{{ customer_name }}",
+    "customer_address": "{{ customer_address }}",
+    "line_items": "{% for item in line_items %}",
+    "item": "{{ item }}",
+    "end_line_items": "{% endfor %}",
+    "price_label": "{{ price_label }}",
+    "total_price": "{{ total_price }}",
+    "supplier_signatory": "{{ supplier_signatory }}",
+    "customer_signatory": "{{ customer_signatory }}",
+    "styles": "{{ styles }}",
+}
+
+LINE_ITEM_STYLE = "mso-margin-top-alt:auto;mso-margin-bottom-alt:auto;mso-list:l4 level1 lfo3;tab-stops:list 36.0pt"
+LINE_ITEM_SPAN_STYLE = 'font-size:12.0pt;font-family:"Calibri",sans-serif;mso-fareast-font-family:"MS PGothic"'
+PRICE_DISPLAY_STYLE = "font-size: 18pt; font-weight: bold; text-align: center; color: #000000; margin: 20px 0;"
+
+# Schedule of goods for large orders; the header row repeats on every page
+SCHEDULE_TITLE = "Schedule A: Description of Goods"
+SCHEDULE_SOURCE = (
+    '<!DOCTYPE html><html lang="en-US"><head><meta charset="utf-8"/>'
+    "<title>{{ schedule_title }}</title>{{ styles }}</head><body><div class=\"schedule\">"
+    "{% if first %}<h1>{{ schedule_title }}</h1>"
+    "<p>Goods supplied by {{ supplier_name }} to {{ customer_name }} under the supply agreement dated {{ date }}.</p>"
+    "{% endif %}"
+    '<table><colgroup><col class="number"/><col class="goods"/><col class="condition"/><col class="price"/></colgroup>'
+    '<thead><tr><th class="number">No.</th><th>Goods</th><th>Condition</th><th class="price">Price (AED)</th></tr></thead>'
+    "<tbody>{% for title, condition, price in rows %}"
+    '<tr><td class="number">{{ start + loop.index }}</td><td>{{ title }}</td><td>{{ condition }}</td>'
+    '<td class="price">{{ price }}</td></tr>'
+    "{% endfor %}</tbody></table>"
+    '{% if last %}<p class="total">{{ price_label }}: AED {{ total_price }}</p>{% endif %}'
+    "</div></body></html>"
+)
+# Fixed table layout: column widths come from <col>, not from measuring every cell
+SCHEDULE_STYLESHEET = (
+    "@page schedule{size:595.3pt 841.9pt;margin:72.0pt}"
+    '.schedule{page:schedule;font-family:"Calibri",sans-serif;font-size:10.0pt}'
+    ".schedule h1{font-size:14.0pt;margin:0 0 6.0pt}"
+    ".schedule table{width:100%;table-layout:fixed;border-collapse:collapse}"
+    ".schedule thead{display:table-header-group}"
+    ".schedule th{text-align:left;border-bottom:1.0pt solid #000}"
+    ".schedule th,.schedule td{padding:2.0pt 4.0pt;vertical-align:top;overflow-wrap:break-word}"
+    ".schedule tr{break-inside:avoid}"
+    ".schedule col.number{width:8%}.schedule col.goods{width:54%}"
+    ".schedule col.condition{width:20%}.schedule col.price{width:18%}"
+    ".schedule .number,.schedule .price{text-align:right}"
+    ".schedule .total{font-size:14.0pt;font-weight:bold;text-align:right;margin-top:12.0pt}"
+)
+
+
+def _slot(name: str) -> str:
+    return f"{_MARK}{name}{_MARK}"
+
+
+def _mark_signatures(soup) -> None:
+    for section in soup.find_all("td"):
+        if section.find(string=lambda text: text and "SUPPLIER" in text):
+            signatory = "supplier_signatory"
+        elif section.find(string=lambda text: text and "CUSTOMER" in text):
+            signatory = "customer_signatory"
+        else:
+            continue
+        # The underlined field is the printed name
+        name_field = section.find("u")
+        if name_field:
+            name_field.string = _slot(signatory)
+        for field in section.find_all("p"):
+            if field.get_text() and "Date" in field.get_text():
+                field.string = f"Date: {_slot('date')}"
+
+
+@lru_cache(maxsize=4)
+def _compile(html_content: str) -> Tuple[Any, str]:
+    from bs4 import BeautifulSoup
+    from bs4.element import Comment
+    from jinja2 import Environment
+
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    # Stylesheets become one slot, so the PDF renderer can parse them once per worker
+    stylesheets = []
+    for index, style in enumerate(soup.find_all("style")):
+        stylesheets.append(style.string or "")
+        if index == 0:
+            style.replace_with(_slot("styles"))
+        else:
+            style.decompose()
+
+    for element in soup.find_all(string=True):
+        if isinstance(element, Comment):
+            continue
+        text = str(element)
+        for placeholder, slot in PLACEHOLDERS.items():
+            if placeholder in text:
+                element.replace_with(text.replace(placeholder, _slot(slot)))
+                break
+
+    ordered_list = soup.find("ol")
+    if ordered_list:
+        for item in ordered_list.find_all("li"):
+            item.decompose()
+        line_item = soup.new_tag("li")
+        line_item["class"] = "MsoNormal"
+        line_item["style"] = LINE_ITEM_STYLE
+        span = soup.new_tag("span")
+        span["lang"] = "EN-US"
+        span["style"] = LINE_ITEM_SPAN_STYLE
+        span.string = _slot("item")
+        line_item.append(span)
+        ordered_list.append(_slot("line_items"))
+        ordered_list.append(line_item)
+        ordered_list.append(_slot("end_line_items"))
+
+    # The agreed price goes after the paragraph that follows the PRICE heading
+    price_heading = soup.find("strong", string=lambda text: text and "PRICE" in text)
+    price_section = price_heading.find_parent("p") if price_heading else None
+    price_desc_para = price_section.find_next_sibling("p") if price_section else None
+    if price_desc_para:
+        price_display = soup.new_tag("p")
+        price_display["style"] = PRICE_DISPLAY_STYLE
+        price_display.string = f"{_slot('price_label')}: AED {_slot('total_price')}"
+        price_desc_para.insert_after(price_display)
+
+    _mark_signatures(soup)
+
+    # Odd parts are slot names; keep the rest out of Jinja's hands
+    parts = str(soup).split(_MARK)
+    source = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            source.append(SLOTS[part])
+        elif part:
+            source.append(f"{{% raw %}}{part}{{% endraw %}}")
+
+    template = Environment(autoescape=True).from_string("".join(source))
+    logger.info(f"Compiled agreement template with {len(parts) // 2} slots")
+    return template, "\n".join(stylesheets)
+
+
+def compile_agreement_template(html_content: str):
+    """
+    Compile the Word-exported agreement into a Jinja2 template.
+
+    The HTML is parsed once: bracketed placeholders, the line item list,
+    the agreed price and the signature names and dates become named slots,
+    and everything else is kept verbatim. Filling the agreement is then a
+    plain string render. The document's <style> blocks are replaced by the
+    `styles` slot; see agreement_stylesheet.
+
+    Args:
+        html_content (str): The decoded agreement HTML
+
+    Returns:
+        jinja2.Template: Template rendered with the keys of agreement_context
+    """
+    return _compile(html_content)[0]
+
+
+def agreement_stylesheet(html_content: str) -> str:
+    """The CSS of the template's <style> blocks, for the `styles` slot or a shared stylesheet."""
+    return _compile(html_content)[1]
+
+
+@lru_cache(maxsize=1)
+def _schedule_template():
+    from jinja2 import Environment
+
+    return Environment(autoescape=True).from_string(SCHEDULE_SOURCE)
+
+
+def schedule_parts(context: Dict[str, Any], styles: str = "", rows_per_part: int = SCHEDULE_ROWS_PER_PART) -> List[str]:
+    """
+    Fill the schedule of goods of a large order, split into separate documents.
+
+    WeasyPrint lays out a whole document at once, so a part of at most
+    `rows_per_part` rows bounds the memory of each layout. Numbering
+    continues from part to part and the total follows the last row.
+
+    Args:
+        context (Dict[str, Any]): Values from agreement_context
+        styles (str): Markup for the `styles` slot
+        rows_per_part (int): Line items per document
+
+    Returns:
+        List[str]: The parts in order; empty unless the order is large
+    """
+    rows = context.get("schedule", [])
+    template = _schedule_template()
+    return [
+        template.render(
+            context,
+            schedule_title=SCHEDULE_TITLE,
+            styles=styles,
+            rows=rows[start:start + rows_per_part],
+            start=start,
+            first=start == 0,
+            last=start + rows_per_part >= len(rows),
+        )
+        for start in range(0, len(rows), rows_per_part)
+    ]
+
+
+@lru_cache(maxsize=4)
+def template_version(html_content: str) -> str:
+    """Short hash identifying a template and the compiler that fills it."""
+    return hashlib.sha256(f"{COMPILER_VERSION}\n{html_content}".encode("utf-8")).hexdigest()[:16]
+
+
+def agreement_key(html_content: str, seller_info: Dict[str, Any], date: str) -> str:
+    """
+    Content key of a filled agreement, for caching its rendered PDF.
+
+    Hashes the template version, the large-order layout, the seller, the
+    line items as printed (title, condition and price to the cent, in
+    order) and the date.
+    """
+    seller_items = seller_info.get("items", []) or [seller_info]
+    line_items = [
+        [
+            " ".join(str(item.get("title", "Unknown Product")).split()),
+            " ".join(str(item.get("condition", "Not specified")).split()),
+            f"{float(item.get('price', 0)):.2f}",
+        ]
+        for item in seller_items
+    ]
+    payload = json.dumps(
+        [
+            template_version(html_content),
+            [LARGE_ORDER_ITEMS, SCHEDULE_ROWS_PER_PART],
+            seller_info.get("seller", "Unknown Seller"),
+            line_items,
+            date,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def agreement_context(seller_info: Dict[str, Any], supplier_address: str, date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the values for a compiled agreement template.
+
+    From LARGE_ORDER_ITEMS line items on, the agreement's list holds a
+    single line referring to the schedule of goods, and the items go in
+    `schedule` as (title, condition, price) rows for schedule_parts.
+
+    Args:
+        seller_info (Dict[str, Any]): Seller name and its 'items'; a single
+            listing is treated as a one-item order
+        supplier_address (str): Address printed for the supplier
+        date (Optional[str]): Agreement date, today by default
+
+    Returns:
+        Dict[str, Any]: Template values
+    """
+    seller_name = seller_info.get("seller", "Unknown Seller")
+    seller_items = seller_info.get("items", []) or [seller_info]
+    logger.info(f"Processing {len(seller_items)} items for seller {seller_name}")
+
+    rows = []
+    total_price = 0.0
+    for item in seller_items:
+        product_price = float(item.get("price", 0)) * USD_TO_AED
+        total_price += product_price
+        row = (str(item.get("title", "Unknown Product")), str(item.get("condition", "Not specified")), f"{product_price:.2f}")
+        logger.debug(f"Adding product to agreement: {' - '.join(row[:2])} - AED {row[2]}")
+        rows.append(row)
+    logger.info(f"Total price calculated: AED {total_price:.2f}")
+
+    large_order = len(rows) >= LARGE_ORDER_ITEMS
+    if large_order:
+        line_items = [f"{len(rows)} items as listed in {SCHEDULE_TITLE} - AED {total_price:.2f}"]
+    else:
+        line_items = [f"{title} - {condition} - AED {price}" for title, condition, price in rows]
+
+    return {
+        "date": date or datetime.now().strftime("%Y-%m-%d"),
+        "supplier_name": seller_name,
+        "supplier_address": supplier_address,
+        "customer_name": CUSTOMER_NAME,
+        "customer_address": CUSTOMER_ADDRESS,
+        "line_items": line_items,
+        "schedule": rows if large_order else [],
+        "price_label": "Total Agreed Price" if len(seller_items) > 1 else "Agreed Price",
+        "total_price": f"{total_price:.2f}",
+        "supplier_signatory": seller_name,
+        "customer_signatory": CUSTOMER_SIGNATORY,
+    }
@@ -0,0 +1,92 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+class AssetCache:
+    """
+    Process-wide in-memory cache for static files.
+
+    Entries are keyed by resolved path and loader, and are reloaded only when
+    the file's modification time or size changes, so each asset costs one disk
+    read per process instead of one per rerun.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[int, int, Any]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def load(self, path: PathLike, loader: Callable[[Path], Any]) -> Any:
+        """
+        Return `loader(path)`, reusing the cached result while the file is unchanged.
+
+        Args:
+            path (PathLike): File to load
+            loader (Callable[[Path], Any]): Function that reads and decodes the file
+
+        Returns:
+            Any: The loader's result
+        """
+        path = Path(path).resolve()
+        stat = os.stat(path)
+        key = (str(path), f"{loader.__module__}.{loader.__qualname__}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._hits += 1
+                return entry[2]
+            self._misses += 1
+
+        value = loader(path)
+        with self._lock:
+            self._entries[key] = (stat.st_mtime_ns, stat.st_size, value)
+        logger.debug(f"Loaded asset {path}")
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+asset_cache = AssetCache()
+
+
+def _read_utf8(path: Path) -> str:
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def _read_bytes(path: Path) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def read_text(path: PathLike) -> str:
+    """Read a UTF-8 text asset through the shared cache."""
+    return asset_cache.load(path, _read_utf8)
+
+
+def read_bytes(path: PathLike) -> bytes:
+    """Read a binary asset through the shared cache."""
+    return asset_cache.load(path, _read_bytes)
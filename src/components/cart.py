@@ -1,6 +1,6 @@
 from typing import List, Dict, Any, Optional
 import streamlit as st
-import src.components.chatbot 
+from src.components.listing_codec import encode_listings
 
 class Cart:
     """
@@ -167,32 +167,12 @@ class Cart:
 
     def get_cart_data_string(self) -> str:
         """
-        Convert cart items to a clean, pipe-delimited string format.
-        
+        Convert cart items to the compact listing table used in the LLM context.
+
         Returns:
-            str: Each item as "Title|Price|Condition|Seller" 
+            str: The encoded table (see listing_codec.encode_listings)
                 Returns "empty" if cart is empty
-                
-        Example:
-            "Item 1|10.00|New|SellerA\nItem 2|20.00|Used|SellerB"
         """
         if not self.items:
             return "empty"
-        
-        item_strings = []
-        for item in self.items:
-            try:
-                item_str = (
-                    f"{item.get('title', 'N/A')}|"
-                    f"{item.get('price', '0.00')}|"
-                    f"{item.get('condition', 'Unknown')}|"
-                    f"{item.get('seller', 'Unknown')}|"
-                    f"{item.get('comments', 'Unknown')}|"
-                    f"{item.get('rating', 'Unknown')}"
-                )
-                item_strings.append(item_str)
-            except Exception as e:
-                print(f"Error formatting item: {e}")
-                continue
-        
-        return "\n".join(item_strings)
\ No newline at end of file
+        return encode_listings(self.items)
\ No newline at end of file
@@ -1,17 +1,167 @@
 import streamlit as st
 import os
-from cerebras.cloud.sdk import Cerebras
 from streamlit_extras.stylable_container import stylable_container
-import copy
-import httpx
-
-def fetch_url(url: str, timeout: float = 5.0) -> str:
+import json
+import time
+import uuid
+import logging
+import secrets
+from contextlib import nullcontext
+from src.components.profiling import timed, timer, record_timing
+from src.components.context_packer import count_tokens, pack_context
+from src.components.conversation import ConversationLog
+from src.components.retrieval import retrieve_listings
+from src.components.model_router import ModelStats, route_prompt
+from src.components.tools import TOOL_DEFINITIONS, ToolExecutor, tool_call_to_dict
+from src.components.conf_variables import (
+    CHAT_STREAMING,
+    CHAT_MAX_RESPONSE_TOKENS,
+    CHAT_DISPLAY_MESSAGES,
+    CHAT_SESSION_PARAM,
+    LLM_BASE_URL_ENV,
+    TRANSCRIPT_RETENTION_DAYS,
+    TOOL_CALL_TIMEOUT,
+    TOOL_LOOP_MAX_ITERATIONS,
+    TOOL_LOOP_MAX_SECONDS,
+)
+from src.components.services import get_services
+from src.components.listing_codec import get_data_string
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT_AVATAR = "assets/eand-logo/small/Red/e&-lockup_Enterprise_engl_vert_red_rgb-cropped.svg"
+USER_AVATAR = ":material/person:"
+AUTO_MODEL = "auto"
+# Answer when the model is still calling tools after its last allowed turn
+TOOL_LOOP_FALLBACK = "Sorry, I couldn't finish looking that up. Please try asking again."
+
+SYSTEM_PROMPT = """
+You are an expert procurement assistant operating exclusively through chat. Your mission is to guide professional buyers through all procurement stages—from discovery to purchase—with data-driven recommendations.
+
+1. **Product Discovery & Intelligent Search**
+- Process natural language queries (e.g., "Find ergonomic chairs under $150" or "Show me reliable printer suppliers")
+- Rank results using weighted criteria: cost (35%), supplier reliability (25%), specifications (20%), ratings (10%), delivery time (10%)
+- Present top 3-5 products in numbered lists with key metrics:  
+*"1. Chair A | $139 | ⭐ 4.8 | 2-year warranty | SupplierX (98% on-time)"*
+- Handle sorting commands ("Sort by price ascending") and filtering ("Filter for items with next-day shipping")
+- For each product, include a one-line differentiator highlighting its unique advantage
+- Support category browsing ("Show office supplies") and specification-based searches ("Find printers with duplex capability")
+
+2. **External Source Integration & Market Intelligence**
+- Search trusted external supplier databases and marketplaces when requested
+- Fetch real-time pricing, availability, and specification data from verified sources
+- Present alternative products from different suppliers with comparative advantages:
+*"Similar alternatives: Product D (10% cheaper), Product E (20% higher capacity, different supplier)"*
+- Track market trends and price fluctuations to recommend optimal purchase timing
+- Include source attribution for all external data: *"Source: SupplierX catalog, updated [date]"*
+- Support requests for supplier credentials and compliance documentation
+
+3. **Structured Comparisons & Analysis**
+- Generate comparison tables for 2-4 products on request:  
+| **Metric**    | Product A | Product B | Product C |
+|---------------|-----------|-----------|-----------|
+| Unit Cost     | $45       | $52       | $48       |
+| Lead Time     | 14 days   | 7 days    | 10 days   |
+| MOQ           | 100       | 50        | 75        |
+| Warranty      | 1 year    | 2 years   | 18 months |
+- Highlight the best option for each metric using **bold** formatting
+- Label sections clearly: **Primary Advantage**, **Key Consideration**, **Best Value**
+- Support custom comparison criteria: "Compare these chairs based on ergonomics and durability"
+- Enable saving comparisons for future reference: "Save this comparison as 'Printer Options'"
+
+4. **Dynamic Cart & Order Management**
+- Process direct commands:  
+*"Add 50 units of Product C to cart"* → *"Added. Cart total: $2,350"*  
+*"Remove Product B"* → *"Removed. Cart updated."*
+- Provide instant cart summaries on request:  
+*"3 items: 50x C ($2,000), 10x D ($300), 5x E ($50). Total: $2,350"*
+- Guide checkout within chat:  
+*"Proceed to checkout? [1] Express Checkout [2] Review Cart [3] Save for Later"*
+- Confirm shipping and payment details through numbered selection menus
+- Support splitting orders by supplier or delivery date
+- Enable saving carts: "Save this cart as 'Q2 Office Supplies'"
+- Provide estimated delivery dates: "Estimated delivery: June 15-17"
+- Handle volume discounts and promotional offers automatically
+
+6. **Risk Management & Decision Support**
+- Proactively flag potential issues:  
+*"⚠️ Risk Alert: SupplierK has 18% late deliveries in Q3. Alternative: SupplierM (3% late, similar pricing)."*
+- Surface cost-saving alternatives:  
+*"Cost-saving option: Generator Y offers 12% savings with equivalent specs."*
+- Provide decisive guidance with quantifiable benefits:  
+*"Select SupplierA – 23% cost reduction at 500+ units with equivalent quality metrics."*
+- Flag potential supply chain disruptions: "Note: This component has reported shortages"
+- Identify consolidation opportunities: "Combining orders from Suppliers X and Y saves 15% on shipping"
+- Alert on price fluctuations: "This item's price has increased 8% since your last purchase"
+
+8. **Response Requirements & Communication Style**
+- Structure all outputs with clear headers: **Top Options**, **Key Comparison**, **Risk Alert**
+- Use only verified data with specific metrics:  
+*"SupplierX's ISO 9001 certification (exp 6/2025)"* not *"likely certified"*
+- Format numbers consistently: *"$1.2M savings at 1k units"* not *"1200000 dollars"*
+- Use confident, definitive language: *"The optimal choice is Product X because it reduces lead times by 19%."*
+- Employ active voice and imperative mood: *"Choose SupplierA for highest ROI."*
+- Maintain strict scope by redirecting off-topic queries to procurement topics
+- Prohibit hedging language ("might," "could"), passive voice, and subjective adjectives
+- Personalize responses based on user role (e.g., procurement specialist vs. department manager)
+
+9. **Contextual Help & Onboarding**
+- Provide guided onboarding for new users: "Welcome! Would you like to: [1] Search products [2] Learn key features"
+- Offer contextual hints during complex tasks: "Tip: You can compare up to 4 products at once"
+- Maintain an accessible command reference: "Show procurement commands"
+- Support natural help queries: "How do I create a recurring order?"
+- Provide procurement best practices when relevant: "Best practice: Request quotes from 3+ suppliers for purchases over $10,000"
+
+When uncertain about product details, respond with: "To provide accurate procurement advice on [topic], I need specific details about [missing information]."
+"""
+
+
+def _token_cookie(session_id: str) -> str:
+    return f"{CHAT_SESSION_PARAM}_{session_id}"
+
+
+def _set_token_cookie(session_id: str, token: str) -> None:
+    """Keep the session's resume token in a browser cookie; the server can read but not set cookies."""
+    import streamlit.components.v1 as components
+
+    cookie = (
+        f"{_token_cookie(session_id)}={token}; Path=/; "
+        f"Max-Age={int(TRANSCRIPT_RETENTION_DAYS * 24 * 3600)}; SameSite=Strict"
+    )
+    components.html(
+        f"<script>window.parent.document.cookie = {json.dumps(cookie)}"
+        " + (window.parent.location.protocol === 'https:' ? '; Secure' : '');</script>",
+        height=0,
+    )
+
+
+def init_chat_state() -> None:
     """
-    Fetch the raw HTML or text at `url`.
+    Start or resume the session's conversation.
+
+    The conversation id is kept in the `chat` query parameter and a random
+    token for it in a cookie of this browser, so reloading the page or
+    reconnecting resumes the stored transcript. A link with the id alone,
+    opened anywhere else, starts a new conversation. The system prompt is
+    added when packing each request.
     """
-    resp = httpx.get(url, timeout=timeout)
-    resp.raise_for_status()
-    return resp.text
+    if "messages" in st.session_state:
+        return
+    store = get_services().transcript_store
+    session_id = st.query_params.get(CHAT_SESSION_PARAM)
+    if session_id and store.verify(session_id, st.context.cookies.get(_token_cookie(session_id))):
+        st.session_state.messages = ConversationLog.resume(session_id, store)
+        logger.info(f"Resumed chat {session_id} with {len(st.session_state.messages)} messages")
+        return
+    if session_id:
+        logger.warning(f"Not resuming chat {session_id}: this browser has no token for it")
+    session_id = uuid.uuid4().hex
+    token = secrets.token_urlsafe(32)
+    store.create_session(session_id, token)
+    _set_token_cookie(session_id, token)
+    st.query_params[CHAT_SESSION_PARAM] = session_id
+    st.session_state.messages = ConversationLog(session_id=session_id, store=store)
+
 
 def display_intro():
     st.header("✨ Chat with an assistant and effortlessly re-rank the most relevant suppliers.", anchor=False)
@@ -78,18 +228,36 @@ class ChatbotClient:
     A class to handle interactions with the Cerebras API for chatbot functionality.
     """
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, client=None, pool=None, cache=None, tool_executor=None, stats=None, base_url=None):
         """
         Initialize the ChatbotClient with API key and models information.
 
         Args:
             api_key: The Cerebras API key. If None, tries to get from environment variables.
+            client: An existing Cerebras client to share. If given, api_key is not needed.
+            pool: Optional ConnectionPool used to cap and report concurrent requests.
+            cache: Optional CompletionCache consulted before calling the API.
+            tool_executor: ToolExecutor for the model's tool calls. Defaults to a private one.
+            stats: ModelStats recording per-model latency and token usage.
+            base_url: API base URL. Defaults to CEREBRAS_BASE_URL, then the Cerebras API.
         """
-        self.api_key = api_key or os.getenv("CEREBRAS_API_KEY")
-        if not self.api_key:
-            raise ValueError("API key is required to initialize ChatbotClient")
+        if client is None:
+            self.api_key = api_key or os.getenv("CEREBRAS_API_KEY")
+            if not self.api_key:
+                raise ValueError("API key is required to initialize ChatbotClient")
+
+            # Deferred so pages that never open the chat don't pay for the SDK import
+            from cerebras.cloud.sdk import Cerebras
 
-        self.client = Cerebras(api_key=self.api_key)
+            client = Cerebras(api_key=self.api_key, base_url=base_url or os.getenv(LLM_BASE_URL_ENV) or None)
+        else:
+            self.api_key = client.api_key
+
+        self.client = client
+        self._pool = pool
+        self.cache = cache
+        self.tool_executor = tool_executor or ToolExecutor()
+        self.stats = stats or ModelStats()
 
         # Define available models and their details
         self.models = {
@@ -105,114 +273,11 @@ class ChatbotClient:
             },
         }
 
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "fetch_url",
-                    "description": "Fetch the raw HTML/text content of a web page.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "url": {"type": "string", "format": "uri"},
-                            "timeout": {"type": "number", "default": 5.0},
-                        },
-                        "required": ["url"],
-                    },
-                },
-            }
-        ]
+        self.tools = TOOL_DEFINITIONS
 
         # Default model
         self.default_model = "llama-3.3-70b"
 
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
-        st.session_state.messages.append(
-            {
-                "role": "system",
-                "content": """
-                You are an expert procurement assistant operating exclusively through chat. Your mission is to guide professional buyers through all procurement stages—from discovery to purchase—with data-driven recommendations.
-
-                1. **Product Discovery & Intelligent Search**
-                - Process natural language queries (e.g., "Find ergonomic chairs under $150" or "Show me reliable printer suppliers")
-                - Rank results using weighted criteria: cost (35%), supplier reliability (25%), specifications (20%), ratings (10%), delivery time (10%)
-                - Present top 3-5 products in numbered lists with key metrics:  
-                *"1. Chair A | $139 | ⭐ 4.8 | 2-year warranty | SupplierX (98% on-time)"*
-                - Handle sorting commands ("Sort by price ascending") and filtering ("Filter for items with next-day shipping")
-                - For each product, include a one-line differentiator highlighting its unique advantage
-                - Support category browsing ("Show office supplies") and specification-based searches ("Find printers with duplex capability")
-
-                2. **External Source Integration & Market Intelligence**
-                - Search trusted external supplier databases and marketplaces when requested
-                - Fetch real-time pricing, availability, and specification data from verified sources
-                - Present alternative products from different suppliers with comparative advantages:
-                *"Similar alternatives: Product D (10% cheaper), Product E (20% higher capacity, different supplier)"*
-                - Track market trends and price fluctuations to recommend optimal purchase timing
-                - Include source attribution for all external data: *"Source: SupplierX catalog, updated [date]"*
-                - Support requests for supplier credentials and compliance documentation
-
-                3. **Structured Comparisons & Analysis**
-                - Generate comparison tables for 2-4 products on request:  
-                | **Metric**    | Product A | Product B | Product C |
-                |---------------|-----------|-----------|-----------|
-                | Unit Cost     | $45       | $52       | $48       |
-                | Lead Time     | 14 days   | 7 days    | 10 days   |
-                | MOQ           | 100       | 50        | 75        |
-                | Warranty      | 1 year    | 2 years   | 18 months |
-                - Highlight the best option for each metric using **bold** formatting
-                - Label sections clearly: **Primary Advantage**, **Key Consideration**, **Best Value**
-                - Support custom comparison criteria: "Compare these chairs based on ergonomics and durability"
-                - Enable saving comparisons for future reference: "Save this comparison as 'Printer Options'"
-
-                4. **Dynamic Cart & Order Management**
-                - Process direct commands:  
-                *"Add 50 units of Product C to cart"* → *"Added. Cart total: $2,350"*  
-                *"Remove Product B"* → *"Removed. Cart updated."*
-                - Provide instant cart summaries on request:  
-                *"3 items: 50x C ($2,000), 10x D ($300), 5x E ($50). Total: $2,350"*
-                - Guide checkout within chat:  
-                *"Proceed to checkout? [1] Express Checkout [2] Review Cart [3] Save for Later"*
-                - Confirm shipping and payment details through numbered selection menus
-                - Support splitting orders by supplier or delivery date
-                - Enable saving carts: "Save this cart as 'Q2 Office Supplies'"
-                - Provide estimated delivery dates: "Estimated delivery: June 15-17"
-                - Handle volume discounts and promotional offers automatically
-
-                6. **Risk Management & Decision Support**
-                - Proactively flag potential issues:  
-                *"⚠️ Risk Alert: SupplierK has 18% late deliveries in Q3. Alternative: SupplierM (3% late, similar pricing)."*
-                - Surface cost-saving alternatives:  
-                *"Cost-saving option: Generator Y offers 12% savings with equivalent specs."*
-                - Provide decisive guidance with quantifiable benefits:  
-                *"Select SupplierA – 23% cost reduction at 500+ units with equivalent quality metrics."*
-                - Flag potential supply chain disruptions: "Note: This component has reported shortages"
-                - Identify consolidation opportunities: "Combining orders from Suppliers X and Y saves 15% on shipping"
-                - Alert on price fluctuations: "This item's price has increased 8% since your last purchase"
-
-                8. **Response Requirements & Communication Style**
-                - Structure all outputs with clear headers: **Top Options**, **Key Comparison**, **Risk Alert**
-                - Use only verified data with specific metrics:  
-                *"SupplierX's ISO 9001 certification (exp 6/2025)"* not *"likely certified"*
-                - Format numbers consistently: *"$1.2M savings at 1k units"* not *"1200000 dollars"*
-                - Use confident, definitive language: *"The optimal choice is Product X because it reduces lead times by 19%."*
-                - Employ active voice and imperative mood: *"Choose SupplierA for highest ROI."*
-                - Maintain strict scope by redirecting off-topic queries to procurement topics
-                - Prohibit hedging language ("might," "could"), passive voice, and subjective adjectives
-                - Personalize responses based on user role (e.g., procurement specialist vs. department manager)
-
-                9. **Contextual Help & Onboarding**
-                - Provide guided onboarding for new users: "Welcome! Would you like to: [1] Search products [2] Learn key features"
-                - Offer contextual hints during complex tasks: "Tip: You can compare up to 4 products at once"
-                - Maintain an accessible command reference: "Show procurement commands"
-                - Support natural help queries: "How do I create a recurring order?"
-                - Provide procurement best practices when relevant: "Best practice: Request quotes from 3+ suppliers for purchases over $10,000"
-
-                When uncertain about product details, respond with: "To provide accurate procurement advice on [topic], I need specific details about [missing information]."
-                """,
-            }
-        )
-
     def get_available_models(self):
         """
         Return the list of available models.
@@ -251,45 +316,210 @@ class ChatbotClient:
     #     except Exception as e:
     #         raise Exception(f"Error generating response: {str(e)}")
 
-    def send_messages(self, messages, model=None, max_tokens=None):
+    def context_budget(self, model=None, max_tokens=None):
+        """
+        Return how many prompt tokens fit alongside the response for a model.
+
+        Args:
+            model: The model to use (defaults to default_model if None)
+            max_tokens: Tokens reserved for the response
+        """
         model = model or self.default_model
+        return self.models[model]["tokens"] - (max_tokens or 0)
+
+    def _lease(self):
+        return self._pool.lease() if self._pool else nullcontext()
+
+    def complete(self, messages, model=None, max_tokens=None):
+        """
+        Plain completion without tools or caching, for background jobs such as summaries.
+
+        Args:
+            messages: List of message objects with role and content
+            model: The model to use (defaults to default_model if None)
+            max_tokens: Maximum tokens for the response
+
+        Returns:
+            The model's response text
+        """
+        model = model or self.default_model
+        params = {"model": model, "messages": messages}
+        if max_tokens:
+            params["max_tokens"] = max_tokens
+        start = time.perf_counter()
+        with timer("cerebras.chat_completion"), self._lease():
+            resp = self.client.chat.completions.create(**params)
+        content = resp.choices[0].message.content
+        self._record_usage(model, time.perf_counter() - start, messages, content, getattr(resp, "usage", None))
+        return content
+
+    def _completion_params(self, model, messages, max_tokens, allow_tools):
         params = {
             "model": model,
             "messages": messages,
             "tools": self.tools,
-            "tool_choice": "auto",
+            # On the last permitted turn the model must answer instead of calling tools
+            "tool_choice": "auto" if allow_tools else "none",
         }
         if max_tokens:
             params["max_tokens"] = max_tokens
+        return params
 
-        resp = self.client.chat.completions.create(**params)
-        choice = resp.choices[0].message
-
-        if choice.role == "function":
-            match choice.name:
-                case "fetch_url":
-                    print("YAYAYAYA!")
-                    args = choice.arguments
-                    page_text = fetch_url(args["url"], args.get("timeout", 5.0))
-                    follow = self.client.chat.completions.create(
-                        model=model,
-                        messages=[  
-                            *resp.messages,
-                            {
-                                "role": "function",
-                                "name": "fetch_url",
-                                "content": page_text,
-                            },
-                        ],
-                        max_tokens=max_tokens or 512,
-                    )
-                    return follow.choices[0].message.content
-
-        # Otherwise, normal assistant reply
-        return choice.content
+    def send_messages(self, messages, model=None, max_tokens=None):
+        """
+        Send messages and return the model's final answer, running any tool calls.
 
+        Tool calls from one turn are executed concurrently and their results fed
+        back until the model answers, up to TOOL_LOOP_MAX_ITERATIONS model turns
+        or TOOL_LOOP_MAX_SECONDS in total.
 
+        Args:
+            messages: List of message objects with role and content
+            model: The model to use (defaults to default_model if None)
+            max_tokens: Maximum tokens for the response
+
+        Returns:
+            The model's response text
+        """
+        model = model or self.default_model
+
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(model, messages, self.tools, max_tokens=max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        conversation = list(messages)
+        deadline = time.monotonic() + TOOL_LOOP_MAX_SECONDS
+        for iteration in range(TOOL_LOOP_MAX_ITERATIONS):
+            allow_tools = iteration < TOOL_LOOP_MAX_ITERATIONS - 1 and time.monotonic() < deadline
+            params = self._completion_params(model, conversation, max_tokens, allow_tools)
+            start = time.perf_counter()
+            with timer("cerebras.chat_completion"), self._lease():
+                resp = self.client.chat.completions.create(**params)
+            message = resp.choices[0].message
+            self._record_usage(model, time.perf_counter() - start, conversation, message.content, getattr(resp, "usage", None))
+
+            if not message.tool_calls:
+                if cache_key:
+                    self.cache.put(cache_key, model, message.content)
+                return message.content
+
+            conversation.extend(self._run_tools(message.content, message.tool_calls, deadline))
+
+        logger.warning(f"Model {model} was still calling tools after {TOOL_LOOP_MAX_ITERATIONS} turns")
+        return TOOL_LOOP_FALLBACK
+
+    def _run_tools(self, content, tool_calls, deadline):
+        """Return the assistant tool-call message followed by one result message per call."""
+        calls = [tool_call_to_dict(tool_call) for tool_call in tool_calls]
+        logger.info(f"Running {len(calls)} tool call(s): {', '.join(c['function']['name'] for c in calls)}")
+        timeout = min(TOOL_CALL_TIMEOUT, max(deadline - time.monotonic(), 0))
+        return [
+            {"role": "assistant", "content": content or "", "tool_calls": calls},
+            *self.tool_executor.run(calls, timeout=timeout),
+        ]
+
+    def _record_usage(self, model, seconds, messages, content, usage):
+        """Record one model turn, estimating token counts when the API doesn't report usage."""
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+            completion_tokens = count_tokens(content or "")
+        self.stats.record(model, seconds, prompt_tokens or 0, completion_tokens or 0)
+
+    def stream_messages(self, messages, model=None, max_tokens=None):
+        """
+        Send messages and yield the response text incrementally as tokens arrive.
 
+        Runs the same tool loop as send_messages, streaming every model turn.
+        Records time-to-first-token and time-to-full-response so the two can be
+        compared against the blocking send_messages in the debug panel.
+
+        Args:
+            messages: List of message objects with role and content
+            model: The model to use (defaults to default_model if None)
+            max_tokens: Maximum tokens for the response
+
+        Yields:
+            str: Response text fragments in order
+        """
+        model = model or self.default_model
+
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(model, messages, self.tools, max_tokens=max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        start = time.perf_counter()
+        first_token = True
+        conversation = list(messages)
+        deadline = time.monotonic() + TOOL_LOOP_MAX_SECONDS
+        try:
+            for iteration in range(TOOL_LOOP_MAX_ITERATIONS):
+                allow_tools = iteration < TOOL_LOOP_MAX_ITERATIONS - 1 and time.monotonic() < deadline
+                params = self._completion_params(model, conversation, max_tokens, allow_tools)
+                parts = []
+                tool_calls = {}
+                usage = None
+                turn_start = time.perf_counter()
+                with self._lease():
+                    stream = self.client.chat.completions.create(stream=True, **params)
+                    try:
+                        for chunk in stream:
+                            usage = getattr(chunk, "usage", None) or usage
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta
+                            for tool_call in delta.tool_calls or []:
+                                _merge_tool_call_delta(tool_calls, tool_call)
+                            if not delta.content:
+                                continue
+                            if first_token:
+                                record_timing("cerebras.time_to_first_token", time.perf_counter() - start)
+                                first_token = False
+                            parts.append(delta.content)
+                            yield delta.content
+                    finally:
+                        stream.close()
+                self._record_usage(model, time.perf_counter() - turn_start, conversation, "".join(parts), usage)
+
+                if not tool_calls:
+                    # Only complete answers are cached
+                    if cache_key:
+                        self.cache.put(cache_key, model, "".join(parts))
+                    return
+
+                ordered_calls = [tool_calls[index] for index in sorted(tool_calls)]
+                conversation.extend(self._run_tools("".join(parts), ordered_calls, deadline))
+
+            logger.warning(f"Model {model} was still calling tools after {TOOL_LOOP_MAX_ITERATIONS} turns")
+            yield TOOL_LOOP_FALLBACK
+        finally:
+            record_timing("cerebras.time_to_full_response", time.perf_counter() - start)
+
+
+def _merge_tool_call_delta(tool_calls, delta):
+    """Accumulate a streamed tool-call fragment into `tool_calls`, keyed by its index."""
+    call = tool_calls.setdefault(
+        delta.index,
+        {"id": None, "type": "function", "function": {"name": "", "arguments": ""}},
+    )
+    if delta.id:
+        call["id"] = delta.id
+    if delta.function:
+        if delta.function.name:
+            call["function"]["name"] += delta.function.name
+        if delta.function.arguments:
+            call["function"]["arguments"] += delta.function.arguments
+
+
+@timed()
 def show_chatbot():
     with st.container():
         textArea = stylable_container(
@@ -310,21 +540,22 @@ def show_chatbot():
         with textArea:
             display_intro()
         try:
-            # Initialize chatbot client
-            if "chatbot_client" not in st.session_state:
-                try:
-                    st.session_state.chatbot_client = ChatbotClient()
-                except ValueError as e:
-                    st.warning(str(e))
-                    st.stop()
-
-            chatbot = st.session_state.chatbot_client
-
-            # Display chat messages stored in history on app rerun
+            # The client is shared process-wide; the session only keeps its messages
+            try:
+                chatbot = get_services().chatbot
+            except ValueError as e:
+                st.warning(str(e))
+                st.stop()
+            init_chat_state()
+
+            # Display the latest chat messages stored in history on app rerun
+            history = st.session_state.messages
             with textArea:
-                for message in st.session_state.messages:
+                if len(history) > CHAT_DISPLAY_MESSAGES:
+                    st.caption(f"{len(history) - CHAT_DISPLAY_MESSAGES} earlier messages are kept in the saved transcript")
+                for message in history[-CHAT_DISPLAY_MESSAGES:]:
                     if message["role"] == "assistant" or message["role"] == "user":
-                        avatar = "assets/eand-logo/small/Red/e&-lockup_Enterprise_engl_vert_red_rgb-cropped.svg" if message["role"] == "assistant" else ":material/person:"
+                        avatar = ASSISTANT_AVATAR if message["role"] == "assistant" else USER_AVATAR
                         with st.chat_message(message["role"], avatar=avatar):
                             st.markdown(message["content"])
 
@@ -356,24 +587,49 @@ def show_chatbot():
                 </style>
             """, unsafe_allow_html=True)
 
+            model_choice = st.selectbox(
+                "Model",
+                options=[AUTO_MODEL, *chatbot.get_available_models()],
+                format_func=lambda m: chatbot.models[m]["name"] if m in chatbot.models else "Auto",
+                key="chat_model",
+                help="Auto sends short lookups to the 8B model and comparisons or negotiations to the 70B one.",
+            )
+
             # Handle user input
             if prompt := st.chat_input("Enter your prompt here...", max_chars=4200):
                 st.session_state.messages.append(
                     {"role": "user", "content": prompt}
                 )
-                messages = copy.deepcopy(st.session_state.messages)
-                if "selected_cart" in st.session_state and st.session_state.selected_cart:
-                    messages.append(
-                        {"role": "user", "content": "This is what the user has hand selected and finds them interesting and placed them in a cart:" + st.session_state.selected_cart}
-                    )
-                if "search_results_string" in st.session_state and st.session_state.search_results_string:
-                    messages.append(
-                        {"role": "user", "content": "This is all result of search:" + st.session_state.search_results_string}
-                    )
-                response = chatbot.send_messages(messages, max_tokens=8000)
+                selected_cart = st.session_state.get("selected_cart")
+                # Only the listings relevant to this prompt go to the model
+                with timer("retrieve_listings"):
+                    listings = retrieve_listings(prompt, st.session_state.get("search_results") or [])
+                route = route_prompt(
+                    prompt,
+                    listing_count=len(listings),
+                    override=None if model_choice == AUTO_MODEL else model_choice,
+                )
+                packed = pack_context(
+                    st.session_state.messages,
+                    SYSTEM_PROMPT,
+                    budget=chatbot.context_budget(route.model, max_tokens=CHAT_MAX_RESPONSE_TOKENS),
+                    cart=selected_cart if isinstance(selected_cart, str) and selected_cart != "empty" else None,
+                    results=get_data_string(listings) if listings else None,
+                )
+                messages = packed.messages
+                if CHAT_STREAMING:
+                    with textArea:
+                        with st.chat_message("user", avatar=USER_AVATAR):
+                            st.markdown(prompt)
+                        with st.chat_message("assistant", avatar=ASSISTANT_AVATAR):
+                            response = st.write_stream(chatbot.stream_messages(messages, model=route.model, max_tokens=CHAT_MAX_RESPONSE_TOKENS))
+                else:
+                    response = chatbot.send_messages(messages, model=route.model, max_tokens=CHAT_MAX_RESPONSE_TOKENS)
                 st.session_state.messages.append(
                     {"role": "assistant", "content": response}
                 )
+                # Fold old turns into the rolling summary without blocking the next prompt
+                get_services().summarizer.maybe_compact(st.session_state.messages)
                 st.rerun()
 
         except Exception as e:
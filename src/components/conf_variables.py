@@ -1,15 +1,132 @@
+from pathlib import Path
 from typing import Dict, List, Tuple
 
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+OUTPUT_DIR = ROOT_DIR / "output"
+
 CARDS_PER_PAGE = 6
 IMAGE_WIDTH = 300
 IMAGE_HEIGHT = 200
 
 DEFAULT_PRICE_RANGE = (0, 100000)
+# Listing prices are in USD; every price shown in the UI and the agreement is in AED
+USD_TO_AED = 3.65
 PRICE_STEP = 100
 DEFAULT_ITEMS_PER_PAGE = 10
 ITEMS_PER_PAGE_OPTIONS = [10, 25, 50, 100]
 MAX_RETRIES = 3
 
+# Render timing instrumentation
+DEBUG_PANEL_ENV = "AMPA_DEBUG"
+METRICS_PORT_ENV = "AMPA_METRICS_PORT"
+TIMING_WINDOW = 1000
+TIMING_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Shared, process-wide HTTP connection pools
+EBAY_POOL_SIZE = 10
+LLM_POOL_SIZE = 20
+LLM_KEEPALIVE_CONNECTIONS = 10
+LLM_TIMEOUT = 60.0
+# Point the chatbot at another OpenAI-compatible server, e.g. benchmarks/llm_stub.py
+LLM_BASE_URL_ENV = "CEREBRAS_BASE_URL"
+
+# Chatbot
+CHAT_STREAMING = True
+CHAT_MAX_RESPONSE_TOKENS = 2048
+MESSAGE_TOKEN_OVERHEAD = 4
+CONTEXT_CART_MAX_SHARE = 0.25
+CONTEXT_RESULTS_MAX_SHARE = 0.6
+# Only the latest messages are rendered; older ones live in the transcript and summary
+CHAT_DISPLAY_MESSAGES = 50
+CHAT_SESSION_PARAM = "chat"
+
+# Chat transcripts and rolling summaries
+TRANSCRIPT_DB_PATH = OUTPUT_DIR / "chat" / "transcripts.sqlite3"
+# Conversations idle this long, or beyond the most recent TRANSCRIPT_MAX_SESSIONS, are deleted
+TRANSCRIPT_RETENTION_DAYS = 30
+TRANSCRIPT_MAX_SESSIONS = 10000
+TRANSCRIPT_PRUNE_SECONDS = 3600
+SUMMARY_MODEL = "llama3.1-8b"
+SUMMARY_TRIGGER_TOKENS = 3000
+SUMMARY_KEEP_RECENT_MESSAGES = 6
+SUMMARY_INPUT_TOKENS = 6000
+SUMMARY_MAX_TOKENS = 400
+SUMMARY_WORKERS = 2
+
+# Chat model routing
+ROUTER_SMALL_MODEL = "llama3.1-8b"
+ROUTER_LARGE_MODEL = "llama-3.3-70b"
+ROUTER_MAX_SIMPLE_TOKENS = 40
+ROUTER_MAX_SIMPLE_LISTINGS = 8
+ROUTER_COMPLEX_SCORE = 2
+ROUTER_COMPLEX_KEYWORDS = (
+    "compare", "comparison", "versus", "vs", "negotiat", "rank", "gold", "silver", "bronze",
+    "recommend", "trade-off", "tradeoff", "analy", "evaluat", "contract", "agreement",
+    "strategy", "pros and cons", "justify", "explain why",
+)
+
+# Background Gold/Silver/Bronze supplier ranking
+# Weights follow the criteria in the chatbot's system prompt
+RANKING_WEIGHTS = {
+    "cost": 0.35,
+    "reliability": 0.25,
+    "specifications": 0.20,
+    "ratings": 0.10,
+    "delivery": 0.10,
+}
+RANKING_TIER_SHARES = {"Gold": 0.2, "Silver": 0.3}
+RANKING_WORKERS = 2
+RANKING_CACHE_ENTRIES = 64
+RANKING_POLL_SECONDS = 1.0
+
+# Listing retrieval for chat prompts
+RETRIEVAL_TOP_K = 15
+RETRIEVAL_BM25_K1 = 1.5
+RETRIEVAL_BM25_B = 0.75
+
+# Chatbot tool calling
+TOOL_MAX_WORKERS = 8
+TOOL_CALL_TIMEOUT = 10.0
+# A call still waiting for a free worker after this long is reported as not run
+TOOL_QUEUE_TIMEOUT = 20.0
+TOOL_LOOP_MAX_ITERATIONS = 4
+TOOL_LOOP_MAX_SECONDS = 45.0
+
+# Chatbot web fetch tool
+FETCH_MAX_BYTES = 2_000_000
+# Upper bound on the timeout the model may ask fetch_url for
+FETCH_MAX_TIMEOUT = 8.0
+FETCH_MAX_TOKENS = 1500
+FETCH_CACHE_TTL = 900
+FETCH_CACHE_ENTRIES = 128
+
+# Completion cache
+COMPLETION_CACHE_PATH = OUTPUT_DIR / "cache" / "completions.sqlite3"
+COMPLETION_CACHE_TTL = 3600
+COMPLETION_CACHE_MEMORY_ENTRIES = 256
+COMPLETION_CACHE_DISK_ENTRIES = 5000
+
+# Supply agreement documents
+AGREEMENT_TEMPLATE_PATH = ROOT_DIR / "assets" / "document_to_edit" / "Supply_Agreement_Arial.html"
+# Normalized, self-contained build of the template (scripts/build_agreement_template.py)
+AGREEMENT_TEMPLATE_BUILD_PATH = AGREEMENT_TEMPLATE_PATH.with_name("Supply_Agreement_Arial.min.html")
+AGREEMENT_TEMPLATE_SOURCE_META = "agreement-source-sha256"
+# Encoding detection only looks at the start of a file
+ENCODING_SAMPLE_BYTES = 64 * 1024
+TEMPLATE_FALLBACK_ENCODINGS = ("utf-8-sig", "utf-16", "windows-1252", "latin-1")
+# PDFs render in a process pool with one worker per core, up to this many
+PDF_RENDER_MAX_WORKERS = 4
+PDF_ERROR_ENTRIES = 32
+PDF_POLL_SECONDS = 0.5
+# Rendered agreements, keyed by template version, seller, line items and date
+PDF_CACHE_DIR = OUTPUT_DIR / "cache" / "agreements"
+PDF_CACHE_MEMORY_BYTES = 64 * 1024 * 1024
+PDF_CACHE_DISK_BYTES = 512 * 1024 * 1024
+# Orders with this many line items list them in a schedule of goods, laid out
+# in parts of SCHEDULE_ROWS_PER_PART rows so render memory does not grow with the order
+LARGE_ORDER_ITEMS = 200
+SCHEDULE_ROWS_PER_PART = 250
+
 ERROR_MESSAGES = {
     "api_error": "An error occurred while searching eBay. Please try again later.",
     "invalid_category": "Invalid category selected. Please try again.",
@@ -0,0 +1,241 @@
+import re
+import math
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+from src.components.conf_variables import (
+    CONTEXT_CART_MAX_SHARE,
+    CONTEXT_RESULTS_MAX_SHARE,
+    MESSAGE_TOKEN_OVERHEAD,
+)
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+CART_PREFIX = "This is what the user has hand selected and finds them interesting and placed them in a cart:"
+RESULTS_PREFIX = "This is all result of search:"
+MEMORY_PREFIX = "Summary of the earlier conversation with this user:\n"
+TRUNCATION_MARKER = "\n[... truncated to fit the context window]"
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of Llama tokens in `text`.
+
+    Counts words and punctuation, charging long words one token per six
+    characters. This errs slightly high for English, which keeps packed
+    prompts under the real limit without needing the model's tokenizer.
+    """
+    if not text:
+        return 0
+    return sum(max(1, math.ceil(len(piece) / 6)) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def count_message_tokens(message: Dict[str, str]) -> int:
+    return count_tokens(message.get("content") or "") + MESSAGE_TOKEN_OVERHEAD
+
+
+@lru_cache(maxsize=8)
+def _system_tokens(system_prompt: str) -> int:
+    """Token count of a system prompt message; the prompt is the same on every request."""
+    return count_message_tokens({"role": "system", "content": system_prompt})
+
+
+def _cut_tokens(text: str, budget: int) -> str:
+    """The longest prefix of `text` ending at a token boundary that fits in `budget` tokens."""
+    end = 0
+    used = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        used += max(1, math.ceil(len(match.group()) / 6))
+        if used > budget:
+            break
+        end = match.end()
+    return text[:end]
+
+
+def truncate_lines(text: str, budget: int, whole_lines: bool = False) -> str:
+    """
+    Keep whole lines from the start of `text` until `budget` tokens are used.
+
+    When not even the first line fits, it is cut at a token boundary
+    instead, so single-line text (minified JSON, a long paragraph) isn't
+    lost entirely, unless `whole_lines` is set.
+
+    Returns:
+        str: The kept prefix, with a truncation marker if anything was
+            dropped; empty if nothing fits
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    budget -= count_tokens(TRUNCATION_MARKER)
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        line_tokens = count_tokens(line)
+        if used + line_tokens > budget:
+            break
+        kept.append(line)
+        used += line_tokens
+    if not kept and not whole_lines:
+        kept = [_cut_tokens(text, budget)]
+    if not any(kept):
+        return ""
+    return "\n".join(kept) + TRUNCATION_MARKER
+
+
+def _message_tokens(history: Sequence[Dict[str, str]], index: int) -> int:
+    """Use the token count cached by a ConversationLog when available."""
+    if hasattr(history, "message_tokens"):
+        return history.message_tokens(index)
+    return count_message_tokens(history[index])
+
+
+def _count_turns(history: Sequence[Dict[str, str]], end: int) -> int:
+    if hasattr(history, "message_tokens"):
+        # The session's ConversationLog doesn't store the system prompt
+        return end
+    return sum(1 for message in history[:end] if message.get("role") != "system")
+
+
+@dataclass
+class PackedContext:
+    messages: List[Dict[str, str]]
+    tokens: int
+    original_tokens: int
+    dropped_messages: int = 0
+    summarized_messages: int = 0
+    truncated: List[str] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def pack_context(
+    history: Sequence[Dict[str, str]],
+    system_prompt: str,
+    budget: int,
+    cart: Optional[str] = None,
+    results: Optional[str] = None,
+) -> PackedContext:
+    """
+    Fit the conversation, cart and search results into a token budget.
+
+    Priority, highest first:
+        1. the system prompt (exactly one; system messages in history are dropped)
+        2. the latest user message
+        3. the history's rolling summary, if it has one
+        4. the cart, capped at CONTEXT_CART_MAX_SHARE of what remains
+        5. the search results, capped at CONTEXT_RESULTS_MAX_SHARE of what remains
+        6. earlier turns after the summary, newest first, as whole messages
+
+    Cart and results are truncated by whole lines from the end. The output
+    order is system prompt, summary, earlier turns, cart, results, latest
+    message.
+
+    Args:
+        history: Conversation so far, ending with the latest user message
+        system_prompt: The single system prompt to send
+        budget: Maximum prompt tokens
+        cart: Cart listing string, if any
+        results: Search results string, if any
+
+    Returns:
+        PackedContext: The messages to send plus token accounting
+    """
+    # Walk the history from the end so only the turns that are sent get touched
+    last = len(history) - 1
+    while last >= 0 and history[last].get("role") == "system":
+        last -= 1
+    latest = history[last] if last >= 0 and history[last].get("role") == "user" else None
+    earlier_end = last if latest else last + 1
+
+    system_message = {"role": "system", "content": system_prompt}
+    summary = getattr(history, "summary", None)
+    # Turns before `start` are covered by the summary and never walked
+    start = min(history.summarized_upto, earlier_end) if summary else 0
+    cart_message = {"role": "user", "content": CART_PREFIX + cart} if cart else None
+    results_message = {"role": "user", "content": RESULTS_PREFIX + results} if results else None
+
+    history_tokens = getattr(history, "total_tokens", None)
+    if history_tokens is None:
+        history_tokens = sum(count_message_tokens(m) for m in history if m.get("role") != "system")
+    system_tokens = _system_tokens(system_prompt)
+    original_tokens = system_tokens + history_tokens
+    for message in (cart_message, results_message):
+        if message:
+            original_tokens += count_message_tokens(message)
+
+    truncated = []
+    remaining = budget - system_tokens
+
+    if latest:
+        latest_tokens = _message_tokens(history, last)
+        if latest_tokens > remaining:
+            latest = {"role": "user", "content": truncate_lines(latest["content"], remaining - MESSAGE_TOKEN_OVERHEAD)}
+            latest_tokens = count_message_tokens(latest)
+            truncated.append("prompt")
+        remaining -= latest_tokens
+
+    memory = []
+    if summary:
+        memory_message = {"role": "system", "content": MEMORY_PREFIX + summary}
+        memory_tokens = count_message_tokens(memory_message)
+        if memory_tokens <= remaining:
+            memory.append(memory_message)
+            remaining -= memory_tokens
+        else:
+            truncated.append("summary")
+
+    context_messages = []
+    for name, prefix, content, share in (
+        ("cart", CART_PREFIX, cart, CONTEXT_CART_MAX_SHARE),
+        ("results", RESULTS_PREFIX, results, CONTEXT_RESULTS_MAX_SHARE),
+    ):
+        if not content or remaining <= MESSAGE_TOKEN_OVERHEAD:
+            continue
+        cap = int(remaining * share) - MESSAGE_TOKEN_OVERHEAD - count_tokens(prefix)
+        # A partial listing row would misstate the listing
+        kept = truncate_lines(content, cap, whole_lines=True)
+        if kept != content:
+            truncated.append(name)
+        if not kept:
+            continue
+        message = {"role": "user", "content": prefix + kept}
+        remaining -= count_message_tokens(message)
+        context_messages.append(message)
+
+    kept_turns = []
+    for index in range(earlier_end - 1, start - 1, -1):
+        message = history[index]
+        if message.get("role") == "system":
+            continue
+        message_tokens = _message_tokens(history, index)
+        if message_tokens > remaining:
+            break
+        kept_turns.append(message)
+        remaining -= message_tokens
+    kept_turns.reverse()
+
+    messages = [system_message, *memory, *kept_turns, *context_messages]
+    if latest:
+        messages.append(latest)
+
+    packed = PackedContext(
+        messages=messages,
+        tokens=budget - remaining,
+        original_tokens=original_tokens,
+        dropped_messages=_count_turns(history, earlier_end) - start - len(kept_turns),
+        summarized_messages=start,
+        truncated=truncated,
+    )
+    logger.info(
+        f"Packed chat context: {packed.tokens}/{budget} tokens, "
+        f"saved {packed.saved_tokens} of {packed.original_tokens} "
+        f"(summarized {packed.summarized_messages}, dropped {packed.dropped_messages} turns, "
+        f"truncated {', '.join(truncated) or 'nothing'})"
+    )
+    return packed
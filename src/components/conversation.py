@@ -0,0 +1,83 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from src.components.context_packer import count_message_tokens
+
+
+class ConversationLog(Sequence):
+    """
+    Append-only chat history.
+
+    Messages are stored once and never mutated, so outgoing requests can
+    reference them directly instead of deep-copying the history on every
+    prompt. Token counts are computed once at append time, which lets the
+    context packer walk only the turns it actually sends.
+
+    With a `store`, every message is also written to the session's
+    transcript, and a rolling summary can stand in for the oldest turns.
+    """
+
+    def __init__(self, messages: Sequence[Dict[str, str]] = (), session_id: Optional[str] = None, store=None):
+        self._messages: List[Dict[str, str]] = []
+        self._tokens: List[int] = []
+        self._total_tokens = 0
+        self._summary: Tuple[Optional[str], int] = (None, 0)
+        self.session_id = session_id
+        self.store = store
+        for message in messages:
+            self.append(message)
+
+    @classmethod
+    def resume(cls, session_id: str, store) -> "ConversationLog":
+        """Rebuild a session's log from its stored transcript and summary."""
+        log = cls(session_id=session_id)
+        messages, summary = store.load(session_id)
+        for message, tokens in messages:
+            log._add(message, tokens)
+        if summary:
+            log.set_summary(*summary)
+        log.store = store
+        return log
+
+    def append(self, message: Dict[str, str]) -> None:
+        """Add a message. The dict is copied once so later edits by the caller can't leak in."""
+        message = dict(message)
+        tokens = count_message_tokens(message)
+        self._add(message, tokens)
+        if self.store is not None:
+            self.store.append(self.session_id, len(self._messages) - 1, message, tokens)
+
+    def _add(self, message: Dict[str, str], tokens: int) -> None:
+        self._messages.append(message)
+        self._tokens.append(tokens)
+        self._total_tokens += tokens
+
+    def message_tokens(self, index: int) -> int:
+        return self._tokens[index]
+
+    @property
+    def total_tokens(self) -> int:
+        return self._total_tokens
+
+    @property
+    def summary(self) -> Optional[str]:
+        """Summary of the messages before `summarized_upto`, if any."""
+        return self._summary[0]
+
+    @property
+    def summarized_upto(self) -> int:
+        return self._summary[1]
+
+    def set_summary(self, summary: str, upto: int) -> None:
+        # One assignment so a background summarizer never exposes a half-updated pair
+        self._summary = (summary, upto)
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self._messages[index]
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __repr__(self) -> str:
+        return f"ConversationLog({len(self)} messages, {self._total_tokens} tokens)"
@@ -1,16 +1,29 @@
-import streamlit as st
-import random
-import os
+import codecs
+import hashlib
 from pathlib import Path
 import logging
-from datetime import datetime
-from bs4 import BeautifulSoup
-import chardet
 import re
-from src.components.cart import Cart
-from typing import Dict, Any
-from weasyprint import HTML
+from datetime import datetime
+from src.components.assets import asset_cache, read_text
+from src.components.agreement_template import (
+    agreement_context,
+    agreement_key,
+    agreement_stylesheet,
+    compile_agreement_template,
+    schedule_parts,
+    SCHEDULE_STYLESHEET,
+)
+from src.components.services import get_services
+from src.components.conf_variables import (
+    AGREEMENT_TEMPLATE_BUILD_PATH,
+    AGREEMENT_TEMPLATE_PATH,
+    AGREEMENT_TEMPLATE_SOURCE_META,
+    ENCODING_SAMPLE_BYTES,
+    TEMPLATE_FALLBACK_ENCODINGS,
+)
+from typing import Dict, Any, List, Optional
 import io
+import zipfile
 
 logger = logging.getLogger(__name__)
 
@@ -28,129 +41,131 @@ SAMPLE_COUNTRIES = [
     "Netherlands, Amsterdam"
 ]
 
-def detect_encoding(file_path):
-    """Detect the encoding of a file using chardet."""
+def _sniff_encoding(data: bytes):
+    """Guess the encoding of the first ENCODING_SAMPLE_BYTES of `data` with chardet."""
+    import chardet
+
+    return chardet.detect(data[:ENCODING_SAMPLE_BYTES])['encoding']
+
+def _looks_like_utf16(data: bytes) -> bool:
+    """A UTF-16 BOM, or a zero byte in every other position as in UTF-16 markup."""
+    if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        return True
+    sample = data[:ENCODING_SAMPLE_BYTES]
+    return len(sample) >= 2 and max(sample[0::2].count(0), sample[1::2].count(0)) > len(sample) // 4
+
+def _decode_template(file_path: Path) -> str:
+    """Read a Word-exported template, trying the detected encoding then common fallbacks."""
     with open(file_path, 'rb') as file:
-        raw_data = file.read()
-        result = chardet.detect(raw_data)
-        return result['encoding']
+        data = file.read()
+    encoding = _sniff_encoding(data)
+    # UTF-16 decodes almost any even-length bytes, so it is only a fallback for data that looks like it
+    fallbacks = [enc for enc in TEMPLATE_FALLBACK_ENCODINGS if enc != 'utf-16' or _looks_like_utf16(data)]
+    for enc in (encoding, *fallbacks):
+        try:
+            # Same newline handling as reading the file in text mode
+            return data.decode(enc).replace('\r\n', '\n').replace('\r', '\n')
+        except (UnicodeDecodeError, LookupError, TypeError):
+            continue
+    raise ValueError("Could not read file with any known encoding")
+
+def read_template_source(file_path) -> str:
+    """Return the decoded Word template, cached until the file changes."""
+    return asset_cache.load(file_path, _decode_template)
+
+def _sha256(file_path: Path) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def read_agreement_template(file_path) -> str:
+    """
+    Return the agreement template, cached until the file changes.
+
+    Prefers the normalized build from scripts/build_agreement_template.py
+    while it was built from the current version of `file_path`.
+    """
+    if Path(file_path) == AGREEMENT_TEMPLATE_PATH and AGREEMENT_TEMPLATE_BUILD_PATH.exists():
+        built = read_text(AGREEMENT_TEMPLATE_BUILD_PATH)
+        source_digest = asset_cache.load(file_path, _sha256)
+        if f'content="{source_digest}" name="{AGREEMENT_TEMPLATE_SOURCE_META}"' in built[:1024]:
+            return built
+        logger.warning(f"{AGREEMENT_TEMPLATE_BUILD_PATH.name} is out of date; using {Path(file_path).name}")
+    return read_template_source(file_path)
+
+def supplier_address(seller_name: str) -> str:
+    """Sample address for a seller; the same seller always gets the same one."""
+    digest = hashlib.sha256(seller_name.encode("utf-8")).digest()
+    return SAMPLE_COUNTRIES[int.from_bytes(digest[:4], "big") % len(SAMPLE_COUNTRIES)]
+
+def _fill(html_content: str, seller_info: dict, date: Optional[str], shared_styles: bool, with_schedule: bool) -> List[str]:
+    from markupsafe import Markup
 
-def fill_agreement_template(html_content: str, seller_info: dict) -> str:
-    """Fill the agreement template with seller information."""
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Get current date
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        
-        # Find and replace all text nodes
-        for element in soup.find_all(string=True):
-            if '[DATE]' in str(element):
-                element.replace_with(str(element).replace('[DATE]', current_date))
-            elif '[SUPPLIER NAME]' in str(element):
-                element.replace_with(str(element).replace('[SUPPLIER NAME]', seller_info.get('seller', 'Unknown Seller')))
-            elif '[SUPPLIER ADDRESS]' in str(element):
-                supplier_address = random.choice(SAMPLE_COUNTRIES)
-                element.replace_with(str(element).replace('[SUPPLIER ADDRESS]', supplier_address))
-            elif '[CUSTOMER NAME]' in str(element):
-                element.replace_with(str(element).replace('[CUSTOMER NAME]', "AMPA Procurement"))
-            elif '[CUSTOMER ADDRESS]' in str(element):
-                element.replace_with(str(element).replace('[CUSTOMER ADDRESS]', "Dubai, United Arab Emirates"))
-
-        # Get all items for this seller
-        seller_items = seller_info.get('items', [])
-        if not seller_items:  # If no items list provided, treat seller_info as a single item
-            seller_items = [seller_info]
-            
-        logger.info(f"Processing {len(seller_items)} items for seller {seller_info.get('seller', 'Unknown Seller')}")
-            
-        # Calculate total price for all items
-        total_price = sum(float(item.get('price', 0)) * 3.65 for item in seller_items)
-        logger.info(f"Total price calculated: AED {total_price:.2f}")
-
-        # Find the ordered list that contains the items
-        ordered_list = soup.find('ol')
-        if ordered_list:
-            # Remove all existing list items
-            for item in ordered_list.find_all('li'):
-                item.decompose()
-            
-            # Create new list items for each product
-            for item in seller_items:
-                product_title = item.get('title', 'Unknown Product')
-                product_price = float(item.get('price', 0)) * 3.65
-                product_condition = item.get('condition', 'Not specified')
-                
-                # Create product description
-                product_description = f"{product_title} - {product_condition} - AED {product_price:.2f}"
-                logger.info(f"Adding product to agreement: {product_description}")
-                
-                # Create new list item
-                new_li = soup.new_tag('li')
-                new_li['class'] = 'MsoNormal'
-                new_li['style'] = 'mso-margin-top-alt:auto;mso-margin-bottom-alt:auto;mso-list:l4 level1 lfo3;tab-stops:list 36.0pt'
-                
-                # Create span for the text
-                span = soup.new_tag('span')
-                span['lang'] = 'EN-US'
-                span['style'] = 'font-size:12.0pt;font-family:"Calibri",sans-serif;mso-fareast-font-family:"MS PGothic"'
-                span.string = product_description
-                
-                new_li.append(span)
-                ordered_list.append(new_li)
-                logger.info(f"Successfully added product to list: {product_title}")
-
-        # Find the PRICE heading and its following paragraph
-        price_heading = soup.find('strong', string=lambda text: text and 'PRICE' in text)
-        if price_heading:
-            # Get the parent paragraph
-            price_section = price_heading.find_parent('p')
-            if price_section:
-                # Find the next paragraph that contains the price description
-                price_desc_para = price_section.find_next_sibling('p')
-                if price_desc_para:
-                    # Create a new paragraph for the price display
-                    price_display = soup.new_tag('p')
-                    price_display['style'] = 'font-size: 18pt; font-weight: bold; text-align: center; color: #000000; margin: 20px 0;'
-                    
-                    # If multiple items, show "Total Agreed Price", otherwise just "Agreed Price"
-                    price_label = "Total Agreed Price" if len(seller_items) > 1 else "Agreed Price"
-                    price_display.string = f"{price_label}: AED {total_price:.2f}"
-                    logger.info(f"Added price display: {price_label}: AED {total_price:.2f}")
-                    
-                    # Insert the price display after the price description paragraph
-                    price_desc_para.insert_after(price_display)
-        
-        # Update signature section
-        signature_sections = soup.find_all('td')
-        for section in signature_sections:
-            if section.find(string=lambda text: text and 'SUPPLIER' in text):
-                # Find the print name field (underlined field)
-                name_field = section.find('u')
-                if name_field:
-                    name_field.string = seller_info.get('seller', 'Unknown Seller')
-                # Find the date field
-                date_fields = section.find_all('p')
-                for field in date_fields:
-                    if field.get_text() and 'Date' in field.get_text():
-                        field.string = f"Date: {current_date}"
-            elif section.find(string=lambda text: text and 'CUSTOMER' in text):
-                # Find the print name field (underlined field)
-                name_field = section.find('u')
-                if name_field:
-                    name_field.string = "AMPA Procurement Representative"
-                # Find the date field
-                date_fields = section.find_all('p')
-                for field in date_fields:
-                    if field.get_text() and 'Date' in field.get_text():
-                        field.string = f"Date: {current_date}"
-        
-        logger.info("Successfully filled agreement template")
-        return str(soup)
+        # Parsed and compiled once per template; each fill is a string render
+        template = compile_agreement_template(html_content)
+        seller_name = seller_info.get('seller', 'Unknown Seller')
+        context = agreement_context(seller_info, supplier_address=supplier_address(seller_name), date=date)
+        context['styles'] = '' if shared_styles else Markup(f"<style>{agreement_stylesheet(html_content)}</style>")
+        documents = [template.render(context)]
+        if with_schedule:
+            schedule_styles = '' if shared_styles else Markup(f"<style>{SCHEDULE_STYLESHEET}</style>")
+            documents.extend(schedule_parts(context, styles=schedule_styles))
+        logger.info(f"Successfully filled agreement template ({len(documents)} documents)")
+        return documents
     except Exception as e:
         logger.error(f"Error filling agreement template: {str(e)}")
         raise
 
+def fill_agreement_template(html_content: str, seller_info: dict, date: Optional[str] = None, shared_styles: bool = False) -> str:
+    """
+    Fill the agreement template with seller information.
+
+    With `shared_styles`, the template's stylesheet is left out of the
+    document so the PDF renderer can apply its pre-parsed copy instead.
+    Large orders only refer to their schedule of goods here; see
+    fill_agreement_documents.
+    """
+    return _fill(html_content, seller_info, date, shared_styles, with_schedule=False)[0]
+
+def fill_agreement_documents(html_content: str, seller_info: dict, date: Optional[str] = None, shared_styles: bool = False) -> List[str]:
+    """
+    Fill the agreement and, for a large order, the parts of its schedule of goods.
+
+    With `shared_styles`, the documents leave out the agreement and schedule
+    stylesheets; pass both to the PDF renderer instead.
+
+    Returns:
+        List[str]: The agreement, then one document per schedule part
+    """
+    return _fill(html_content, seller_info, date, shared_styles, with_schedule=True)
+
+def agreement_pdf_key(seller_info: dict, date: Optional[str] = None) -> str:
+    """Content key of a seller's agreement PDF for `date` (today by default)."""
+    html_content = read_agreement_template(AGREEMENT_TEMPLATE_PATH)
+    return agreement_key(html_content, seller_info, date or datetime.now().strftime("%Y-%m-%d"))
+
+def request_agreement_pdf(seller_info: dict) -> str:
+    """
+    Get a seller's agreement PDF from the cache, or start rendering it.
+
+    Returns:
+        str: Key to poll with get_services().pdf_renderer.result()
+    """
+    html_content = read_agreement_template(AGREEMENT_TEMPLATE_PATH)
+    date = datetime.now().strftime("%Y-%m-%d")
+    key = agreement_key(html_content, seller_info, date)
+    renderer = get_services().pdf_renderer
+    if renderer.result(key) is None:
+        html, *schedule = fill_agreement_documents(html_content, seller_info, date=date, shared_styles=True)
+        renderer.submit(
+            html,
+            base_url=str(AGREEMENT_TEMPLATE_PATH.parent),
+            key=key,
+            stylesheets=(agreement_stylesheet(html_content), SCHEDULE_STYLESHEET),
+            appendices=schedule,
+        )
+    return key
+
 def group_items_by_seller(cart_items):
     """Group cart items by seller and return a dictionary of seller information with their items."""
     sellers = {}
@@ -167,169 +182,97 @@ def group_items_by_seller(cart_items):
             sellers[seller_name]['items'].append(item)
     return sellers
 
-@st.dialog("Email Template")
-def show_email_dialog(supplier: Dict[str, Any]) -> None:
-    """Display the email template dialog for a specific supplier."""
-    try:
-        if not supplier:
-            st.error("No supplier data available")
+def agreement_file_name(seller_name: str) -> str:
+    """File name of a seller's agreement PDF, safe inside a ZIP on any platform."""
+    safe_name = re.sub(r'[^\w.-]+', '_', seller_name).strip('_') or 'Unknown'
+    return f"Supply_Agreement_{safe_name}.pdf"
+
+def agreement_file_names(seller_names) -> Dict[str, str]:
+    """
+    A distinct agreement file name per seller.
+
+    Different names can sanitize to the same file name ("a b" and "a_b"),
+    so later ones get a numeric suffix; compared case-insensitively, as on
+    Windows and macOS file systems.
+    """
+    file_names = {}
+    used = set()
+    for seller_name in seller_names:
+        file_name = agreement_file_name(seller_name)
+        stem, suffix = file_name[:-len(".pdf")], 2
+        while file_name.lower() in used:
+            file_name = f"{stem}_{suffix}.pdf"
+            suffix += 1
+        used.add(file_name.lower())
+        file_names[seller_name] = file_name
+    return file_names
+
+class AgreementBundle:
+    """
+    One ZIP with the agreement of every seller in the cart.
+
+    start() requests every seller's PDF at once, so the render pool works on
+    them in parallel and cached agreements are ready immediately. collect()
+    adds each PDF to the archive as soon as it is finished.
+    """
+
+    def __init__(self, keys: Dict[str, str]):
+        # Seller name -> job key
+        self.keys = keys
+        self.file_names = agreement_file_names(keys)
+        # Seller name -> error
+        self.failed: Dict[str, str] = {}
+        self._added = set()
+        self._buffer = io.BytesIO()
+        self._zip = zipfile.ZipFile(self._buffer, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    @classmethod
+    def start(cls, cart_items) -> "AgreementBundle":
+        sellers = group_items_by_seller(cart_items)
+        logger.info(f"Generating agreements for {len(sellers)} sellers")
+        return cls({
+            seller_name: request_agreement_pdf(seller_info)
+            for seller_name, seller_info in sellers.items()
+        })
+
+    @property
+    def total(self) -> int:
+        return len(self.keys)
+
+    @property
+    def finished(self) -> int:
+        return len(self._added) + len(self.failed)
+
+    @property
+    def complete(self) -> bool:
+        return self._zip is None
+
+    def collect(self) -> None:
+        """Add newly finished PDFs to the archive; closes it once every seller is done."""
+        if self.complete:
             return
-            
-        # Email subject
-        subject = st.text_input(
-            "Subject",
-            value=f"Inquiry about {supplier.get('title', 'product')} - AMPA Procurement Platform",
-            key=f"email_subject_{supplier.get('id', hash(str(supplier)))}"
-        )
-        
-        # Email body template
-        default_body = f"""Dear {supplier.get('seller', 'Supplier')},
-
-I am interested in your product "{supplier.get('title', 'product')}" and would like to discuss potential business opportunities. I found your listing through the AMPA Procurement Platform.
-
-Product Details:
-- {supplier.get('title', 'product')} (Price: AED {float(supplier.get('price', 0)) * 3.65:.2f})
-
-Please provide the following information:
-1. Minimum Order Quantity (MOQ)
-2. Lead Time
-3. Payment Terms
-4. Shipping Options and Costs
-5. Product Specifications and Certifications
-
-Looking forward to your response.
-
-Best regards,
-[Your Name]
-AMPA Procurement Platform User
-"""
-        
-        body = st.text_area(
-            "Email Body",
-            value=default_body,
-            height=300,
-            key=f"email_body_{supplier.get('id', hash(str(supplier)))}"
-        )
-        
-        # --- Prepare the download data if available ---
-        download_ready = False
-        download_data = None
-        download_filename = None
-
-        cart = Cart()
-        root_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent
-        agreement_file = root_dir / 'assets' / 'document_to_edit' / 'Supply_Agreement_Arial.html'
-
-        if agreement_file.exists():
-            encoding = detect_encoding(agreement_file)
-            html_content = None
-            for enc in [encoding, 'utf-16', 'utf-8-sig', 'windows-1252', 'latin-1']:
-                try:
-                    with open(agreement_file, 'r', encoding=enc) as file:
-                        html_content = file.read()
-                        break
-                except UnicodeDecodeError:
-                    continue
-            if html_content:
-                seller_name = supplier.get('seller', 'Unknown Seller')
-                seller_items = [item for item in cart.items if item.get('seller') == seller_name]
-                if seller_items:
-                    seller_info = {'seller': seller_name, 'items': seller_items}
-                    html_content = fill_agreement_template(html_content, seller_info)
-                    download_ready = True
-                    download_data = html_content
-                    download_filename = f"Supply_Agreement_{seller_name}.html"
-
-        # Both buttons use st.button and will be styled identically by global style.css
-        send_clicked = st.button("Send Email", key=f"send_email_button_{supplier.get('id', hash(str(supplier)))}")
-        agreement_clicked = st.button("Agreement", key=f"agreement_button_{supplier.get('id', hash(str(supplier)))}")
-        if agreement_clicked and download_ready:
-            try:
-                pdf_io = io.BytesIO()
-                HTML(string=download_data, base_url=str(agreement_file.parent)).write_pdf(pdf_io)
-                pdf_bytes = pdf_io.getvalue()
-                st.download_button(
-                    label="Download Agreement (PDF)",
-                    data=pdf_bytes,
-                    file_name=download_filename.replace('.html', '.pdf'),
-                    mime="application/pdf",
-                    key=f"download_agreement_pdf_{hash(str(supplier))}"
-                )
-            except Exception as e:
-                st.error(f"Failed to generate PDF: {e}")
-        if send_clicked:
-            st.success("Email has been sent successfully!")
-            st.rerun()
+        renderer = get_services().pdf_renderer
+        for seller_name, key in self.keys.items():
+            if seller_name in self._added or seller_name in self.failed:
+                continue
+            running = renderer.is_running(key)
+            # Checked after is_running: a job is cached before it stops running
+            pdf_bytes = renderer.result(key)
+            if pdf_bytes is not None:
+                self._zip.writestr(self.file_names[seller_name], pdf_bytes)
+                self._added.add(seller_name)
+            elif not running:
+                self.failed[seller_name] = renderer.error(key) or "render failed"
+        if self.finished == self.total:
+            self._zip.close()
+            self._zip = None
 
-    except Exception as e:
-        logger.error(f"Error displaying email dialog: {str(e)}")
-        st.error(f"Error displaying email dialog: {str(e)}")
+    def matches(self, cart_items) -> bool:
+        """Whether the bundle still covers exactly today's agreements for `cart_items`."""
+        return self.keys == {
+            seller_name: agreement_pdf_key(seller_info)
+            for seller_name, seller_info in group_items_by_seller(cart_items).items()
+        }
 
-def open_supply_agreement(seller_info: dict = None):
-    """Triggers download of the Supply Agreement HTML file with filled details."""
-    try:
-        # Get the absolute path to the application root directory
-        root_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent
-        agreement_file = root_dir / 'assets' / 'document_to_edit' / 'Supply_Agreement_Arial.html'
-        
-        if agreement_file.exists():
-            # First detect the file encoding
-            encoding = detect_encoding(agreement_file)
-            
-            # Try reading with detected encoding, fallback to common encodings if that fails
-            encodings_to_try = [encoding, 'utf-16', 'utf-8-sig', 'windows-1252', 'latin-1']
-            html_content = None
-            
-            for enc in encodings_to_try:
-                try:
-                    with open(agreement_file, 'r', encoding=enc) as file:
-                        html_content = file.read()
-                        break
-                except UnicodeDecodeError:
-                    continue
-            
-            if html_content is None:
-                raise ValueError("Could not read file with any known encoding")
-                
-            if seller_info:
-                # Get cart instance
-                cart = Cart()
-                
-                # Get all items from the same seller
-                seller_name = seller_info.get('seller', 'Unknown Seller')
-                seller_items = [
-                    item for item in cart.items 
-                    if item.get('seller') == seller_name
-                ]
-                
-                if seller_items:
-                    # Create a new seller_info dict with all items
-                    seller_info = {
-                        'seller': seller_name,
-                        'items': seller_items
-                    }
-                
-                # Fill the template with seller information
-                html_content = fill_agreement_template(html_content, seller_info)
-                # PDF download button only
-                try:
-                    pdf_io = io.BytesIO()
-                    HTML(string=html_content, base_url=str(agreement_file.parent)).write_pdf(pdf_io)
-                    pdf_bytes = pdf_io.getvalue()
-                    st.download_button(
-                        label="Agreement",
-                        data=pdf_bytes,
-                        file_name=f"Supply_Agreement_{seller_info.get('seller', 'Unknown')}.pdf",
-                        mime="application/pdf",
-                        key=f"download_agreement_pdf_{seller_info.get('id', hash(str(seller_info)))}"
-                    )
-                except Exception as e:
-                    st.error(f"Failed to generate PDF: {e}")
-                return True
-        else:
-            st.error(f"Supply Agreement file not found at: {agreement_file}")
-            return False
-    except Exception as e:
-        logger.error(f"Error preparing Supply Agreement download: {str(e)}")
-        st.error(f"Error preparing Supply Agreement download: {str(e)}")
-        return False
\ No newline at end of file
+    def zip_bytes(self) -> bytes:
+        return self._buffer.getvalue()
@@ -2,10 +2,20 @@ import requests
 from typing import List, Dict, Any, Optional
 import os
 import random
+import threading
+from contextlib import nullcontext
 from dotenv import load_dotenv
 
 class EbayAPI:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None, pool=None):
+        """
+        Initialize the eBay client with credentials from the environment.
+
+        Args:
+            session (requests.Session): Shared session whose connection pool is reused
+                across requests. Defaults to module-level requests calls.
+            pool: Optional ConnectionPool used to cap and report concurrent requests.
+        """
         load_dotenv()
         self.client_id = os.getenv("EBAY_CLIENT_ID")
         self.client_secret = os.getenv("EBAY_CLIENT_SECRET")
@@ -14,12 +24,24 @@ class EbayAPI:
         self.auth_url = "https://api.ebay.com/identity/v1/oauth2/token"
         self.search_url = "https://api.ebay.com/buy/browse/v1/item_summary/search"
         self._access_token = None
+        self._token_lock = threading.Lock()
+        self._http = session or requests
+        self._pool = pool
+
+    def _lease(self):
+        return self._pool.lease() if self._pool else nullcontext()
 
     def _get_access_token(self) -> str:
         """Get or refresh the access token."""
         if self._access_token:
             return self._access_token
 
+        with self._token_lock:
+            if self._access_token:
+                return self._access_token
+            return self._request_access_token()
+
+    def _request_access_token(self) -> str:
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         data = {
             "grant_type": "client_credentials",
@@ -27,12 +49,13 @@ class EbayAPI:
         }
 
         try:
-            response = requests.post(
-                self.auth_url,
-                headers=headers,
-                data=data,
-                auth=(self.client_id, self.client_secret)
-            )
+            with self._lease():
+                response = self._http.post(
+                    self.auth_url,
+                    headers=headers,
+                    data=data,
+                    auth=(self.client_id, self.client_secret)
+                )
             response.raise_for_status()
             self._access_token = response.json()["access_token"]
             return self._access_token
@@ -67,7 +90,8 @@ class EbayAPI:
             params["filter"] = filters
 
         try:
-            response = requests.get(self.search_url, headers=headers, params=params)
+            with self._lease():
+                response = self._http.get(self.search_url, headers=headers, params=params)
             response.raise_for_status()
             return response.json().get("itemSummaries", [])
         except Exception as e:
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+# Column order of the encoded rows; documented in the header line
+COLUMNS = ("#", "title", "price_usd", "condition", "seller", "rating", "verified", "reviews")
+
+
+def _clean(value: Any) -> str:
+    """Make a value safe for one pipe-delimited cell."""
+    return " ".join(str(value).split()).replace("|", "/")
+
+
+def _price(value: Any) -> str:
+    try:
+        return f"{float(str(value).replace(',', '').replace('$', '')):.2f}".rstrip("0").rstrip(".")
+    except (TypeError, ValueError):
+        return ""
+
+
+def _rating(value: Any) -> str:
+    try:
+        return f"{float(value):g}"
+    except (TypeError, ValueError):
+        return ""
+
+
+def _comments(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [_clean(comment) for comment in value if str(comment).strip()]
+    if value and str(value).strip() and value != "Unknown":
+        return [_clean(value)]
+    return []
+
+
+def encode_listings(items: Sequence[Dict[str, Any]]) -> str:
+    """
+    Encode listings as a compact table for the LLM context.
+
+    Review comments are deduplicated into a numbered lookup table that comes
+    first, and each row lists the ids of its reviews. Rows follow a single
+    header line, with the price normalized to plain USD, the rating as a
+    number and verified as Y/N. Because the lookup table comes first,
+    truncating the text by whole lines from the end only drops rows.
+
+    Args:
+        items: Listings as produced by EbayAPI.format_item
+
+    Returns:
+        str: The encoded table, or "" when there are no items
+    """
+    if not items:
+        return ""
+
+    review_ids: Dict[str, int] = {}
+    rows = []
+    for number, item in enumerate(items, start=1):
+        ids = []
+        for comment in _comments(item.get("comments")):
+            if comment not in review_ids:
+                review_ids[comment] = len(review_ids) + 1
+            ids.append(str(review_ids[comment]))
+        rows.append("|".join((
+            str(number),
+            _clean(item.get("title", item.get("name", "N/A"))),
+            _price(item.get("price")),
+            _clean(item.get("condition", "")),
+            _clean(item.get("seller", "")),
+            _rating(item.get("rating")),
+            "Y" if item.get("verified") else "N",
+            ",".join(ids),
+        )))
+
+    lines = []
+    if review_ids:
+        lines.append("Reviews (id=text):")
+        lines.extend(f"{review_id}={comment}" for comment, review_id in review_ids.items())
+    lines.append("Listings (reviews column lists review ids):")
+    lines.append("|".join(COLUMNS))
+    lines.extend(rows)
+    return "\n".join(lines)
+
+
+def get_data_string(items: Optional[Sequence[Dict[str, Any]]]) -> str:
+    """
+    Encode the listings the chat grounds its answers on.
+
+    Args:
+        items: Listings as produced by EbayAPI.format_item, or None
+
+    Returns:
+        str: The encoded table, or "" when there are no items
+    """
+    return encode_listings(items or [])
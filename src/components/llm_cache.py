@@ -0,0 +1,132 @@
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
+from src.components.conf_variables import (
+    COMPLETION_CACHE_DISK_ENTRIES,
+    COMPLETION_CACHE_MEMORY_ENTRIES,
+    COMPLETION_CACHE_PATH,
+    COMPLETION_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionCache:
+    """
+    Two-tier cache of chat completions keyed by a hash of the request.
+
+    The memory tier is a bounded TTL cache; the disk tier is a SQLite file
+    that survives restarts and is trimmed to a maximum number of entries.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = COMPLETION_CACHE_PATH,
+        ttl: float = COMPLETION_CACHE_TTL,
+        memory_entries: int = COMPLETION_CACHE_MEMORY_ENTRIES,
+        disk_entries: int = COMPLETION_CACHE_DISK_ENTRIES,
+    ):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.disk_entries = disk_entries
+        self._lock = threading.Lock()
+        self._memory = TTLCache(maxsize=memory_entries, ttl=ttl)
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        if self.path:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS completions ("
+                        "key TEXT PRIMARY KEY, model TEXT, created REAL, response TEXT)"
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Disabling on-disk completion cache: {str(e)}")
+                self.path = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    @staticmethod
+    def make_key(model: str, messages: Any, tools: Any = None, **params: Any) -> str:
+        """Hash the parts of a request that determine its completion."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "tools": tools, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory_hits += 1
+                return response
+
+        response = self._get_from_disk(key)
+        with self._lock:
+            if response is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._memory[key] = response
+        return response
+
+    def _get_from_disk(self, key: str) -> Optional[str]:
+        if not self.path:
+            return None
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT response FROM completions WHERE key = ? AND created >= ?",
+                    (key, time.time() - self.ttl),
+                ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Completion cache read failed: {str(e)}")
+            return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        if not response:
+            return
+        with self._lock:
+            self._memory[key] = response
+        if not self.path:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO completions (key, model, created, response) VALUES (?, ?, ?, ?)",
+                    (key, model, time.time(), response),
+                )
+                conn.execute(
+                    "DELETE FROM completions WHERE created < ? OR key NOT IN "
+                    "(SELECT key FROM completions ORDER BY created DESC LIMIT ?)",
+                    (time.time() - self.ttl, self.disk_entries),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Completion cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
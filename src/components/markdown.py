@@ -1,9 +1,9 @@
 import streamlit as st
+from src.components.assets import read_text
 
 
 def read_file(filePath):
-    with open(filePath, "r") as file:
-        return file.read()
+    return read_text(filePath)
 
 
 def streamlit_markdown_file(filePath: str):
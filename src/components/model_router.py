@@ -0,0 +1,143 @@
+import re
+import logging
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+from src.components.context_packer import count_tokens
+from src.components.profiling import nearest_rank
+from src.components.conf_variables import (
+    ROUTER_COMPLEX_KEYWORDS,
+    ROUTER_COMPLEX_SCORE,
+    ROUTER_LARGE_MODEL,
+    ROUTER_MAX_SIMPLE_LISTINGS,
+    ROUTER_MAX_SIMPLE_TOKENS,
+    ROUTER_SMALL_MODEL,
+    TIMING_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+_KEYWORD_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(keyword) for keyword in ROUTER_COMPLEX_KEYWORDS) + r")\w*",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+    features: Dict[str, Any] = field(default_factory=dict)
+
+
+def prompt_features(prompt: str, listing_count: int = 0) -> Dict[str, Any]:
+    """
+    Cheap local features used to pick a model.
+
+    Args:
+        prompt: The user's latest message
+        listing_count: Number of listings that will be sent with the prompt
+
+    Returns:
+        Dict[str, Any]: tokens, keywords, questions and listings
+    """
+    return {
+        "tokens": count_tokens(prompt),
+        "keywords": sorted({match.lower() for match in _KEYWORD_PATTERN.findall(prompt)}),
+        "questions": prompt.count("?"),
+        "listings": listing_count,
+    }
+
+
+def route_prompt(
+    prompt: str,
+    listing_count: int = 0,
+    override: Optional[str] = None,
+    small_model: str = ROUTER_SMALL_MODEL,
+    large_model: str = ROUTER_LARGE_MODEL,
+) -> RouteDecision:
+    """
+    Pick the model for a prompt.
+
+    Each signal adds to a complexity score: every comparison/negotiation
+    keyword adds 2, a long prompt, many listings and more than one question
+    add 1 each. Prompts scoring ROUTER_COMPLEX_SCORE or more go to the large
+    model, everything else (short lookups, simple questions) to the small one.
+
+    Args:
+        prompt: The user's latest message
+        listing_count: Number of listings that will be sent with the prompt
+        override: Model name that bypasses routing, if set
+        small_model: Model for simple prompts
+        large_model: Model for complex prompts
+
+    Returns:
+        RouteDecision: The chosen model, why, and the features used
+    """
+    features = prompt_features(prompt, listing_count)
+    if override:
+        return RouteDecision(override, "override", features)
+
+    score = 2 * len(features["keywords"])
+    score += features["tokens"] > ROUTER_MAX_SIMPLE_TOKENS
+    score += features["listings"] > ROUTER_MAX_SIMPLE_LISTINGS
+    score += features["questions"] > 1
+    features["score"] = score
+
+    if score >= ROUTER_COMPLEX_SCORE:
+        reason = f"complex (score {score}" + (f", {', '.join(features['keywords'])}" if features["keywords"] else "") + ")"
+        decision = RouteDecision(large_model, reason, features)
+    else:
+        decision = RouteDecision(small_model, f"simple (score {score})", features)
+    logger.info(f"Routed prompt to {decision.model}: {decision.reason}")
+    return decision
+
+
+class ModelStats:
+    """
+    Rolling per-model latency and token usage, used to tune routing thresholds.
+    """
+
+    def __init__(self, window: int = TIMING_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._prompt_tokens: Dict[str, int] = defaultdict(int)
+        self._completion_tokens: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[str, float] = defaultdict(float)
+
+    def record(self, model: str, seconds: float, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self._latencies[model].append(seconds)
+            self._requests[model] += 1
+            self._prompt_tokens[model] += prompt_tokens
+            self._completion_tokens[model] += completion_tokens
+            self._seconds[model] += seconds
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Summarize every model seen so far.
+
+        Returns:
+            List[Dict[str, Any]]: One row per model with request count, latency
+                percentiles, average prompt/completion tokens and output tokens/s
+        """
+        with self._lock:
+            rows = []
+            for model, latencies in sorted(self._latencies.items()):
+                samples = sorted(latencies)
+                p50, p95 = nearest_rank(samples, 50) * 1000, nearest_rank(samples, 95) * 1000
+                requests = self._requests[model]
+                rows.append({
+                    "model": model,
+                    "requests": requests,
+                    "p50_ms": round(float(p50), 1),
+                    "p95_ms": round(float(p95), 1),
+                    "avg_prompt_tokens": round(self._prompt_tokens[model] / requests),
+                    "avg_completion_tokens": round(self._completion_tokens[model] / requests),
+                    "tokens_per_s": round(self._completion_tokens[model] / self._seconds[model], 1)
+                    if self._seconds[model]
+                    else 0.0,
+                })
+            return rows
@@ -0,0 +1,125 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from cachetools import LRUCache
+from src.components.conf_variables import PDF_CACHE_DIR, PDF_CACHE_DISK_BYTES, PDF_CACHE_MEMORY_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class PdfCache:
+    """
+    Two-tier cache of rendered PDFs keyed by a content hash.
+
+    The memory tier is an LRU cache bounded by total bytes; the disk tier is
+    one file per PDF under `directory`, trimmed oldest-first to a total size.
+    Disk hits are promoted to memory and marked as recently used.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = PDF_CACHE_DIR,
+        memory_bytes: int = PDF_CACHE_MEMORY_BYTES,
+        disk_bytes: int = PDF_CACHE_DISK_BYTES,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._memory = LRUCache(maxsize=memory_bytes, getsizeof=len)
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        if self.directory:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Disabling on-disk PDF cache: {str(e)}")
+                self.directory = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory_hits += 1
+                return data
+
+        data = self._get_from_disk(key)
+        with self._lock:
+            if data is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._store_in_memory(key, data)
+        return data
+
+    def _get_from_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            # Trimming evicts by modification time, so a hit counts as a use
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"PDF cache read failed: {str(e)}")
+            return None
+
+    def _store_in_memory(self, key: str, data: bytes) -> None:
+        try:
+            self._memory[key] = data
+        except ValueError:
+            # Larger than the whole memory tier; keep it on disk only
+            pass
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        with self._lock:
+            self._store_in_memory(key, data)
+        if not self.directory:
+            return
+        path = self._path(key)
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+            self._trim_disk()
+        except OSError as e:
+            logger.warning(f"PDF cache write failed: {str(e)}")
+            temp_path.unlink(missing_ok=True)
+
+    def _trim_disk(self) -> None:
+        files = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_mb": round(self._memory.currsize / 1e6, 2),
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._memory_hits + self._disk_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,264 @@
+import gc
+import io
+import os
+import sys
+import time
+import types
+import hashlib
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Sequence
+from cachetools import LRUCache
+from src.components.profiling import record_timing
+from src.components.pdf_cache import PdfCache
+from src.components.conf_variables import PDF_ERROR_ENTRIES, PDF_RENDER_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class RenderContext:
+    """
+    WeasyPrint state kept for the life of a worker process.
+
+    One FontConfiguration serves every render, so fontconfig and @font-face
+    fonts are set up once, and shared stylesheets are parsed once and reused
+    by every document that passes the same CSS text. Shared stylesheets are
+    applied with user origin, below the document's own styles and inline
+    style attributes.
+
+    Appendices are laid out one document at a time and their pages merged
+    into the PDF, so a long document split into appendices never has more
+    than one part's layout in memory.
+    """
+
+    def __init__(self, stylesheet_entries: int = 8):
+        from weasyprint.text.fonts import FontConfiguration
+
+        self.font_config = FontConfiguration()
+        self._stylesheets = LRUCache(maxsize=stylesheet_entries)
+
+    def stylesheet(self, css: str, base_url: Optional[str] = None):
+        key = (hashlib.sha256(css.encode("utf-8")).hexdigest(), base_url)
+        parsed = self._stylesheets.get(key)
+        if parsed is None:
+            from weasyprint import CSS
+
+            parsed = self._stylesheets[key] = CSS(string=css, base_url=base_url, font_config=self.font_config)
+        return parsed
+
+    def _write_pdf(self, html: str, base_url: Optional[str], stylesheets: Sequence[str]) -> bytes:
+        from weasyprint import HTML
+
+        return HTML(string=html, base_url=base_url).write_pdf(
+            stylesheets=[self.stylesheet(css, base_url) for css in stylesheets],
+            font_config=self.font_config,
+        )
+
+    def render(
+        self,
+        html: str,
+        base_url: Optional[str] = None,
+        stylesheets: Sequence[str] = (),
+        appendices: Sequence[str] = (),
+    ) -> bytes:
+        pdf = self._write_pdf(html, base_url, stylesheets)
+        if not appendices:
+            return pdf
+
+        from pypdf import PdfWriter
+
+        # Cloning keeps the main document's metadata
+        writer = PdfWriter(clone_from=io.BytesIO(pdf))
+        for appendix in appendices:
+            # Layout boxes reference each other; free one part before the next
+            gc.collect()
+            writer.append(io.BytesIO(self._write_pdf(appendix, base_url, stylesheets)))
+        # Parts embed the same images and often the same font subsets
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+
+_render_context: Optional[RenderContext] = None
+_render_context_error: Optional[Exception] = None
+
+
+def get_render_context() -> RenderContext:
+    """This process's RenderContext, created on first use."""
+    global _render_context, _render_context_error
+    if _render_context is None:
+        # A failed WeasyPrint import leaves it half-initialized; report the original error every time
+        if _render_context_error is not None:
+            raise _render_context_error
+        try:
+            _render_context = RenderContext()
+        except Exception as e:
+            _render_context_error = e
+            raise
+    return _render_context
+
+
+def render_pdf(
+    html: str,
+    base_url: Optional[str] = None,
+    stylesheets: Sequence[str] = (),
+    appendices: Sequence[str] = (),
+) -> bytes:
+    """Render HTML to PDF bytes with WeasyPrint. Runs in a worker process."""
+    return get_render_context().render(html, base_url, stylesheets, appendices)
+
+
+def warm_up() -> None:
+    """Set up the render context ahead of the first job. Runs in a worker process."""
+    get_render_context()
+
+
+@contextmanager
+def _bare_main():
+    """
+    Hide Streamlit's script module while starting workers.
+
+    Streamlit installs the running page as __main__, and spawned processes
+    re-execute __main__ from its file, which would run the page in every
+    worker.
+    """
+    main = sys.modules.get("__main__")
+    bare = types.ModuleType("__main__")
+    sys.modules["__main__"] = bare
+    try:
+        yield
+    finally:
+        # Another script run may have installed its own module meanwhile
+        if main is not None and sys.modules.get("__main__") is bare:
+            sys.modules["__main__"] = main
+
+
+def default_workers() -> int:
+    """One worker per core, capped at PDF_RENDER_MAX_WORKERS."""
+    return max(1, min(PDF_RENDER_MAX_WORKERS, os.cpu_count() or 1))
+
+
+class PdfRenderer:
+    """
+    Renders PDFs in a bounded pool of worker processes.
+
+    WeasyPrint layout is CPU-bound and holds the GIL, so it runs outside the
+    Streamlit server process. Jobs are keyed by a content hash, by default
+    of their input: submitting the same document again reuses the running
+    job or the PDF from the cache. The pool is started on the first job.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cache: Optional[PdfCache] = None):
+        self.max_workers = max_workers or default_workers()
+        self.cache = cache or PdfCache()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._errors = LRUCache(maxsize=PDF_ERROR_ENTRIES)
+        self._running: Dict[str, Future] = {}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the server process is full of threads. All
+            # workers start here, so later submits never spawn a process.
+            with _bare_main():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                for _ in range(self.max_workers):
+                    self._executor.submit(warm_up)
+            logger.info(f"Started PDF render pool with {self.max_workers} workers")
+        return self._executor
+
+    def _reset_pool(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(
+        self,
+        html: str,
+        base_url: Optional[str] = None,
+        key: Optional[str] = None,
+        stylesheets: Sequence[str] = (),
+        appendices: Sequence[str] = (),
+    ) -> str:
+        """
+        Start rendering `html` unless the same document is already cached or running.
+
+        Args:
+            html (str): Document to render
+            base_url (Optional[str]): Base for relative URLs in the document
+            key (Optional[str]): Content key of the document; a hash of
+                `html`, `base_url`, `stylesheets` and `appendices` by default
+            stylesheets (Sequence[str]): CSS shared between documents, parsed
+                once per worker
+            appendices (Sequence[str]): Documents laid out one at a time
+                after `html`, their pages added to the same PDF
+
+        Returns:
+            str: The job key to poll with result()
+        """
+        key = key or hashlib.sha256(
+            "\n".join((str(base_url), *stylesheets, html, *appendices)).encode("utf-8")
+        ).hexdigest()
+        if self.cache.get(key) is not None:
+            return key
+        with self._lock:
+            if key in self._running:
+                return key
+            self._errors.pop(key, None)
+            try:
+                future = self._pool().submit(render_pdf, html, base_url, tuple(stylesheets), tuple(appendices))
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for this and later jobs
+                logger.warning("PDF render pool was broken, restarting it")
+                self._reset_pool()
+                future = self._pool().submit(render_pdf, html, base_url, tuple(stylesheets), tuple(appendices))
+            self._running[key] = future
+        started = time.perf_counter()
+        future.add_done_callback(lambda done: self._finish(key, done, started))
+        return key
+
+    def _finish(self, key: str, future: Future, started: float) -> None:
+        record_timing("pdf_render_job", time.perf_counter() - started)
+        try:
+            self.cache.put(key, future.result())
+        except Exception as e:
+            logger.error(f"Error rendering PDF: {str(e)}")
+            # A broken pool is replaced by the next submit()
+            with self._lock:
+                self._errors[key] = str(e) or type(e).__name__
+        with self._lock:
+            self._running.pop(key, None)
+
+    def result(self, key: str) -> Optional[bytes]:
+        """Return the PDF for `key`, or None while it is still running (or failed)."""
+        # Polls of a running or failed job aren't cache lookups; counting them would sink the hit rate
+        with self._lock:
+            if key in self._running or key in self._errors:
+                return None
+        return self.cache.get(key)
+
+    def error(self, key: str) -> Optional[str]:
+        """Return why the job for `key` failed, if it did."""
+        with self._lock:
+            return self._errors.get(key)
+
+    def is_running(self, key: str) -> bool:
+        with self._lock:
+            return key in self._running
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": len(self._running),
+                "failed": len(self._errors),
+                **self.cache.stats(),
+            }
@@ -0,0 +1,231 @@
+import streamlit as st
+import os
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from prometheus_client import REGISTRY, Histogram, start_http_server
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from src.components.assets import asset_cache
+from src.components.services import get_services
+from src.components.conf_variables import (
+    DEBUG_PANEL_ENV,
+    METRICS_PORT_ENV,
+    TIMING_BUCKETS,
+    TIMING_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+_CURRENT_RERUN_KEY = "_timings_current_rerun"
+_LAST_RERUN_KEY = "_timings_last_rerun"
+
+
+def _get_histogram() -> Histogram:
+    """Return the process-wide render histogram, reusing it across module reloads."""
+    try:
+        return Histogram(
+            "ampa_render_seconds",
+            "Wall-clock time spent in instrumented page sections and external calls.",
+            ["section"],
+            buckets=TIMING_BUCKETS,
+        )
+    except ValueError:
+        # Streamlit reloads modules on file changes; the collector is already registered
+        return REGISTRY._names_to_collectors["ampa_render_seconds"]
+
+
+RENDER_SECONDS = _get_histogram()
+
+
+class TimingRegistry:
+    """
+    Process-wide rolling window of timings per section, used for percentiles.
+    """
+
+    def __init__(self, window: int = TIMING_WINDOW):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, section: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[section].append(seconds)
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize every section as count, p50, p95 and p99 (in milliseconds).
+
+        Returns:
+            Dict[str, Dict[str, float]]: Section name mapped to its summary
+        """
+        with self._lock:
+            snapshot = {section: sorted(samples) for section, samples in self._samples.items()}
+
+        summary = {}
+        for section, samples in sorted(snapshot.items()):
+            if not samples:
+                continue
+            summary[section] = {
+                "count": len(samples),
+                "p50_ms": nearest_rank(samples, 50) * 1000,
+                "p95_ms": nearest_rank(samples, 95) * 1000,
+                "p99_ms": nearest_rank(samples, 99) * 1000,
+            }
+        return summary
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+def nearest_rank(sorted_samples: List[float], percentile: int) -> float:
+    """The nearest-rank `percentile` of already sorted samples."""
+    index = max(0, -(-len(sorted_samples) * percentile // 100) - 1)
+    return sorted_samples[index]
+
+
+timings = TimingRegistry()
+
+_metrics_server_lock = threading.Lock()
+_metrics_server_started = False
+
+
+def start_metrics_server() -> None:
+    """Expose the Prometheus metrics endpoint once per process if a port is configured."""
+    global _metrics_server_started
+    port = os.getenv(METRICS_PORT_ENV)
+    if not port or _metrics_server_started:
+        return
+    with _metrics_server_lock:
+        if _metrics_server_started:
+            return
+        try:
+            start_http_server(int(port))
+            logger.info(f"Prometheus metrics exposed on port {port}")
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not start metrics server on port {port}: {str(e)}")
+        _metrics_server_started = True
+
+
+def _current_rerun() -> Optional[List[Tuple[str, float]]]:
+    """Return this rerun's timing list, or None when called outside a script run."""
+    # Worker threads and benchmarks have no session state
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    try:
+        if _CURRENT_RERUN_KEY not in st.session_state:
+            st.session_state[_CURRENT_RERUN_KEY] = []
+        return st.session_state[_CURRENT_RERUN_KEY]
+    except Exception:
+        return None
+
+
+def record_timing(section: str, seconds: float) -> None:
+    RENDER_SECONDS.labels(section=section).observe(seconds)
+    timings.record(section, seconds)
+    current = _current_rerun()
+    if current is not None:
+        current.append((section, seconds))
+
+
+@contextmanager
+def timer(section: str):
+    """Time the enclosed block and record it under `section`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(section, time.perf_counter() - start)
+
+
+def timed(section: Optional[str] = None) -> Callable:
+    """
+    Decorator that records the wall-clock time of every call.
+
+    Args:
+        section (str): Name to record under. Defaults to the function name.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = section or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def begin_rerun() -> None:
+    """Start collecting a new rerun, keeping the previous one for the debug panel."""
+    start_metrics_server()
+    if st.session_state.get(_CURRENT_RERUN_KEY):
+        st.session_state[_LAST_RERUN_KEY] = st.session_state[_CURRENT_RERUN_KEY]
+    st.session_state[_CURRENT_RERUN_KEY] = []
+
+
+def debug_panel_enabled() -> bool:
+    if os.getenv(DEBUG_PANEL_ENV, "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get("debug", "").lower() in ("1", "true", "yes")
+
+
+def show_timings_panel() -> None:
+    """Display the opt-in render timing debug panel (enable with ?debug=1 or AMPA_DEBUG=1)."""
+    if not debug_panel_enabled():
+        return
+
+    with st.expander("🛠️ Render timings", expanded=False):
+        current = st.session_state.get(_CURRENT_RERUN_KEY) or st.session_state.get(_LAST_RERUN_KEY, [])
+        st.markdown("**This rerun**")
+        if current:
+            st.dataframe(
+                [{"section": section, "ms": round(seconds * 1000, 1)} for section, seconds in current],
+                use_container_width=True,
+            )
+        else:
+            st.caption("No timings recorded yet")
+
+        st.markdown("**Rolling percentiles**")
+        summary = timings.percentiles()
+        if summary:
+            st.dataframe(
+                [
+                    {"section": section, **{k: round(v, 1) for k, v in stats.items()}}
+                    for section, stats in summary.items()
+                ],
+                use_container_width=True,
+            )
+        else:
+            st.caption("No timings recorded yet")
+
+        st.markdown("**Asset cache**")
+        st.dataframe([asset_cache.stats()], use_container_width=True)
+
+        st.markdown("**Completion cache**")
+        st.dataframe([get_services().completion_cache.stats()], use_container_width=True)
+
+        st.markdown("**Web fetch cache**")
+        st.dataframe([get_services().page_fetcher.stats()], use_container_width=True)
+
+        st.markdown("**PDF renders**")
+        st.dataframe([get_services().pdf_renderer.stats()], use_container_width=True)
+
+        st.markdown("**Chat models**")
+        model_stats = get_services().model_stats.stats()
+        if model_stats:
+            st.dataframe(model_stats, use_container_width=True)
+        else:
+            st.caption("No chat requests yet")
+
+        st.markdown("**Connection pools**")
+        st.dataframe(
+            [
+                {"pool": name, **stats}
+                for name, stats in get_services().pool_utilization().items()
+            ],
+            use_container_width=True,
+        )
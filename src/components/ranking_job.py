@@ -0,0 +1,211 @@
+import json
+import math
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+from cachetools import LRUCache
+from src.components.profiling import timer
+from src.components.conf_variables import (
+    RANKING_CACHE_ENTRIES,
+    RANKING_TIER_SHARES,
+    RANKING_WEIGHTS,
+    RANKING_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("Gold", "Silver", "Bronze")
+TIER_BADGES = {"Gold": "🥇 Gold", "Silver": "🥈 Silver", "Bronze": "🥉 Bronze"}
+
+CONDITION_SCORES = {
+    "new": 1.0,
+    "refurbished": 0.75,
+    "used": 0.5,
+    "for parts": 0.1,
+}
+_POSITIVE_WORDS = (
+    "great", "excellent", "perfect", "satisfied", "happy", "best", "exceeded", "professional",
+    "responsive", "helpful", "better", "value", "buy again", "definitely buy", "accurate",
+)
+_NEGATIVE_WORDS = (
+    "damaged", "broken", "disappoint", "missing", "terrible", "waste", "never", "poor",
+    "misleading", "unresponsive", "not worth", "not as", "not recommend", "stopped", "different",
+    "worn", "unclear",
+)
+_FAST_DELIVERY = ("fast", "early", "quick", "faster")
+_SLOW_DELIVERY = ("slow", "late", "took too long", "longer than expected")
+
+
+def item_key(item: Dict[str, Any]) -> Any:
+    """The id used for cart and ranking lookups, matching the listing cards."""
+    return item.get("id", hash(item.get("title", "")))
+
+
+def result_set_key(items: Sequence[Dict[str, Any]]) -> str:
+    """Hash the fields that affect ranking, so identical result sets share one job."""
+    payload = json.dumps(
+        [
+            [item.get("title"), item.get("price"), item.get("condition"), item.get("seller"),
+             item.get("rating"), item.get("verified"), item.get("comments")]
+            for item in items
+        ],
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _price(item: Dict[str, Any]) -> Optional[float]:
+    try:
+        return float(item.get("price"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _comment_scores(comments: Any) -> Dict[str, float]:
+    """Score review text for sentiment (reliability) and shipping speed (delivery)."""
+    if isinstance(comments, str):
+        comments = [comments]
+    sentiment = []
+    delivery = []
+    for comment in comments or []:
+        text = str(comment).lower()
+        positive = any(word in text for word in _POSITIVE_WORDS)
+        negative = any(word in text for word in _NEGATIVE_WORDS)
+        sentiment.append(0.5 + 0.5 * (positive - negative))
+        if any(word in text for word in _SLOW_DELIVERY):
+            delivery.append(0.0)
+        elif any(word in text for word in _FAST_DELIVERY):
+            delivery.append(1.0)
+    return {
+        "sentiment": sum(sentiment) / len(sentiment) if sentiment else 0.5,
+        "delivery": sum(delivery) / len(delivery) if delivery else 0.5,
+    }
+
+
+def _condition_score(condition: Any) -> float:
+    condition = str(condition or "").lower()
+    for name, score in CONDITION_SCORES.items():
+        if name in condition:
+            return score
+    return 0.5
+
+
+def rank_listings(items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score listings with the chatbot's weighted criteria and split them into tiers.
+
+    Criteria (weights from RANKING_WEIGHTS): cost (cheapest in the set scores
+    1), supplier reliability (verified badge and review sentiment),
+    specifications (listing condition), rating, and delivery (shipping speed
+    mentioned in reviews). The best RANKING_TIER_SHARES["Gold"] of listings
+    are Gold, the next share Silver, the rest Bronze.
+
+    Args:
+        items: Listings to rank
+
+    Returns:
+        List[Dict[str, Any]]: One entry per listing, best first, with rank,
+            tier, score, the per-criterion scores and the listing's id
+    """
+    prices = [p for p in (_price(item) for item in items) if p is not None]
+    low, high = (min(prices), max(prices)) if prices else (0.0, 0.0)
+
+    ranked = []
+    for item in items:
+        price = _price(item)
+        if price is None:
+            cost = 0.0
+        else:
+            cost = 1.0 if high == low else 1 - (price - low) / (high - low)
+        comments = _comment_scores(item.get("comments"))
+        try:
+            rating = min(max(float(item.get("rating", 0)) / 5, 0.0), 1.0)
+        except (TypeError, ValueError):
+            rating = 0.0
+        criteria = {
+            "cost": cost,
+            "reliability": 0.5 * bool(item.get("verified")) + 0.5 * comments["sentiment"],
+            "specifications": _condition_score(item.get("condition")),
+            "ratings": rating,
+            "delivery": comments["delivery"],
+        }
+        score = sum(RANKING_WEIGHTS[name] * value for name, value in criteria.items())
+        ranked.append({
+            "id": item_key(item),
+            "title": item.get("title", item.get("name", "N/A")),
+            "seller": item.get("seller", "Unknown"),
+            "price": item.get("price"),
+            "score": round(score * 100, 1),
+            **{name: round(value, 2) for name, value in criteria.items()},
+        })
+
+    ranked.sort(key=lambda entry: -entry["score"])
+    gold = math.ceil(len(ranked) * RANKING_TIER_SHARES["Gold"])
+    silver = gold + math.ceil(len(ranked) * RANKING_TIER_SHARES["Silver"])
+    for rank, entry in enumerate(ranked, start=1):
+        entry["rank"] = rank
+        entry["tier"] = "Gold" if rank <= gold else "Silver" if rank <= silver else "Bronze"
+    return ranked
+
+
+class RankingJobs:
+    """
+    Runs supplier ranking on a background thread pool.
+
+    Jobs are keyed by the result-set hash: submitting the same results again
+    reuses the running job or the cached ranking instead of starting over.
+    """
+
+    def __init__(self, max_workers: int = RANKING_WORKERS, entries: int = RANKING_CACHE_ENTRIES):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ranking")
+        self._lock = threading.Lock()
+        self._results = LRUCache(maxsize=entries)
+        self._errors = LRUCache(maxsize=entries)
+        self._running: Dict[str, Future] = {}
+
+    def submit(self, items: Sequence[Dict[str, Any]]) -> str:
+        """
+        Start ranking `items` unless that result set is already ranked or running.
+
+        Returns:
+            str: The job key to poll with result()
+        """
+        key = result_set_key(items)
+        with self._lock:
+            if key in self._results or key in self._running:
+                return key
+            self._errors.pop(key, None)
+            future = self._executor.submit(self._run, key, list(items))
+            self._running[key] = future
+        return key
+
+    def _run(self, key: str, items: List[Dict[str, Any]]) -> None:
+        try:
+            with timer("ranking_job"):
+                ranked = rank_listings(items)
+            with self._lock:
+                self._results[key] = ranked
+            logger.info(f"Ranked {len(ranked)} listings for result set {key[:12]}")
+        except Exception as e:
+            logger.error(f"Error ranking listings: {str(e)}")
+            with self._lock:
+                self._errors[key] = str(e) or type(e).__name__
+        finally:
+            with self._lock:
+                self._running.pop(key, None)
+
+    def result(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the ranking for `key`, or None while it is still running (or failed)."""
+        with self._lock:
+            return self._results.get(key)
+
+    def error(self, key: str) -> Optional[str]:
+        """Return why the job for `key` failed, if it did."""
+        with self._lock:
+            return self._errors.get(key)
+
+    def is_running(self, key: str) -> bool:
+        with self._lock:
+            return key in self._running
@@ -0,0 +1,245 @@
+import re
+import math
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from cachetools import LRUCache
+from src.components.conf_variables import (
+    RETRIEVAL_BM25_B,
+    RETRIEVAL_BM25_K1,
+    RETRIEVAL_TOP_K,
+    USD_TO_AED,
+)
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "best", "by", "can", "do", "find", "for", "from",
+    "give", "have", "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "show", "some",
+    "that", "the", "these", "this", "to", "under", "what", "which", "with", "you",
+}
+
+_PRICE = r"(\$|usd|aed)?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(\$|usd|dollars?|aed|dirhams?)?"
+_USD = ("$", "usd", "dollar", "dollars")
+_MAX_PRICE = re.compile(r"(?:under|below|less than|cheaper than|max(?:imum)?|up to|at most|<=?)\s*" + _PRICE)
+_MIN_PRICE = re.compile(r"(?:over|above|more than|at least|min(?:imum)?|>=?)\s*" + _PRICE + r"(?![\d.]*\s*stars?)")
+_MIN_RATING = re.compile(
+    r"(\d(?:\.\d)?)\s*\+?\s*stars?(?:\s*(?:and|or)\s*(?:up|above|more))?"
+    r"|rat(?:ing|ed)\s*(?:of\s*)?(?:above|over|at least|>=?)?\s*(\d(?:\.\d)?)"
+)
+_CONDITIONS = {
+    "refurbished": "refurbished",
+    "used": "used",
+    "pre-owned": "used",
+    "new": "new",
+    "for parts": "for parts",
+}
+
+
+@dataclass
+class ListingFilters:
+    max_price: Optional[float] = None
+    min_price: Optional[float] = None
+    min_rating: Optional[float] = None
+    conditions: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return any(value is not None for value in (self.max_price, self.min_price, self.min_rating)) or bool(
+            self.conditions
+        )
+
+    def matches(self, item: Dict[str, Any]) -> bool:
+        price = _to_float(item.get("price"))
+        if self.max_price is not None and (price is None or price > self.max_price):
+            return False
+        if self.min_price is not None and (price is None or price < self.min_price):
+            return False
+        rating = _to_float(item.get("rating"))
+        if self.min_rating is not None and (rating is None or rating < self.min_rating):
+            return False
+        if self.conditions:
+            condition = str(item.get("condition", "")).lower()
+            if not any(wanted in condition for wanted in self.conditions):
+                return False
+        return True
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", "").replace("$", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _price_bound(match: re.Match) -> float:
+    """A matched price in USD, the currency of listing prices."""
+    amount = float(match.group(2).replace(",", ""))
+    if (match.group(1) or match.group(3)) in _USD:
+        return amount
+    return amount / USD_TO_AED
+
+
+def parse_filters(prompt: str) -> ListingFilters:
+    """
+    Pull structured constraints out of a free-text prompt.
+
+    Recognizes price bounds ("under 1000", "over 50 dollars"), a minimum
+    rating ("4+ stars", "rated above 4") and listing conditions
+    ("refurbished", "used", "new"). Prices are taken as AED, the currency
+    the UI shows, unless marked as USD ("$300", "300 usd", "300 dollars"),
+    and the bounds are converted to USD to compare with listing prices.
+    """
+    text = prompt.lower()
+    filters = ListingFilters()
+
+    rating_span = (-1, -1)
+    if match := _MIN_RATING.search(text):
+        filters.min_rating = float(match.group(1) or match.group(2))
+        rating_span = match.span()
+    # "rated above 4" is a rating, not a price bound
+    if (match := _MAX_PRICE.search(text)) and not rating_span[0] <= match.start() < rating_span[1]:
+        filters.max_price = _price_bound(match)
+    if (match := _MIN_PRICE.search(text)) and not rating_span[0] <= match.start() < rating_span[1]:
+        filters.min_price = _price_bound(match)
+
+    for keyword, condition in _CONDITIONS.items():
+        if re.search(rf"\b{re.escape(keyword)}\b", text):
+            filters.conditions.add(condition)
+    # "new" inside "brand new refurbished" style prompts is noise next to a stronger condition
+    if len(filters.conditions) > 1:
+        filters.conditions.discard("new")
+    return filters
+
+
+def _stem(word: str) -> str:
+    # Plural folding is enough for listing titles ("laptops" -> "laptop")
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def _listing_text(item: Dict[str, Any]) -> str:
+    comments = item.get("comments", "")
+    if isinstance(comments, (list, tuple)):
+        comments = " ".join(str(comment) for comment in comments)
+    return " ".join(
+        str(part)
+        for part in (
+            # Repeat the title so it outweighs the review text
+            item.get("title", item.get("name", "")),
+            item.get("title", item.get("name", "")),
+            item.get("condition", ""),
+            item.get("seller", ""),
+            comments,
+        )
+    )
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of listings.
+
+    Built once per result set; scoring a query only touches the postings of
+    the query terms.
+    """
+
+    def __init__(self, items: Sequence[Dict[str, Any]], k1: float = RETRIEVAL_BM25_K1, b: float = RETRIEVAL_BM25_B):
+        self.items = list(items)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+
+        for doc_id, item in enumerate(self.items):
+            terms = Counter(tokenize(_listing_text(item)))
+            self._lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, []).append((doc_id, frequency))
+
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        count = len(self.items)
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        scores = [0.0] * len(self.items)
+        if not self._avg_length:
+            return scores
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self._postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+
+_index_cache = LRUCache(maxsize=32)
+_index_lock = threading.Lock()
+
+
+def _fingerprint(items: Sequence[Dict[str, Any]]) -> int:
+    return hash(tuple((item.get("title", item.get("name")), item.get("price"), item.get("seller")) for item in items))
+
+
+def get_index(items: Sequence[Dict[str, Any]]) -> BM25Index:
+    """Return the BM25 index for a result set, building it on first use."""
+    key = _fingerprint(items)
+    with _index_lock:
+        index = _index_cache.get(key)
+    if index is None:
+        index = BM25Index(items)
+        with _index_lock:
+            _index_cache[key] = index
+    return index
+
+
+def retrieve_listings(
+    prompt: str, items: Sequence[Dict[str, Any]], k: int = RETRIEVAL_TOP_K
+) -> List[Dict[str, Any]]:
+    """
+    Select the listings most relevant to a prompt.
+
+    Structured filters parsed from the prompt are applied first; if nothing
+    passes them the full set is ranked instead, so the model can still
+    explain what is available. The remaining listings are ranked by BM25
+    and the top `k` are returned. Listings with no lexical match keep their
+    original (best match) order behind the ones that do match.
+
+    Args:
+        prompt: The user's latest message
+        items: Current search results
+        k: Maximum number of listings to return
+
+    Returns:
+        List[Dict[str, Any]]: At most `k` listings, most relevant first
+    """
+    if not items:
+        return []
+
+    filters = parse_filters(prompt)
+    candidates = list(range(len(items)))
+    if filters:
+        filtered = [i for i in candidates if filters.matches(items[i])]
+        if filtered:
+            candidates = filtered
+        else:
+            logger.info(f"No listings match {filters}; ranking all {len(items)} instead")
+
+    scores = get_index(items).scores(prompt)
+    ranked = sorted(candidates, key=lambda i: (-scores[i], i))[:k]
+    logger.info(
+        f"Retrieved {len(ranked)} of {len(items)} listings "
+        f"({len(candidates)} after filters {filters if filters else 'none'})"
+    )
+    return [items[i] for i in ranked]
@@ -1,6 +1,5 @@
 import streamlit as st
-import time
-import random
+from src.calculations.roi_engine import roi_metrics, roi_grid, sensitivity_bands
 
 
 def streamlit_roi_ver1():
@@ -1067,23 +1066,11 @@ def streamlit_roi_ver10():
 
             submitted = st.form_submit_button("Calculate ROI")
             if submitted:
-                # Monetary calculations
-                fixed_new_contract_value = current_contract_value * 0.75
-                cost_savings = current_contract_value - fixed_new_contract_value
-                monetary_roi = (
-                    (cost_savings / current_contract_value) * 100
-                    if current_contract_value > 0
-                    else 0
-                )
-
-                # Time calculations for supplier discovery
-                total_manual_time = manual_time * events_per_year
-                total_ai_time = ai_time * events_per_year
-                total_time_saved = total_manual_time - total_ai_time
-                # Calculate time efficiency percentage
-                time_efficiency_percentage = (
-                    (manual_time / ai_time) * 100 if manual_time > 0 else 0
-                )
+                results = roi_metrics(current_contract_value, manual_time, events_per_year)
+                cost_savings = float(results["cost_savings"])
+                monetary_roi = float(results["monetary_roi"])
+                total_time_saved = float(results["total_time_saved"])
+                time_efficiency_percentage = float(results["time_efficiency_percentage"])
 
                 # Set flag that calculation is complete
                 calculation_done = True
@@ -1097,14 +1084,6 @@ def streamlit_roi_ver10():
             st.header("Results", divider=True)
 
             with st.container(border=True):
-                progress_text = "Calculating..."
-                my_bar = st.progress(0, text=progress_text)
-
-                for percent_complete in range(100):
-                    time.sleep(random.randrange(1, 10) * 0.001)
-                    my_bar.progress(percent_complete + 1, text=progress_text)
-                time.sleep(1)
-                my_bar.empty()
                 st.metric("Monetary Cost Savings", f"{cost_savings:,.0f} AED")
                 st.metric("Monetary ROI", f"{monetary_roi:.0f}%")
 
@@ -1119,3 +1098,39 @@ def streamlit_roi_ver10():
                     Which is around {ai_time * 60:.0f} minutes.
                     """
                 )
+
+            show_roi_sensitivity(current_contract_value, manual_time, events_per_year)
+
+
+def show_roi_sensitivity(current_contract_value: float, manual_time: float, events_per_year: int) -> None:
+    """Display +/-20% sensitivity bands and the time-saved curve for the ROI inputs."""
+    bands = sensitivity_bands(current_contract_value, manual_time, events_per_year)
+
+    with st.container(border=True):
+        st.subheader("Sensitivity (±20%)", divider=True)
+        savings = bands["cost_savings"]
+        hours = bands["total_time_saved"]
+        st.metric(
+            "Monetary Cost Savings (P50)",
+            f"{savings[50]:,.0f} AED",
+            help=f"90% range: {savings[5]:,.0f} - {savings[95]:,.0f} AED",
+        )
+        st.metric(
+            "Annual Time Saved (P50)",
+            f"{hours[50]:,.0f} hours",
+            help=f"90% range: {hours[5]:,.0f} - {hours[95]:,.0f} hours",
+        )
+
+        events = tuple(range(max(1, int(events_per_year * 0.5)), int(events_per_year * 1.5) + 1))
+        manual_times = (manual_time * 0.8, manual_time, manual_time * 1.2)
+        grid = roi_grid((float(current_contract_value),), manual_times, events)
+        st.line_chart(
+            {
+                "Events per year": events,
+                "Low (-20% time)": grid["total_time_saved"][0, 0],
+                "Base": grid["total_time_saved"][0, 1],
+                "High (+20% time)": grid["total_time_saved"][0, 2],
+            },
+            x="Events per year",
+            y_label="Hours saved",
+        )
@@ -1,6 +1,7 @@
 import streamlit as st
 from data.supliers import all_supplier
 from src.components.ebay_api import EbayAPI
+from src.components.services import get_services
 from src.components.cart import Cart
 from src.components.conf_variables import (
     CARDS_PER_PAGE,
@@ -12,7 +13,10 @@ from src.components.conf_variables import (
     ERROR_MESSAGES,
     CATEGORIES,
     CONDITION_MAP,
-    SORT_MAP
+    SORT_MAP,
+    RANKING_POLL_SECONDS,
+    AGREEMENT_TEMPLATE_PATH,
+    PDF_POLL_SECONDS,
 )
 import math
 from typing import List, Dict, Any, Callable, Optional, Tuple
@@ -20,9 +24,14 @@ import logging
 import webbrowser
 import os
 from pathlib import Path
-from src.components.document_viewer import open_supply_agreement, fill_agreement_template, detect_encoding
-import io
-from weasyprint import HTML
+from src.components.document_viewer import (
+    AgreementBundle,
+    agreement_pdf_key,
+    group_items_by_seller,
+    request_agreement_pdf,
+)
+from src.components.profiling import timed, timer
+from src.components.ranking_job import TIER_BADGES
 import base64
 
 # Configure logging
@@ -39,11 +48,9 @@ DOCUMENTS_DIR = ASSETS_DIR / 'document_to_edit'
 IMAGE_WIDTH = 300
 IMAGE_HEIGHT = 200
 
-ebay_api = EbayAPI()
-cart = Cart()
-
-if "cart_items" not in st.session_state:
-    st.session_state.cart_items = []
+def get_ebay_api() -> EbayAPI:
+    """Return the process-wide eBay client, created on first use."""
+    return get_services().ebay_api
 
 
 def show_header(title: str, subtitle: str) -> None:
@@ -59,7 +66,7 @@ def show_image(image_path: str) -> None:
         st.image("assets/images/placeholder.png")
 
 
-def show_ebay_card(item: Dict[str, Any]) -> None:
+def show_ebay_card(item: Dict[str, Any], tier: Optional[str] = None) -> None:
     with st.container(border=True):
         st.markdown("""
             <style>
@@ -102,6 +109,8 @@ def show_ebay_card(item: Dict[str, Any]) -> None:
         """, unsafe_allow_html=True)
         
         st.header(f"👤 {item['seller']}")
+        if tier:
+            st.markdown(f"**{TIER_BADGES[tier]}**")
             
         with st.container():
             col1, col2, col3 = st.columns([1, 8, 1], gap='small')
@@ -123,6 +132,7 @@ def show_ebay_card(item: Dict[str, Any]) -> None:
             
             # Check if item is already in cart
             item_id = item.get('id', hash(item['title']))
+            cart = Cart()
             is_in_cart = cart.is_item_in_cart(item_id)
             
             if is_in_cart:
@@ -200,7 +210,7 @@ def show_supplier_card(supplier: Dict[str, Any]) -> None:
             st.markdown(f"⭐ **Rating:** {supplier['rating']}/5.0")
 
 
-def show_items_grid(items: List[Dict[str, Any]]) -> None:
+def show_items_grid(items: List[Dict[str, Any]], tiers: Optional[Dict[Any, str]] = None) -> None:
     with st.container(border=True):
         st.markdown("""
             <style>
@@ -224,7 +234,10 @@ def show_items_grid(items: List[Dict[str, Any]]) -> None:
             
             for col, item in zip(cols, row_items):
                 with col:
-                    show_ebay_card(item) if "title" in item else show_supplier_card(item)
+                    if "title" in item:
+                        show_ebay_card(item, (tiers or {}).get(item.get('id', hash(item['title']))))
+                    else:
+                        show_supplier_card(item)
 
 
 def show_pagination(current_page: int, total_pages: int) -> None:
@@ -291,6 +304,7 @@ def show_search_form() -> None:
         if st.form_submit_button("Search") and search_query:
             try:
                 st.session_state.page = 0
+                ebay_api = get_ebay_api()
                 items = ebay_api.search_items(search_query)
                 st.session_state.search_results = [ebay_api.format_item(item) for item in items]
                 st.session_state.has_search = True
@@ -451,12 +465,14 @@ def perform_search(search_query: str, filters: List[str], sort_by: str, items_pe
     """Perform the eBay search with retry logic."""
     for attempt in range(MAX_RETRIES):
         try:
-            items = ebay_api.search_items(
-                search_query,
-                limit=items_per_page,
-                sort=SORT_MAP[sort_by],
-                filters=",".join(filters) if filters else None
-            )
+            ebay_api = get_ebay_api()
+            with timer("ebay.search_items"):
+                items = ebay_api.search_items(
+                    search_query,
+                    limit=items_per_page,
+                    sort=SORT_MAP[sort_by],
+                    filters=",".join(filters) if filters else None
+                )
             return [ebay_api.format_item(item) for item in items]
         except Exception as e:
             if attempt == MAX_RETRIES - 1:
@@ -465,6 +481,7 @@ def perform_search(search_query: str, filters: List[str], sort_by: str, items_pe
             continue
 
 
+@timed()
 def show_ebay_search_form() -> None:
     """Display the eBay search form with category selection and filters."""
     try:
@@ -549,14 +566,77 @@ def show_ebay_search_form() -> None:
         st.error("An unexpected error occurred. Please try again later.")
 
 
-def get_data_string() -> str:
-    if "search_results" not in st.session_state:
-        st.session_state.search_results = []
-    item_strings = []
-    for item in st.session_state.search_results:
-        item_strings.append(f"{item.get('title', 'N/A')}|{item.get('price', '0.00')}|{item.get('condition', 'Unknown')}|{item.get('seller', 'Unknown')}|{item.get('comments', 'Unknown')}|{item.get('rating', 'Unknown')}")
-    return "\n".join(item_strings)
+def start_ranking(results: List[Dict[str, Any]]) -> str:
+    """Start (or reuse) the background ranking job whenever the search results change."""
+    jobs = get_services().ranking_jobs
+    ranking_key = st.session_state.get("ranking_key")
+    # The shared cache may also have evicted this session's ranking; failed jobs wait for a retry
+    lost = (
+        ranking_key is not None
+        and jobs.result(ranking_key) is None
+        and not jobs.is_running(ranking_key)
+        and jobs.error(ranking_key) is None
+    )
+    if st.session_state.get("ranking_source") is not results or lost:
+        st.session_state.ranking_key = jobs.submit(results)
+        st.session_state.ranking_source = results
+    return st.session_state.ranking_key
+
+
+@st.fragment(run_every=RANKING_POLL_SECONDS)
+def poll_ranking(ranking_key: str) -> None:
+    """Poll the ranking job without rerunning the page; rerun once when it has finished."""
+    jobs = get_services().ranking_jobs
+    if jobs.is_running(ranking_key):
+        st.caption("⏳ Ranking suppliers into Gold, Silver and Bronze...")
+    else:
+        # Ready or failed: the page shows the outcome and stops polling
+        st.rerun()
+
+
+def show_supplier_ranking(ranking_key: Optional[str]) -> Dict[Any, str]:
+    """
+    Show the Gold/Silver/Bronze ranking for the current results once it is ready.
+
+    Returns:
+        Dict[Any, str]: Listing id mapped to its tier, empty while ranking is running
+    """
+    if not ranking_key:
+        return {}
+    jobs = get_services().ranking_jobs
+    ranking = jobs.result(ranking_key)
+    if ranking is None:
+        error = jobs.error(ranking_key)
+        if error is None:
+            poll_ranking(ranking_key)
+            return {}
+        st.warning(f"Supplier ranking failed: {error}")
+        if st.button("Retry ranking", key="retry_supplier_ranking"):
+            jobs.submit(st.session_state.ranking_source)
+            st.rerun()
+        return {}
+
+    # Results are already shown inside an expander, which can't be nested
+    if st.toggle("🏅 Show supplier ranking", key="show_supplier_ranking"):
+        st.dataframe(
+            [
+                {
+                    "rank": entry["rank"],
+                    "tier": TIER_BADGES[entry["tier"]],
+                    "title": entry["title"],
+                    "seller": entry["seller"],
+                    "price": entry["price"],
+                    "score": entry["score"],
+                }
+                for entry in ranking
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+    return {entry["id"]: entry["tier"] for entry in ranking}
+
 
+@timed()
 def show_search_results() -> None:
     """Display the search results with sorting options."""
     st.header("Suppliers Listings")
@@ -567,24 +647,70 @@ def show_search_results() -> None:
         st.session_state.has_search = False
     if "search_results" not in st.session_state:
         st.session_state.search_results = []
-    st.session_state.search_results_string = get_data_string()
-    # print(st.session_state.search_results_string)
 
         
     sort_by = st.selectbox("Sort by", options=list(SORT_MAP.keys()), index=0)
     
-    items = st.session_state.search_results if st.session_state.has_search and st.session_state.search_results else all_supplier
+    has_results = st.session_state.has_search and st.session_state.search_results
+    items = st.session_state.search_results if has_results else all_supplier
+    tiers = show_supplier_ranking(start_ranking(st.session_state.search_results) if has_results else None)
     sorted_items = sort_items(items, sort_by)
     
     total_pages = math.ceil(len(sorted_items) / CARDS_PER_PAGE)
     start_idx = st.session_state.page * CARDS_PER_PAGE
     current_items = sorted_items[start_idx:start_idx + CARDS_PER_PAGE]
     
-    show_items_grid(current_items)
+    show_items_grid(current_items, tiers)
     show_pagination(st.session_state.page, total_pages)
 
 
+def _agreement_download(job_key: str, file_name: str, seller_info: Dict[str, Any]) -> bool:
+    """
+    Show the download button once the agreement PDF is rendered, or why it failed.
+
+    Returns:
+        bool: Whether the job has finished
+    """
+    renderer = get_services().pdf_renderer
+    running = renderer.is_running(job_key)
+    # Checked after is_running: a job is cached before it stops running
+    pdf_bytes = renderer.result(job_key)
+    if pdf_bytes is not None:
+        st.download_button(
+            label="Download Agreement (PDF)",
+            data=pdf_bytes,
+            file_name=file_name,
+            mime="application/pdf",
+            key=f"download_agreement_pdf_{job_key[:16]}"
+        )
+        return True
+    if running:
+        return False
+    # Not cached and not running; the error may also have been evicted from the renderer
+    st.error(f"Failed to generate PDF: {renderer.error(job_key) or 'the render job was lost'}")
+    st.button("Retry", key=f"retry_agreement_pdf_{job_key[:16]}", on_click=request_agreement_pdf, args=(seller_info,))
+    return True
+
+
+@st.fragment(run_every=PDF_POLL_SECONDS)
+def poll_agreement_download(job_key: str, supplier: Dict[str, Any]) -> None:
+    """Poll the render job without rerunning the dialog; reopen it once the job has finished."""
+    if get_services().pdf_renderer.is_running(job_key):
+        st.caption("⏳ Generating agreement PDF...")
+        return
+    # Only a full app run stops a fragment's polling, and it closes the dialog
+    st.session_state.reopen_email_dialog = supplier
+    st.rerun()
+
+
+def show_agreement_download(job_key: str, file_name: str, seller_info: Dict[str, Any], supplier: Dict[str, Any]) -> None:
+    """Show the agreement download, polling only while the PDF is still rendering."""
+    if not _agreement_download(job_key, file_name, seller_info):
+        poll_agreement_download(job_key, supplier)
+
+
 @st.dialog("Email Template")
+@timed()
 def show_email_dialog(supplier: Dict[str, Any]) -> None:
     """Display the email template dialog for a specific supplier."""
     try:
@@ -615,41 +741,28 @@ def show_email_dialog(supplier: Dict[str, Any]) -> None:
                 st.rerun()
         with col2:
             cart = Cart()
-            root_dir = Path(os.path.dirname(os.path.abspath(__file__))).parent.parent
-            agreement_file = root_dir / 'assets' / 'document_to_edit' / 'Supply_Agreement_Arial.html'
-            if agreement_file.exists():
-                encoding = detect_encoding(agreement_file)
-                html_content = None
-                for enc in [encoding, 'utf-16', 'utf-8-sig', 'windows-1252', 'latin-1']:
-                    try:
-                        with open(agreement_file, 'r', encoding=enc) as file:
-                            html_content = file.read()
-                            break
-                    except UnicodeDecodeError:
-                        continue
-                if html_content:
-                    seller_name = supplier.get('seller', 'Unknown Seller')
-                    seller_items = [item for item in cart.items if item.get('seller') == seller_name]
-                    if seller_items:
-                        seller_info = {'seller': seller_name, 'items': seller_items}
-                        html_content = fill_agreement_template(html_content, seller_info)
-                        pdf_io = io.BytesIO()
-                        HTML(string=html_content, base_url=str(agreement_file.parent)).write_pdf(pdf_io)
-                        pdf_bytes = pdf_io.getvalue()
-                        st.download_button(
-                            label="Agreement",
-                            data=pdf_bytes,
-                            file_name=f"Supply_Agreement_{seller_name}.pdf",
-                            mime="application/pdf",
-                            key=f"download_agreement_pdf_{supplier.get('id', hash(str(supplier)))}"
-                        )
-                
+            seller_name = supplier.get('seller', 'Unknown Seller')
+            seller_items = [item for item in cart.items if item.get('seller') == seller_name]
+            if seller_items and AGREEMENT_TEMPLATE_PATH.exists():
+                seller_info = {'seller': seller_name, 'items': seller_items}
+                job_key = agreement_pdf_key(seller_info)
+                requested = st.session_state.setdefault("agreement_requests", set())
+                # Rendered only on request, in the PDF process pool, unless already cached
+                if st.button("Agreement", key=f"agreement_button_{supplier.get('id', hash(str(supplier)))}"):
+                    with timer("request_agreement_pdf"):
+                        request_agreement_pdf(seller_info)
+                    requested.add(job_key)
+                if job_key in requested or get_services().pdf_renderer.result(job_key) is not None:
+                    show_agreement_download(job_key, f"Supply_Agreement_{seller_name}.pdf", seller_info, supplier)
+
     except Exception as e:
         logger.error(f"Error in email dialog: {str(e)}")
         st.error(f"An error occurred while preparing the email template: {str(e)}")
 
+@timed()
 def show_cart() -> None:
     """Display the shopping cart contents"""
+    cart = Cart()
     if not cart.items:
         st.info("Your cart is empty")
         return
@@ -716,5 +829,51 @@ def show_cart() -> None:
                     cart.remove_item(item.get('id', hash(item['title'])))
                     st.rerun()
     
+    # An agreement finished rendering while its dialog was open
+    reopen = st.session_state.pop("reopen_email_dialog", None)
+    if reopen is not None:
+        show_email_dialog(reopen)
+
     st.divider()
     st.metric("Total", f"AED {total_price:.2f}")
+    show_agreement_bundle(cart.items)
+
+
+@st.fragment(run_every=PDF_POLL_SECONDS)
+def poll_agreement_bundle(bundle: AgreementBundle) -> None:
+    """Collect finished agreements without rerunning the page; rerun once all are done."""
+    bundle.collect()
+    if bundle.complete:
+        st.rerun()
+    st.progress(bundle.finished / bundle.total, text=f"⏳ Generated {bundle.finished} of {bundle.total} agreements...")
+
+
+def show_agreement_bundle(cart_items: List[Dict[str, Any]]) -> None:
+    """Generate every seller's agreement in parallel and offer them as one ZIP."""
+    if not AGREEMENT_TEMPLATE_PATH.exists():
+        return
+    bundle = st.session_state.get("agreement_bundle")
+    if bundle is not None and not bundle.matches(cart_items):
+        bundle = st.session_state.agreement_bundle = None
+
+    seller_count = len(group_items_by_seller(cart_items))
+    if st.button(f"📄 Generate all agreements ({seller_count} sellers)", key="generate_all_agreements"):
+        with timer("request_agreement_bundle"):
+            bundle = st.session_state.agreement_bundle = AgreementBundle.start(cart_items)
+    if bundle is None:
+        return
+
+    bundle.collect()
+    if not bundle.complete:
+        poll_agreement_bundle(bundle)
+        return
+    for seller_name, error in bundle.failed.items():
+        st.error(f"Failed to generate the agreement for {seller_name}: {error}")
+    if len(bundle.failed) < bundle.total:
+        st.download_button(
+            label="Download all agreements (ZIP)",
+            data=bundle.zip_bytes(),
+            file_name="Supply_Agreements.zip",
+            mime="application/zip",
+            key="download_all_agreements"
+        )
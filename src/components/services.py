@@ -0,0 +1,273 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from src.components.conf_variables import (
+    EBAY_POOL_SIZE,
+    LLM_POOL_SIZE,
+    LLM_BASE_URL_ENV,
+    LLM_KEEPALIVE_CONNECTIONS,
+    LLM_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Bookkeeping for a shared HTTP connection pool.
+
+    Caps the number of concurrent requests at the pool size (so callers wait
+    for a free connection instead of opening new ones) and reports utilization.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._peak = 0
+        self._total = 0
+        self._wait_seconds = 0.0
+
+    @contextmanager
+    def lease(self):
+        """Hold one connection slot for the duration of a request."""
+        start = time.perf_counter()
+        self._semaphore.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._peak = max(self._peak, self._in_use)
+            self._total += 1
+            self._wait_seconds += waited
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "peak": self._peak,
+                "utilization": self._in_use / self.size,
+                "requests": self._total,
+                "avg_wait_ms": (self._wait_seconds / self._total * 1000) if self._total else 0.0,
+            }
+
+
+class ServiceContainer:
+    """
+    Process-scoped owner of the shared eBay and LLM clients.
+
+    Clients are built lazily on first use and shared by every session, so
+    sessions only carry lightweight per-user state (messages, cart, results).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ebay_api = None
+        self._llm_client = None
+        self._chatbot = None
+        self._completion_cache = None
+        self._tool_executor = None
+        self._page_fetcher = None
+        self._model_stats = None
+        self._ranking_jobs = None
+        self._transcript_store = None
+        self._summarizer = None
+        self._pdf_renderer = None
+        self.pools = {
+            "ebay": ConnectionPool("ebay", EBAY_POOL_SIZE),
+            "llm": ConnectionPool("llm", LLM_POOL_SIZE),
+        }
+
+    @property
+    def ebay_api(self):
+        """The shared EbayAPI client. Raises ValueError if credentials are missing."""
+        if self._ebay_api is None:
+            with self._lock:
+                if self._ebay_api is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from src.components.ebay_api import EbayAPI
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=EBAY_POOL_SIZE)
+                    session.mount("https://", adapter)
+                    self._ebay_api = EbayAPI(session=session, pool=self.pools["ebay"])
+                    logger.info(f"Created shared eBay client (pool size {EBAY_POOL_SIZE})")
+        return self._ebay_api
+
+    @property
+    def llm_client(self):
+        """The shared Cerebras client. Raises ValueError if the API key is missing."""
+        if self._llm_client is None:
+            with self._lock:
+                if self._llm_client is None:
+                    api_key = os.getenv("CEREBRAS_API_KEY")
+                    if not api_key:
+                        raise ValueError("API key is required to initialize ChatbotClient")
+
+                    import httpx
+                    from cerebras.cloud.sdk import Cerebras, DefaultHttpxClient
+
+                    http_client = DefaultHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=LLM_POOL_SIZE,
+                            max_keepalive_connections=LLM_KEEPALIVE_CONNECTIONS,
+                        ),
+                        timeout=LLM_TIMEOUT,
+                    )
+                    base_url = os.getenv(LLM_BASE_URL_ENV) or None
+                    self._llm_client = Cerebras(api_key=api_key, base_url=base_url, http_client=http_client)
+                    logger.info(f"Created shared LLM client for {base_url or 'Cerebras'} (pool size {LLM_POOL_SIZE})")
+        return self._llm_client
+
+    @property
+    def chatbot(self):
+        """The shared ChatbotClient, bound to the shared LLM client."""
+        if self._chatbot is None:
+            llm_client = self.llm_client
+            cache = self.completion_cache
+            tool_executor = self.tool_executor
+            model_stats = self.model_stats
+            with self._lock:
+                if self._chatbot is None:
+                    from src.components.chatbot import ChatbotClient
+
+                    self._chatbot = ChatbotClient(
+                        client=llm_client,
+                        pool=self.pools["llm"],
+                        cache=cache,
+                        tool_executor=tool_executor,
+                        stats=model_stats,
+                    )
+        return self._chatbot
+
+    @property
+    def completion_cache(self):
+        """The shared two-tier chat completion cache."""
+        if self._completion_cache is None:
+            from src.components.llm_cache import CompletionCache
+
+            cache = CompletionCache()
+            with self._lock:
+                if self._completion_cache is None:
+                    self._completion_cache = cache
+        return self._completion_cache
+
+    @property
+    def tool_executor(self):
+        """The shared, bounded thread pool for chatbot tool calls."""
+        if self._tool_executor is None:
+            from src.components.tools import ToolExecutor
+
+            executor = ToolExecutor()
+            with self._lock:
+                if self._tool_executor is None:
+                    self._tool_executor = executor
+        return self._tool_executor
+
+    @property
+    def page_fetcher(self):
+        """The shared, cached web page fetcher used by the fetch_url tool."""
+        if self._page_fetcher is None:
+            from src.components.web_fetch import PageFetcher
+
+            fetcher = PageFetcher()
+            with self._lock:
+                if self._page_fetcher is None:
+                    self._page_fetcher = fetcher
+        return self._page_fetcher
+
+    @property
+    def model_stats(self):
+        """Per-model latency and token usage for the chatbot."""
+        if self._model_stats is None:
+            from src.components.model_router import ModelStats
+
+            stats = ModelStats()
+            with self._lock:
+                if self._model_stats is None:
+                    self._model_stats = stats
+        return self._model_stats
+
+    @property
+    def ranking_jobs(self):
+        """The shared background Gold/Silver/Bronze ranking jobs."""
+        if self._ranking_jobs is None:
+            from src.components.ranking_job import RankingJobs
+
+            jobs = RankingJobs()
+            with self._lock:
+                if self._ranking_jobs is None:
+                    self._ranking_jobs = jobs
+        return self._ranking_jobs
+
+    @property
+    def transcript_store(self):
+        """The shared on-disk store of chat transcripts and summaries."""
+        if self._transcript_store is None:
+            from src.components.transcripts import TranscriptStore
+
+            store = TranscriptStore()
+            with self._lock:
+                if self._transcript_store is None:
+                    self._transcript_store = store
+        return self._transcript_store
+
+    @property
+    def summarizer(self):
+        """The shared background chat summarizer."""
+        if self._summarizer is None:
+            from src.components.summarizer import ConversationSummarizer
+
+            summarizer = ConversationSummarizer()
+            with self._lock:
+                if self._summarizer is None:
+                    self._summarizer = summarizer
+        return self._summarizer
+
+    @property
+    def pdf_renderer(self):
+        """The shared process pool that renders supply agreement PDFs."""
+        if self._pdf_renderer is None:
+            from src.components.pdf_renderer import PdfRenderer
+
+            renderer = PdfRenderer()
+            with self._lock:
+                if self._pdf_renderer is None:
+                    self._pdf_renderer = renderer
+        return self._pdf_renderer
+
+    def pool_utilization(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Report utilization for every shared connection pool.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Pool name mapped to size, in_use, peak,
+                utilization, requests and avg_wait_ms
+        """
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+_container: Optional[ServiceContainer] = None
+_container_lock = threading.Lock()
+
+
+def get_services() -> ServiceContainer:
+    """Return the process-wide service container."""
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = ServiceContainer()
+    return _container
@@ -0,0 +1,136 @@
+import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence, Set
+from src.components.context_packer import count_tokens, truncate_lines
+from src.components.profiling import timer
+from src.components.services import get_services
+from src.components.conf_variables import (
+    SUMMARY_INPUT_TOKENS,
+    SUMMARY_KEEP_RECENT_MESSAGES,
+    SUMMARY_MAX_TOKENS,
+    SUMMARY_MODEL,
+    SUMMARY_TRIGGER_TOKENS,
+    SUMMARY_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain the memory of a procurement chat. Merge the previous summary and the new "
+    "conversation turns into one updated summary of short bullet points. Keep the user's "
+    "requirements (products, budget, quantities, delivery), suppliers and listings discussed, "
+    "decisions made and open questions. Drop pleasantries. Use at most {words} words."
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def extractive_summary(previous: Optional[str], messages: Sequence[Dict[str, str]], budget: int = SUMMARY_MAX_TOKENS) -> str:
+    """
+    Summarize without a model: the first sentence of every turn, newest kept.
+
+    Used when the summarization model is unavailable or fails.
+    """
+    lines = previous.split("\n") if previous else []
+    for message in messages:
+        content = " ".join((message.get("content") or "").split())
+        if not content:
+            continue
+        first_sentence = _SENTENCE_END.split(content, maxsplit=1)[0][:200]
+        lines.append(f"- {message.get('role', 'user')}: {first_sentence}")
+
+    # Keep the most recent lines that fit
+    kept = []
+    used = 0
+    for line in reversed(lines):
+        line_tokens = count_tokens(line)
+        if used + line_tokens > budget:
+            break
+        kept.append(line)
+        used += line_tokens
+    return "\n".join(reversed(kept))
+
+
+class ConversationSummarizer:
+    """
+    Rolls old chat turns into a compact summary on a background thread.
+
+    Once the turns that are neither summarized nor among the most recent
+    SUMMARY_KEEP_RECENT_MESSAGES exceed SUMMARY_TRIGGER_TOKENS, they are
+    merged with the previous summary by the small model (with an extractive
+    fallback) and the log's summary is moved past them. A long backlog is
+    summarized in SUMMARY_INPUT_TOKENS chunks, one job after another.
+    """
+
+    def __init__(self, max_workers: int = SUMMARY_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summarizer")
+        self._lock = threading.Lock()
+        self._running: Set[int] = set()
+
+    def maybe_compact(self, log) -> bool:
+        """
+        Start compacting `log` in the background if enough old turns have piled up.
+
+        Returns:
+            bool: Whether a compaction job was started
+        """
+        start = log.summarized_upto
+        limit = len(log) - SUMMARY_KEEP_RECENT_MESSAGES
+        # Summarize at most SUMMARY_INPUT_TOKENS per job; later jobs catch up on the rest
+        end = start
+        pending = 0
+        while end < limit and pending < SUMMARY_INPUT_TOKENS:
+            pending += log.message_tokens(end)
+            end += 1
+        if pending < SUMMARY_TRIGGER_TOKENS:
+            return False
+
+        with self._lock:
+            if id(log) in self._running:
+                return False
+            self._running.add(id(log))
+        self._executor.submit(self._compact, log, start, end)
+        return True
+
+    def _compact(self, log, start: int, end: int) -> None:
+        try:
+            previous = log.summary
+            messages = log[start:end]
+            with timer("chat.summarize"):
+                try:
+                    summary = self._model_summary(previous, messages)
+                except Exception as e:
+                    logger.warning(f"Falling back to extractive chat summary: {str(e)}")
+                    summary = extractive_summary(previous, messages)
+
+            log.set_summary(summary, end)
+            if log.store is not None:
+                log.store.save_summary(log.session_id, end, summary)
+            logger.info(f"Summarized chat messages {start}-{end} into {count_tokens(summary)} tokens")
+        except Exception as e:
+            logger.error(f"Error summarizing chat: {str(e)}")
+            return
+        finally:
+            with self._lock:
+                self._running.discard(id(log))
+        # Catch up if more turns piled up while this job ran
+        self.maybe_compact(log)
+
+    def _model_summary(self, previous: Optional[str], messages: Sequence[Dict[str, str]]) -> str:
+        transcript = "\n".join(f"{m.get('role', 'user')}: {m.get('content') or ''}" for m in messages)
+        content = (
+            f"Previous summary:\n{previous or '(none)'}\n\n"
+            f"New turns:\n{truncate_lines(transcript, SUMMARY_INPUT_TOKENS)}"
+        )
+        summary = get_services().chatbot.complete(
+            [
+                {"role": "system", "content": SUMMARY_PROMPT.format(words=SUMMARY_MAX_TOKENS * 3 // 4)},
+                {"role": "user", "content": content},
+            ],
+            model=SUMMARY_MODEL,
+            max_tokens=SUMMARY_MAX_TOKENS,
+        )
+        if not summary or not summary.strip():
+            raise ValueError("empty summary")
+        return truncate_lines(summary.strip(), SUMMARY_MAX_TOKENS)
@@ -0,0 +1,167 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+from src.components.profiling import timer
+from src.components.services import get_services
+from src.components.conf_variables import FETCH_MAX_TIMEOUT, TOOL_CALL_TIMEOUT, TOOL_MAX_WORKERS, TOOL_QUEUE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_url(url: str, timeout: float = 5.0) -> str:
+    """
+    Fetch the readable text at `url`, size-capped and cached per URL.
+
+    The model chooses `timeout`; it is clamped to FETCH_MAX_TIMEOUT.
+    """
+    timeout = min(max(float(timeout), 0.1), FETCH_MAX_TIMEOUT)
+    return get_services().page_fetcher.fetch(url, timeout=timeout)
+
+
+TOOL_DEFINITIONS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "fetch_url",
+            "description": "Fetch the readable text content of a web page.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string", "format": "uri"},
+                    "timeout": {"type": "number", "default": 5.0, "maximum": FETCH_MAX_TIMEOUT},
+                },
+                "required": ["url"],
+            },
+        },
+    }
+]
+
+TOOL_FUNCTIONS: Dict[str, Callable[..., str]] = {
+    "fetch_url": fetch_url,
+}
+
+
+def tool_call_to_dict(tool_call: Any) -> Dict[str, Any]:
+    """Convert an SDK tool call (or an accumulated dict) into a request message part."""
+    if isinstance(tool_call, dict):
+        return tool_call
+    return {
+        "id": tool_call.id,
+        "type": "function",
+        "function": {
+            "name": tool_call.function.name,
+            "arguments": tool_call.function.arguments,
+        },
+    }
+
+
+class _CallStart:
+    """Marks when a queued tool call started running."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.at: Optional[float] = None
+
+    def set(self) -> None:
+        self.at = time.monotonic()
+        self.event.set()
+
+
+class ToolExecutor:
+    """
+    Runs the tool calls from one model turn concurrently on a bounded thread pool.
+
+    The pool is shared by every session, so a call may wait for a free
+    worker; its timeout only starts once it runs.
+    """
+
+    def __init__(self, max_workers: int = TOOL_MAX_WORKERS, functions: Optional[Dict[str, Callable[..., str]]] = None):
+        self.max_workers = max_workers
+        self.functions = functions if functions is not None else TOOL_FUNCTIONS
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="chat-tool"
+                    )
+        return self._executor
+
+    def _call(self, name: str, arguments: str, started: _CallStart, queue_deadline: float) -> str:
+        started.set()
+        if started.at > queue_deadline:
+            # The caller may still be waiting on an earlier call, so it couldn't cancel this one in time
+            return self._busy(name)
+        function = self.functions.get(name)
+        if function is None:
+            return f"Error: unknown tool '{name}'"
+        try:
+            kwargs = json.loads(arguments) if arguments else {}
+        except json.JSONDecodeError as e:
+            return f"Error: invalid arguments for {name}: {str(e)}"
+        with timer(f"tool.{name}"):
+            result = function(**kwargs)
+        return result if isinstance(result, str) else json.dumps(result, default=str)
+
+    @staticmethod
+    def _busy(name: str) -> str:
+        logger.warning(f"Tool call {name} waited too long for a worker and was not run")
+        return f"Error: {name} could not be run, the tool workers are busy"
+
+    def _wait(self, name: str, future, started: _CallStart, submitted: float, timeout: float, queue_timeout: float) -> str:
+        queued = started.event.wait(timeout=max(submitted + queue_timeout - time.monotonic(), 0))
+        if not queued and future.cancel():
+            return self._busy(name)
+        # Cancelling fails once the call has started, so started.at is set or about to be
+        started.event.wait()
+        try:
+            return future.result(timeout=max(started.at + timeout - time.monotonic(), 0))
+        except FutureTimeoutError:
+            logger.warning(f"Tool call {name} timed out after {timeout:.1f}s")
+            return f"Error: {name} timed out after {timeout:.1f} seconds"
+
+    def run(
+        self,
+        tool_calls: List[Any],
+        timeout: float = TOOL_CALL_TIMEOUT,
+        queue_timeout: float = TOOL_QUEUE_TIMEOUT,
+    ) -> List[Dict[str, str]]:
+        """
+        Execute every tool call concurrently and return one tool message per call.
+
+        Args:
+            tool_calls: Tool calls from a single assistant turn
+            timeout: Seconds each call may run before reporting a timeout
+            queue_timeout: Seconds a call may wait for a free worker
+
+        Returns:
+            List[Dict[str, str]]: Tool result messages, in the order of `tool_calls`
+        """
+        calls = [tool_call_to_dict(tool_call) for tool_call in tool_calls]
+        submitted = time.monotonic()
+        jobs = []
+        # Each call's timeout runs from its own start, not from submission
+        for call in calls:
+            started = _CallStart()
+            future = self.executor.submit(
+                self._call, call["function"]["name"], call["function"].get("arguments"), started, submitted + queue_timeout
+            )
+            jobs.append((call, future, started))
+
+        results = []
+        for call, future, started in jobs:
+            name = call["function"]["name"]
+            try:
+                content = self._wait(name, future, started, submitted, timeout, queue_timeout)
+            except Exception as e:
+                logger.warning(f"Tool call {name} failed: {str(e)}")
+                content = f"Error: {name} failed: {str(e)}"
+            results.append({"role": "tool", "tool_call_id": call["id"], "content": content})
+        return results
@@ -0,0 +1,175 @@
+import hmac
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from src.components.conf_variables import (
+    TRANSCRIPT_DB_PATH,
+    TRANSCRIPT_MAX_SESSIONS,
+    TRANSCRIPT_PRUNE_SECONDS,
+    TRANSCRIPT_RETENTION_DAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptStore:
+    """
+    Local SQLite store of full chat transcripts and their rolling summaries.
+
+    Every message is written as it is added, so a session that disconnects
+    can be resumed. Resuming needs the session's secret token, of which
+    only a hash is stored. Token counts are stored alongside messages so
+    resuming doesn't re-tokenize the transcript.
+
+    Sessions idle for `retention_days`, and the oldest beyond
+    `max_sessions`, are deleted with their messages and summaries, at most
+    once every TRANSCRIPT_PRUNE_SECONDS.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = TRANSCRIPT_DB_PATH,
+        retention_days: float = TRANSCRIPT_RETENTION_DAYS,
+        max_sessions: int = TRANSCRIPT_MAX_SESSIONS,
+    ):
+        self.path = Path(path) if path else None
+        self.retention_seconds = retention_days * 24 * 3600
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._pruned = 0.0
+        if self.path:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS messages ("
+                        "session_id TEXT, seq INTEGER, role TEXT, content TEXT, tokens INTEGER, created REAL, "
+                        "PRIMARY KEY (session_id, seq))"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS summaries ("
+                        "session_id TEXT PRIMARY KEY, upto INTEGER, content TEXT, updated REAL)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS sessions ("
+                        "session_id TEXT PRIMARY KEY, token_hash TEXT, created REAL, updated REAL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+            except sqlite3.Error as e:
+                logger.error(f"Disabling chat transcript store: {str(e)}")
+                self.path = None
+        self.prune()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    @staticmethod
+    def _hash(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def create_session(self, session_id: str, token: str) -> None:
+        """Register a new session that can later be resumed with `token`."""
+        if not self.path:
+            return
+        now = time.time()
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, token_hash, created, updated) VALUES (?, ?, ?, ?)",
+                    (session_id, self._hash(token), now, now),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Session write failed: {str(e)}")
+
+    def verify(self, session_id: str, token: str) -> bool:
+        """Whether `token` is the one `session_id` was created with."""
+        if not self.path or not session_id or not token:
+            return False
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute("SELECT token_hash FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Session read failed: {str(e)}")
+            return False
+        return row is not None and hmac.compare_digest(row[0], self._hash(token))
+
+    def prune(self) -> None:
+        """Delete expired sessions, the oldest beyond max_sessions, and messages of unknown sessions."""
+        if not self.path:
+            return
+        self._pruned = time.time()
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM sessions WHERE updated < ?", (self._pruned - self.retention_seconds,))
+                conn.execute(
+                    "DELETE FROM sessions WHERE session_id NOT IN "
+                    "(SELECT session_id FROM sessions ORDER BY updated DESC LIMIT ?)",
+                    (self.max_sessions,),
+                )
+                messages = conn.execute(
+                    "DELETE FROM messages WHERE session_id NOT IN (SELECT session_id FROM sessions)"
+                ).rowcount
+                conn.execute("DELETE FROM summaries WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+            if messages:
+                logger.info(f"Pruned {messages} chat transcript messages")
+        except sqlite3.Error as e:
+            logger.warning(f"Transcript pruning failed: {str(e)}")
+
+    def append(self, session_id: str, seq: int, message: Dict[str, str], tokens: int) -> None:
+        if not self.path:
+            return
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO messages (session_id, seq, role, content, tokens, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, seq, message.get("role"), message.get("content") or "", tokens, time.time()),
+                )
+                conn.execute("UPDATE sessions SET updated = ? WHERE session_id = ?", (time.time(), session_id))
+        except sqlite3.Error as e:
+            logger.warning(f"Transcript write failed: {str(e)}")
+        if time.time() - self._pruned > TRANSCRIPT_PRUNE_SECONDS:
+            self.prune()
+
+    def save_summary(self, session_id: str, upto: int, content: str) -> None:
+        if not self.path:
+            return
+        try:
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (session_id, upto, content, updated) VALUES (?, ?, ?, ?)",
+                    (session_id, upto, content, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Summary write failed: {str(e)}")
+
+    def load(self, session_id: str) -> Tuple[List[Tuple[Dict[str, str], int]], Optional[Tuple[str, int]]]:
+        """
+        Load a stored session.
+
+        Returns:
+            Tuple: (message, tokens) pairs in order, and the (summary, upto)
+                pair if the session has been summarized
+        """
+        if not self.path:
+            return [], None
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT role, content, tokens FROM messages WHERE session_id = ? ORDER BY seq",
+                    (session_id,),
+                ).fetchall()
+                summary = conn.execute(
+                    "SELECT content, upto FROM summaries WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Transcript read failed: {str(e)}")
+            return [], None
+        messages = [({"role": role, "content": content}, tokens) for role, content, tokens in rows]
+        return messages, (summary[0], summary[1]) if summary else None
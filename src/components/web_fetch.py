@@ -0,0 +1,174 @@
+import re
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import httpx
+from cachetools import LRUCache
+from src.components.context_packer import count_tokens, truncate_lines
+from src.components.conf_variables import (
+    FETCH_CACHE_ENTRIES,
+    FETCH_CACHE_TTL,
+    FETCH_MAX_BYTES,
+    FETCH_MAX_TOKENS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Elements that never carry readable page text
+_DROP_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "head")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+
+
+@dataclass
+class FetchedPage:
+    text: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def extract_text(body: bytes, content_type: str = "", encoding: Optional[str] = None) -> str:
+    """
+    Turn a downloaded body into readable text.
+
+    HTML is parsed with lxml, scripts/styles/head are dropped and the text is
+    collapsed to one block per line. Other text types are decoded as-is.
+
+    Args:
+        body: Raw (possibly truncated) response body
+        content_type: The response Content-Type header
+        encoding: Charset from the response headers, if any
+
+    Returns:
+        str: Extracted text
+    """
+    if "html" not in content_type and not body.lstrip().startswith(b"<"):
+        return body.decode(encoding or "utf-8", errors="replace").strip()
+
+    import lxml.html
+    from lxml.etree import ParserError
+
+    try:
+        document = lxml.html.document_fromstring(body)
+    except (ParserError, ValueError) as e:
+        logger.warning(f"Could not parse fetched HTML: {str(e)}")
+        return ""
+
+    title = document.findtext(".//title") or ""
+    for element in list(document.iter(*_DROP_TAGS)):
+        element.drop_tree()
+    for element in document.iter("br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"):
+        element.tail = "\n" + (element.tail or "")
+
+    text = _SPACES.sub(" ", document.text_content())
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    text = _BLANK_LINES.sub("\n", text).strip()
+    if title.strip():
+        text = f"{title.strip()}\n{text}"
+    return text
+
+
+class PageFetcher:
+    """
+    Fetches web pages for the chatbot as size-capped, token-budgeted text.
+
+    Bodies are streamed and cut off at `max_bytes`, so a huge page never gets
+    fully downloaded. Extracted text is cached per URL: within `ttl` it is
+    served directly, after that it is revalidated with ETag/Last-Modified and
+    a 304 keeps the cached text.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = FETCH_MAX_BYTES,
+        max_tokens: int = FETCH_MAX_TOKENS,
+        ttl: float = FETCH_CACHE_TTL,
+        entries: int = FETCH_CACHE_ENTRIES,
+        client: Optional[httpx.Client] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.ttl = ttl
+        self._client = client or httpx.Client(follow_redirects=True)
+        self._cache = LRUCache(maxsize=entries)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+
+    def fetch(self, url: str, timeout: float = 5.0) -> str:
+        """
+        Return the readable text of `url`, truncated to the token budget.
+
+        Args:
+            url: Page to fetch
+            timeout: Request timeout in seconds
+
+        Returns:
+            str: Extracted page text
+        """
+        with self._lock:
+            cached = self._cache.get(url)
+        if cached and time.time() - cached.fetched_at < self.ttl:
+            with self._lock:
+                self._hits += 1
+            return cached.text
+
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        with self._client.stream("GET", url, headers=headers, timeout=timeout) as resp:
+            if cached and resp.status_code == 304:
+                page = FetchedPage(cached.text, time.time(), cached.etag, cached.last_modified)
+                with self._lock:
+                    self._cache[url] = page
+                    self._revalidated += 1
+                logger.info(f"Revalidated cached page {url}")
+                return page.text
+
+            resp.raise_for_status()
+            body = self._read_capped(resp)
+            text = extract_text(body, resp.headers.get("content-type", ""), resp.charset_encoding)
+            page = FetchedPage(
+                text=truncate_lines(text, self.max_tokens),
+                fetched_at=time.time(),
+                etag=resp.headers.get("etag"),
+                last_modified=resp.headers.get("last-modified"),
+            )
+
+        with self._lock:
+            self._cache[url] = page
+            self._misses += 1
+        logger.info(
+            f"Fetched {url}: {len(body)} bytes, {count_tokens(text)} tokens extracted, "
+            f"{count_tokens(page.text)} kept"
+        )
+        return page.text
+
+    def _read_capped(self, resp: httpx.Response) -> bytes:
+        chunks = []
+        size = 0
+        for chunk in resp.iter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                logger.info(f"Stopped reading {resp.url} at {self.max_bytes} bytes")
+                break
+        return b"".join(chunks)[: self.max_bytes]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._revalidated + self._misses
+            return {
+                "entries": len(self._cache),
+                "hits": self._hits,
+                "revalidated": self._revalidated,
+                "misses": self._misses,
+                "hit_rate": (self._hits + self._revalidated) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,72 @@
+import re
+
+from src.components.agreement_template import SCHEDULE_TITLE, agreement_context, agreement_key, schedule_parts
+from src.components.conf_variables import LARGE_ORDER_ITEMS
+
+TEMPLATE = "<html><body><p>[SUPPLIER NAME]</p></body></html>"
+DATE = "2025-01-01"
+
+
+def order(count, seller="tech_outlet"):
+    return {
+        "seller": seller,
+        "items": [{"title": f"Laptop {i}", "price": f"{100 + i}.00", "condition": "Used"} for i in range(count)],
+    }
+
+
+def test_agreement_key_is_stable_for_the_same_printed_agreement():
+    respaced = order(2)
+    respaced["items"][0] = {"title": "  Laptop   0 ", "price": 100, "condition": "Used"}
+    assert agreement_key(TEMPLATE, order(2), DATE) == agreement_key(TEMPLATE, respaced, DATE)
+
+
+def test_agreement_key_changes_with_what_is_printed():
+    key = agreement_key(TEMPLATE, order(2), DATE)
+    reordered = order(2)
+    reordered["items"].reverse()
+    repriced = order(2)
+    repriced["items"][1]["price"] = "101.01"
+    assert key != agreement_key(TEMPLATE + " ", order(2), DATE)
+    assert key != agreement_key(TEMPLATE, order(2, seller="other"), DATE)
+    assert key != agreement_key(TEMPLATE, reordered, DATE)
+    assert key != agreement_key(TEMPLATE, repriced, DATE)
+    assert key != agreement_key(TEMPLATE, order(2), "2025-01-02")
+
+
+def test_agreement_key_treats_a_single_listing_as_a_one_item_order():
+    listing = {"seller": "tech_outlet", "title": "Laptop 0", "price": "100.00", "condition": "Used"}
+    assert agreement_key(TEMPLATE, listing, DATE) == agreement_key(TEMPLATE, order(1), DATE)
+
+
+def test_small_orders_have_no_schedule():
+    context = agreement_context(order(3), supplier_address="Dubai", date=DATE)
+    assert len(context["line_items"]) == 3
+    assert context["schedule"] == []
+    assert schedule_parts(context) == []
+
+
+def test_large_orders_list_one_line_and_a_schedule():
+    context = agreement_context(order(LARGE_ORDER_ITEMS), supplier_address="Dubai", date=DATE)
+    assert context["line_items"] == [
+        f"{LARGE_ORDER_ITEMS} items as listed in {SCHEDULE_TITLE} - AED {context['total_price']}"
+    ]
+    assert len(context["schedule"]) == LARGE_ORDER_ITEMS
+
+
+def test_schedule_parts_number_rows_across_parts():
+    context = agreement_context(order(LARGE_ORDER_ITEMS + 5), supplier_address="Dubai", date=DATE)
+    rows_per_part = LARGE_ORDER_ITEMS // 2
+    parts = schedule_parts(context, rows_per_part=rows_per_part)
+    assert len(parts) == 3
+    numbers = [int(n) for part in parts for n in re.findall(r'<td class="number">(\d+)</td>', part)]
+    assert numbers == list(range(1, LARGE_ORDER_ITEMS + 6))
+    assert [f"<h1>{SCHEDULE_TITLE}</h1>" in part for part in parts] == [True, False, False]
+    assert ['class="total"' in part for part in parts] == [False, False, True]
+
+
+def test_schedule_parts_escape_listing_text():
+    large = order(LARGE_ORDER_ITEMS)
+    large["items"][0]["title"] = "<script>alert(1)</script>"
+    parts = schedule_parts(agreement_context(large, supplier_address="Dubai", date=DATE))
+    assert "<script>" not in parts[0]
+    assert "&lt;script&gt;" in parts[0]
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from src.components.assets import AssetCache
+
+loads = []
+
+
+def read(path):
+    loads.append(path)
+    return path.read_text()
+
+
+def upper(path):
+    return path.read_text().upper()
+
+
+@pytest.fixture(autouse=True)
+def reset_loads():
+    loads.clear()
+
+
+def test_unchanged_file_is_loaded_once(tmp_path, monkeypatch):
+    path = tmp_path / "style.css"
+    path.write_text("p{}")
+    cache = AssetCache()
+    monkeypatch.chdir(tmp_path)
+    assert cache.load(path, read) == "p{}"
+    assert cache.load("style.css", read) == "p{}"
+    assert len(loads) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_file_is_reloaded_when_its_size_changes(tmp_path):
+    path = tmp_path / "style.css"
+    path.write_text("p{}")
+    stat = path.stat()
+    cache = AssetCache()
+    cache.load(path, read)
+    path.write_text("p{color:red}")
+    # Same modification time, so only the size tells the files apart
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.load(path, read) == "p{color:red}"
+    assert len(loads) == 2
+
+
+def test_file_is_reloaded_when_its_mtime_changes(tmp_path):
+    path = tmp_path / "style.css"
+    path.write_text("p{}")
+    stat = path.stat()
+    cache = AssetCache()
+    cache.load(path, read)
+    path.write_text("a{}")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert cache.load(path, read) == "a{}"
+    assert len(loads) == 2
+
+
+def test_each_loader_gets_its_own_entry(tmp_path):
+    path = tmp_path / "style.css"
+    path.write_text("p{}")
+    cache = AssetCache()
+    assert cache.load(path, read) == "p{}"
+    assert cache.load(path, upper) == "P{}"
+    assert cache.stats()["entries"] == 2
+
+
+def test_clear_forgets_every_entry(tmp_path):
+    path = tmp_path / "style.css"
+    path.write_text("p{}")
+    cache = AssetCache()
+    cache.load(path, read)
+    cache.clear()
+    cache.load(path, read)
+    assert len(loads) == 2
+    assert cache.stats()["misses"] == 1
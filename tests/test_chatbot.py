@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from src.components.chatbot import TOOL_LOOP_FALLBACK, ChatbotClient
+from src.components.conf_variables import TOOL_LOOP_MAX_ITERATIONS
+from src.components.tools import ToolExecutor
+
+
+class FakeClient:
+    """Answers every request with `replies` in turn, repeating the last one."""
+
+    api_key = "test"
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **params):
+        self.requests.append(params)
+        content, tool_calls = self.replies[min(len(self.requests), len(self.replies)) - 1]
+        message = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def fetch_call(call_id="1"):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name="fetch_url", arguments='{"url": "https://example.com"}'))
+
+
+def chatbot(client):
+    return ChatbotClient(client=client, tool_executor=ToolExecutor(functions={"fetch_url": lambda url: f"text of {url}"}))
+
+
+def test_tool_results_are_fed_back_until_the_model_answers():
+    client = FakeClient((None, [fetch_call()]), ("The page says hello", None))
+    assert chatbot(client).send_messages([{"role": "user", "content": "What does it say?"}]) == "The page says hello"
+    tool_message = client.requests[1]["messages"][-1]
+    assert tool_message == {"role": "tool", "tool_call_id": "1", "content": "text of https://example.com"}
+
+
+def test_model_still_calling_tools_after_the_last_turn_gets_a_fallback_answer():
+    client = FakeClient((None, [fetch_call()]))
+    assert chatbot(client).send_messages([{"role": "user", "content": "What does it say?"}]) == TOOL_LOOP_FALLBACK
+    assert len(client.requests) == TOOL_LOOP_MAX_ITERATIONS
+    assert client.requests[-1]["tool_choice"] == "none"
@@ -0,0 +1,78 @@
+from src.components.context_packer import (
+    CART_PREFIX,
+    RESULTS_PREFIX,
+    TRUNCATION_MARKER,
+    count_tokens,
+    pack_context,
+    truncate_lines,
+)
+
+
+def test_count_tokens_charges_long_words_per_six_characters():
+    assert count_tokens("") == 0
+    assert count_tokens("a b, c") == 4
+    assert count_tokens("x" * 13) == 3
+
+
+def test_truncate_lines_returns_text_that_fits_unchanged():
+    text = "one\ntwo\nthree"
+    assert truncate_lines(text, 100) == text
+
+
+def test_truncate_lines_keeps_whole_lines_from_the_start():
+    text = "\n".join(f"line {i}" for i in range(100))
+    kept = truncate_lines(text, 30)
+    assert kept.endswith(TRUNCATION_MARKER)
+    lines = kept[:-len(TRUNCATION_MARKER)].split("\n")
+    assert lines == [f"line {i}" for i in range(len(lines))]
+    assert count_tokens(kept) <= 30
+
+
+def test_truncate_lines_cuts_a_single_long_line():
+    kept = truncate_lines("word " * 5000, 100)
+    assert kept.startswith("word word")
+    assert kept.endswith(TRUNCATION_MARKER)
+    assert count_tokens(kept) <= 100
+
+
+def test_truncate_lines_whole_lines_drops_a_line_that_does_not_fit():
+    assert truncate_lines("word " * 5000, 100, whole_lines=True) == ""
+
+
+def test_truncate_lines_returns_empty_when_nothing_fits():
+    assert truncate_lines("word " * 50, 1) == ""
+
+
+def test_pack_context_keeps_everything_within_budget():
+    history = [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+        {"role": "user", "content": "cheapest laptop?"},
+    ]
+    packed = pack_context(history, "system", 1000, cart="cart row", results="result row")
+    assert [m["content"] for m in packed.messages] == [
+        "system", "hi", "hello", CART_PREFIX + "cart row", RESULTS_PREFIX + "result row", "cheapest laptop?",
+    ]
+    assert packed.truncated == []
+    assert packed.tokens <= 1000
+
+
+def test_pack_context_sends_one_system_prompt_and_the_latest_message():
+    history = [{"role": "system", "content": "old system"}]
+    history += [{"role": "user", "content": f"question {i} " * 20} for i in range(20)]
+    packed = pack_context(history, "system", 80)
+    assert [m["role"] for m in packed.messages].count("system") == 1
+    assert packed.messages[-1] == history[-1]
+    assert packed.dropped_messages > 0
+    assert packed.tokens <= 80
+
+
+def test_pack_context_truncates_results_by_whole_rows():
+    history = [{"role": "user", "content": "laptops"}]
+    results = "\n".join(f"{i}|laptop {i}|{100 + i}" for i in range(500))
+    packed = pack_context(history, "system", 300, results=results)
+    assert "results" in packed.truncated
+    sent = next(m["content"] for m in packed.messages if m["content"].startswith(RESULTS_PREFIX))
+    rows = sent[len(RESULTS_PREFIX):-len(TRUNCATION_MARKER)].split("\n")
+    assert rows == results.split("\n")[:len(rows)]
+    assert packed.tokens <= 300
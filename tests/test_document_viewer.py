@@ -0,0 +1,52 @@
+from src.components import document_viewer
+from src.components.document_viewer import _decode_template, _looks_like_utf16, agreement_file_names
+
+HTML = "<html><body><p>Supply Agreement between [SUPPLIER NAME] and [CUSTOMER NAME]</p></body></html>"
+
+
+def test_agreement_file_names_are_safe():
+    assert agreement_file_names(["tech outlet", "***"]) == {
+        "tech outlet": "Supply_Agreement_tech_outlet.pdf",
+        "***": "Supply_Agreement_Unknown.pdf",
+    }
+
+
+def test_agreement_file_names_never_collide():
+    sellers = ["a b", "a_b", "A_B", "***", "Unknown", "a b_2"]
+    file_names = agreement_file_names(sellers)
+    assert list(file_names) == sellers
+    assert len({name.lower() for name in file_names.values()}) == len(sellers)
+    assert file_names["a b"] == "Supply_Agreement_a_b.pdf"
+    assert file_names["a_b"] == "Supply_Agreement_a_b_2.pdf"
+    assert file_names["A_B"] == "Supply_Agreement_A_B_3.pdf"
+    assert file_names["a b_2"] == "Supply_Agreement_a_b_2_2.pdf"
+
+
+def test_looks_like_utf16():
+    assert _looks_like_utf16(b"\xff\xfe")
+    assert _looks_like_utf16(HTML.encode("utf-16-le"))
+    assert _looks_like_utf16(HTML.encode("utf-16-be"))
+    assert not _looks_like_utf16(HTML.encode("utf-8"))
+    assert not _looks_like_utf16(b"")
+
+
+def test_decode_template_reads_common_encodings(tmp_path):
+    text = HTML.replace("Agreement", "Agreement – café")
+    for encoding in ("utf-8", "utf-8-sig", "utf-16", "windows-1252"):
+        path = tmp_path / f"{encoding}.htm"
+        path.write_bytes(text.encode(encoding))
+        assert _decode_template(path) == text, encoding
+
+
+def test_decode_template_normalizes_newlines(tmp_path):
+    path = tmp_path / "template.htm"
+    path.write_bytes(b"<p>one</p>\r\n<p>two</p>\r<p>three</p>")
+    assert _decode_template(path) == "<p>one</p>\n<p>two</p>\n<p>three</p>"
+
+
+def test_decode_template_does_not_read_legacy_bytes_as_utf16(tmp_path, monkeypatch):
+    # Without a detected encoding, even-length windows-1252 bytes would also decode as UTF-16
+    monkeypatch.setattr(document_viewer, "_sniff_encoding", lambda data: None)
+    path = tmp_path / "template.htm"
+    path.write_bytes("<p>caf\xe9s</p>".encode("windows-1252"))
+    assert _decode_template(path) == "<p>caf\xe9s</p>"
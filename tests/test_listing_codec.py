@@ -0,0 +1,49 @@
+from src.components.context_packer import truncate_lines
+from src.components.listing_codec import COLUMNS, encode_listings, get_data_string
+
+
+def test_no_listings_encode_as_empty():
+    assert encode_listings([]) == ""
+    assert get_data_string(None) == ""
+    assert get_data_string([]) == ""
+
+
+def test_rows_follow_a_single_header():
+    encoded = encode_listings([
+        {"title": "Dell  Latitude\n7490", "price": "$1,234.50", "condition": "Used", "seller": "tech",
+         "rating": "4.80", "verified": True},
+    ])
+    assert encoded.split("\n") == [
+        "Listings (reviews column lists review ids):",
+        "|".join(COLUMNS),
+        "1|Dell Latitude 7490|1234.5|Used|tech|4.8|Y|",
+    ]
+
+
+def test_cells_cannot_break_the_table():
+    row = encode_listings([{"title": "a | b", "price": "N/A", "rating": None, "seller": "x|y"}]).split("\n")[-1]
+    assert row == "1|a / b|||x/y||N|"
+
+
+def test_name_is_used_when_there_is_no_title():
+    assert encode_listings([{"name": "Charger", "price": 20}]).split("\n")[-1].startswith("1|Charger|20|")
+
+
+def test_reviews_are_deduplicated_into_a_lookup_table_first():
+    encoded = encode_listings([
+        {"title": "A", "comments": ["Great  seller", "Fast shipping"]},
+        {"title": "B", "comments": "Great seller"},
+        {"title": "C", "comments": "Unknown"},
+    ])
+    lines = encoded.split("\n")
+    assert lines[:3] == ["Reviews (id=text):", "1=Great seller", "2=Fast shipping"]
+    assert [line.rsplit("|", 1)[-1] for line in lines[-3:]] == ["1,2", "1", ""]
+
+
+def test_truncating_by_whole_lines_only_drops_rows():
+    items = [{"title": f"Laptop {i}", "price": 100 + i, "comments": ["ok"]} for i in range(200)]
+    encoded = encode_listings(items)
+    kept = truncate_lines(encoded, 200, whole_lines=True)
+    assert kept.startswith("Reviews (id=text):\n1=ok\nListings")
+    rows = kept.split("\n")[4:-1]
+    assert rows and all(row.startswith(f"{i}|Laptop {i - 1}|") for i, row in enumerate(rows, start=1))
@@ -0,0 +1,66 @@
+from src.components.llm_cache import CompletionCache
+
+MESSAGES = [{"role": "user", "content": "cheapest laptop?"}]
+
+
+def test_make_key_ignores_param_order():
+    assert CompletionCache.make_key("m", MESSAGES, temperature=0.2, top_p=1) == CompletionCache.make_key(
+        "m", MESSAGES, top_p=1, temperature=0.2
+    )
+
+
+def test_make_key_changes_with_every_part_of_the_request():
+    key = CompletionCache.make_key("m", MESSAGES, temperature=0.2)
+    assert key != CompletionCache.make_key("other", MESSAGES, temperature=0.2)
+    assert key != CompletionCache.make_key("m", [{"role": "user", "content": "cheapest laptop"}], temperature=0.2)
+    assert key != CompletionCache.make_key("m", MESSAGES, tools=[{"name": "fetch_url"}], temperature=0.2)
+    assert key != CompletionCache.make_key("m", MESSAGES, temperature=0.3)
+
+
+def test_make_key_distinguishes_message_roles_and_non_ascii_text():
+    assert CompletionCache.make_key("m", [{"role": "user", "content": "x"}]) != CompletionCache.make_key(
+        "m", [{"role": "assistant", "content": "x"}]
+    )
+    assert CompletionCache.make_key("m", [{"role": "user", "content": "café"}]) != CompletionCache.make_key(
+        "m", [{"role": "user", "content": "cafe"}]
+    )
+
+
+def test_memory_only_cache_hits_and_misses():
+    cache = CompletionCache(path=None)
+    key = CompletionCache.make_key("m", MESSAGES)
+    assert cache.get(key) is None
+    cache.put(key, "m", "answer")
+    assert cache.get(key) == "answer"
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_empty_responses_are_not_cached():
+    cache = CompletionCache(path=None)
+    cache.put("key", "m", "")
+    assert cache.get("key") is None
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = tmp_path / "completions.sqlite"
+    CompletionCache(path=path).put("key", "m", "answer")
+    cache = CompletionCache(path=path)
+    assert cache.get("key") == "answer"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_trimmed_to_its_entry_limit(tmp_path):
+    path = tmp_path / "completions.sqlite"
+    cache = CompletionCache(path=path, disk_entries=2)
+    for i in range(3):
+        cache.put(f"key {i}", "m", f"answer {i}")
+    reopened = CompletionCache(path=path)
+    assert reopened.get("key 0") is None
+    assert reopened.get("key 2") == "answer 2"
+
+
+def test_expired_entries_are_not_read_from_disk(tmp_path):
+    path = tmp_path / "completions.sqlite"
+    CompletionCache(path=path).put("key", "m", "answer")
+    assert CompletionCache(path=path, ttl=-1).get("key") is None
@@ -0,0 +1,41 @@
+from src.components.conf_variables import ROUTER_LARGE_MODEL, ROUTER_MAX_SIMPLE_LISTINGS, ROUTER_SMALL_MODEL
+from src.components.model_router import ModelStats, prompt_features, route_prompt
+
+
+def test_short_lookup_goes_to_the_small_model():
+    decision = route_prompt("What is the price of the first one?", listing_count=3)
+    assert decision.model == ROUTER_SMALL_MODEL
+    assert decision.features["score"] == 0
+
+
+def test_comparison_keyword_goes_to_the_large_model():
+    decision = route_prompt("Compare the two laptops")
+    assert decision.model == ROUTER_LARGE_MODEL
+    assert decision.features["keywords"] == ["compare"]
+
+
+def test_keywords_match_word_prefixes_case_insensitively():
+    assert prompt_features("Help me NEGOTIATE a contract")["keywords"] == ["contract", "negotiat"]
+    assert prompt_features("show the evaluation")["keywords"] == ["evaluat"]
+
+
+def test_weak_signals_only_add_up_together():
+    assert route_prompt("Which is cheaper? Which ships faster?").model == ROUTER_SMALL_MODEL
+    decision = route_prompt("Which is cheaper? Which ships faster?", listing_count=ROUTER_MAX_SIMPLE_LISTINGS + 1)
+    assert decision.model == ROUTER_LARGE_MODEL
+
+
+def test_override_bypasses_routing():
+    decision = route_prompt("Compare everything", override="custom-model")
+    assert (decision.model, decision.reason) == ("custom-model", "override")
+
+
+def test_model_stats_summarizes_each_model():
+    stats = ModelStats(window=10)
+    stats.record("small", 1.0, prompt_tokens=100, completion_tokens=50)
+    stats.record("small", 3.0, prompt_tokens=300, completion_tokens=150)
+    (row,) = stats.stats()
+    assert row["model"] == "small"
+    assert row["requests"] == 2
+    assert row["p95_ms"] == 3000.0
+    assert (row["p50_ms"], row["avg_prompt_tokens"], row["tokens_per_s"]) == (1000.0, 200, 50.0)
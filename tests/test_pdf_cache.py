@@ -0,0 +1,63 @@
+import os
+
+from src.components.pdf_cache import PdfCache
+
+
+def age(cache, key, seconds):
+    path = cache._path(key)
+    mtime = path.stat().st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = PdfCache(None, memory_bytes=10)
+    cache.put("a", b"123456")
+    cache.put("b", b"123456")
+    assert cache.get("a") is None
+    assert cache.get("b") == b"123456"
+    assert cache.stats()["memory_entries"] == 1
+
+
+def test_pdf_larger_than_the_memory_tier_stays_on_disk(tmp_path):
+    cache = PdfCache(tmp_path, memory_bytes=4)
+    cache.put("a", b"123456")
+    assert cache.stats()["memory_entries"] == 0
+    assert cache.get("a") == b"123456"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_empty_pdfs_are_not_cached(tmp_path):
+    cache = PdfCache(tmp_path)
+    cache.put("a", b"")
+    assert cache.get("a") is None
+    assert not list(tmp_path.glob("*.pdf"))
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path):
+    PdfCache(tmp_path).put("a", b"pdf")
+    cache = PdfCache(tmp_path)
+    assert cache.get("a") == b"pdf"
+    assert cache.get("a") == b"pdf"
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0, 1.0)
+
+
+def test_disk_tier_is_trimmed_oldest_first(tmp_path):
+    cache = PdfCache(tmp_path, disk_bytes=12)
+    cache.put("old", b"123456")
+    age(cache, "old", 60)
+    cache.put("new", b"123456")
+    age(cache, "new", 30)
+    cache.put("newest", b"123456")
+    assert sorted(path.stem for path in tmp_path.glob("*.pdf")) == ["new", "newest"]
+
+
+def test_disk_hit_counts_as_a_use_when_trimming(tmp_path):
+    cache = PdfCache(tmp_path, disk_bytes=12)
+    cache.put("old", b"123456")
+    age(cache, "old", 60)
+    cache.put("new", b"123456")
+    age(cache, "new", 30)
+    assert PdfCache(tmp_path).get("old") == b"123456"
+    cache.put("newest", b"123456")
+    assert sorted(path.stem for path in tmp_path.glob("*.pdf")) == ["newest", "old"]
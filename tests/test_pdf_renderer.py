@@ -0,0 +1,191 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.components import pdf_renderer
+from src.components.pdf_cache import PdfCache
+from src.components.pdf_renderer import PdfRenderer
+
+
+try:
+    import weasyprint
+except (ImportError, OSError):
+    # WeasyPrint raises OSError when its system libraries (Pango) are missing
+    weasyprint = None
+
+needs_weasyprint = pytest.mark.skipif(weasyprint is None, reason="WeasyPrint system libraries are not installed")
+
+
+class ThreadRenderer(PdfRenderer):
+    """Runs jobs on a thread so tests can stub render_pdf."""
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2)
+        return self._executor
+
+
+class BrokenPool:
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("a worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    renderer = ThreadRenderer(max_workers=1, cache=PdfCache(tmp_path))
+    yield renderer
+    renderer._reset_pool()
+
+
+def wait_for(renderer, key):
+    for _ in range(500):
+        if not renderer.is_running(key):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{key} is still running")
+
+
+def test_finished_job_is_cached(renderer, monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "render_pdf", lambda html, *args: html.encode("utf-8"))
+    key = renderer.submit("<p>pdf</p>", key="doc")
+    wait_for(renderer, key)
+    assert renderer.result(key) == b"<p>pdf</p>"
+    assert renderer.error(key) is None
+
+
+def test_same_key_reuses_the_running_job(renderer, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def render(html, *args):
+        calls.append(html)
+        release.wait(5)
+        return b"pdf"
+
+    monkeypatch.setattr(pdf_renderer, "render_pdf", render)
+    assert renderer.submit("<p>a</p>") == renderer.submit("<p>a</p>")
+    assert renderer.stats()["running"] == 1
+    release.set()
+    wait_for(renderer, renderer.submit("<p>a</p>"))
+    assert calls == ["<p>a</p>"]
+
+
+def test_cached_document_is_not_rendered_again(renderer, monkeypatch):
+    renderer.cache.put("doc", b"pdf")
+    monkeypatch.setattr(pdf_renderer, "render_pdf", lambda *args: pytest.fail("rendered a cached document"))
+    assert renderer.submit("<p>a</p>", key="doc") == "doc"
+    assert not renderer.is_running("doc")
+
+
+def test_failed_job_records_its_error_until_resubmitted(renderer, monkeypatch):
+    def fail(*args):
+        raise ValueError("bad markup")
+
+    monkeypatch.setattr(pdf_renderer, "render_pdf", fail)
+    key = renderer.submit("<p>a</p>", key="doc")
+    wait_for(renderer, key)
+    assert renderer.error(key) == "bad markup"
+    assert renderer.result(key) is None
+    assert renderer.stats()["failed"] == 1
+
+    monkeypatch.setattr(pdf_renderer, "render_pdf", lambda *args: b"pdf")
+    renderer.submit("<p>a</p>", key="doc")
+    wait_for(renderer, key)
+    assert renderer.error(key) is None
+    assert renderer.result(key) == b"pdf"
+
+
+def test_broken_pool_is_restarted(renderer, monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "render_pdf", lambda *args: b"pdf")
+    broken = renderer._executor = BrokenPool()
+    key = renderer.submit("<p>a</p>")
+    wait_for(renderer, key)
+    assert broken.shut_down
+    assert renderer.result(key) == b"pdf"
+
+
+def test_polling_a_running_job_does_not_count_as_a_cache_miss(renderer, monkeypatch):
+    release = threading.Event()
+
+    def render(*args):
+        release.wait(5)
+        return b"pdf"
+
+    monkeypatch.setattr(pdf_renderer, "render_pdf", render)
+    key = renderer.submit("<p>a</p>", key="doc")
+    misses = renderer.stats()["misses"]
+    for _ in range(5):
+        assert renderer.result(key) is None
+    release.set()
+    wait_for(renderer, key)
+    assert renderer.result(key) == b"pdf"
+    stats = renderer.stats()
+    assert (stats["misses"], stats["memory_hits"]) == (misses, 1)
+
+
+@needs_weasyprint
+def test_render_context_parses_a_shared_stylesheet_once():
+    context = pdf_renderer.RenderContext()
+    assert context.stylesheet("p{color:red}") is context.stylesheet("p{color:red}")
+    assert context.stylesheet("p{color:red}") is not context.stylesheet("p{color:blue}")
+    assert context.render("<p>pdf</p>", stylesheets=["p{color:red}"]).startswith(b"%PDF")
+
+
+def test_failed_render_context_reports_the_original_error_every_time(monkeypatch):
+    class FailingContext:
+        created = 0
+
+        def __init__(self):
+            FailingContext.created += 1
+            raise OSError("cannot load library 'libpango'")
+
+    monkeypatch.setattr(pdf_renderer, "RenderContext", FailingContext)
+    monkeypatch.setattr(pdf_renderer, "_render_context", None)
+    monkeypatch.setattr(pdf_renderer, "_render_context_error", None)
+    for _ in range(2):
+        with pytest.raises(OSError, match="libpango"):
+            pdf_renderer.get_render_context()
+    assert FailingContext.created == 1
+
+
+class PagesContext(pdf_renderer.RenderContext):
+    """Lays out each document as blank pages as wide as its number, so merged pages can be told apart."""
+
+    def __init__(self):
+        self.rendered = []
+
+    def _write_pdf(self, html, base_url, stylesheets):
+        from pypdf import PdfWriter
+
+        self.rendered.append((html, base_url, tuple(stylesheets)))
+        writer = PdfWriter()
+        for _ in range(2):
+            writer.add_blank_page(width=int(html), height=100)
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+
+def test_appendices_are_merged_after_the_main_document_in_order():
+    from pypdf import PdfReader
+
+    context = PagesContext()
+    pdf = context.render("100", "base", ["css"], appendices=["200", "300"])
+    widths = [int(page.mediabox.width) for page in PdfReader(io.BytesIO(pdf)).pages]
+    assert widths == [100, 100, 200, 200, 300, 300]
+    assert context.rendered == [("100", "base", ("css",)), ("200", "base", ("css",)), ("300", "base", ("css",))]
+
+
+def test_document_without_appendices_is_returned_as_laid_out():
+    context = PagesContext()
+    assert context.render("100") == context._write_pdf("100", None, ())
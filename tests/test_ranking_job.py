@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from src.components import ranking_job
+from src.components.ranking_job import RankingJobs, rank_listings, result_set_key
+
+
+def listings(count):
+    return [{"id": i, "title": f"Laptop {i}", "price": 100 + 10 * i, "condition": "Used"} for i in range(count)]
+
+
+def wait_for(jobs, key):
+    for _ in range(500):
+        if not jobs.is_running(key):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{key} is still running")
+
+
+@pytest.mark.parametrize(
+    "count, tiers",
+    [
+        (1, ["Gold"]),
+        (3, ["Gold", "Silver", "Bronze"]),
+        (10, ["Gold"] * 2 + ["Silver"] * 3 + ["Bronze"] * 5),
+        (11, ["Gold"] * 3 + ["Silver"] * 4 + ["Bronze"] * 4),
+    ],
+)
+def test_tier_boundaries(count, tiers):
+    assert [entry["tier"] for entry in rank_listings(listings(count))] == tiers
+
+
+def test_ranking_is_best_first():
+    ranked = rank_listings(listings(5))
+    assert [entry["id"] for entry in ranked] == [0, 1, 2, 3, 4]
+    assert [entry["rank"] for entry in ranked] == [1, 2, 3, 4, 5]
+    assert ranked[0]["cost"] == 1.0 and ranked[-1]["cost"] == 0.0
+
+
+def test_criteria_reward_verified_sellers_good_reviews_and_new_condition():
+    plain = {"title": "A", "price": 100, "condition": "Used", "rating": 4}
+    better = {**plain, "title": "B", "verified": True, "condition": "New", "comments": ["Great seller, fast shipping"]}
+    ranked = rank_listings([plain, better])
+    assert [entry["title"] for entry in ranked] == ["B", "A"]
+    assert (ranked[0]["reliability"], ranked[0]["specifications"], ranked[0]["delivery"]) == (1.0, 1.0, 1.0)
+
+
+def test_no_listings_rank_as_empty():
+    assert rank_listings([]) == []
+
+
+def test_result_set_key_depends_on_ranking_fields_and_order():
+    items = listings(3)
+    assert result_set_key(items) == result_set_key([dict(item, image="other.jpg") for item in items])
+    assert result_set_key(items) != result_set_key(items[::-1])
+    assert result_set_key(items) != result_set_key([dict(items[0], price=1), *items[1:]])
+
+
+def test_same_result_set_is_ranked_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ranking_job, "rank_listings", lambda items: calls.append(items) or [])
+    jobs = RankingJobs(max_workers=1)
+    key = jobs.submit(listings(3))
+    wait_for(jobs, key)
+    assert jobs.submit(listings(3)) == key
+    assert jobs.result(key) == []
+    assert len(calls) == 1
+
+
+def test_failed_job_is_restarted_when_resubmitted(monkeypatch):
+    def fail(items):
+        raise ValueError("bad price")
+
+    monkeypatch.setattr(ranking_job, "rank_listings", fail)
+    jobs = RankingJobs(max_workers=1)
+    key = jobs.submit(listings(3))
+    wait_for(jobs, key)
+    assert jobs.error(key) == "bad price"
+    assert jobs.result(key) is None
+
+    monkeypatch.setattr(ranking_job, "rank_listings", lambda items: [{"id": 0}])
+    assert jobs.submit(listings(3)) == key
+    wait_for(jobs, key)
+    assert jobs.error(key) is None
+    assert jobs.result(key) == [{"id": 0}]
+
+
+def test_evicted_ranking_is_recomputed():
+    jobs = RankingJobs(max_workers=1, entries=1)
+    first = jobs.submit(listings(2))
+    wait_for(jobs, first)
+    second = jobs.submit(listings(3))
+    wait_for(jobs, second)
+    assert jobs.result(first) is None
+
+    assert jobs.submit(listings(2)) == first
+    wait_for(jobs, first)
+    assert len(jobs.result(first)) == 2
@@ -0,0 +1,66 @@
+import pytest
+
+from src.components.conf_variables import USD_TO_AED
+from src.components.retrieval import BM25Index, parse_filters, retrieve_listings, tokenize
+
+ITEMS = [
+    {"title": "Apple iPhone 12 64GB", "price": "350.00", "condition": "Used", "rating": 4.2, "seller": "phones"},
+    {"title": "Dell Latitude 7490 Laptop", "price": "220.00", "condition": "Refurbished", "rating": 4.8, "seller": "tech"},
+    {"title": "Lenovo ThinkPad T480 Laptop", "price": "310.00", "condition": "Used", "rating": 3.9, "seller": "tech"},
+    {"title": "USB-C Charger 65W", "price": "19.99", "condition": "New", "rating": 4.5, "seller": "parts"},
+]
+
+
+def test_parse_filters_reads_price_bounds():
+    filters = parse_filters("Laptops under $1,200 but over 50 dollars")
+    assert (filters.max_price, filters.min_price) == (1200.0, 50.0)
+
+
+def test_parse_filters_reads_unmarked_prices_as_aed():
+    assert parse_filters("laptops under 1000").max_price == pytest.approx(1000 / USD_TO_AED)
+    assert parse_filters("above AED 365").min_price == pytest.approx(100)
+    assert parse_filters("at most 730 dirhams").max_price == pytest.approx(200)
+    assert parse_filters("under 300 usd").max_price == 300
+
+
+def test_parse_filters_treats_rated_above_as_a_rating():
+    filters = parse_filters("something rated above 4")
+    assert filters.min_rating == 4.0
+    assert filters.min_price is None
+
+
+def test_parse_filters_reads_star_ratings_and_conditions():
+    filters = parse_filters("4.5+ stars refurbished or used, nothing new")
+    assert filters.min_rating == 4.5
+    assert filters.conditions == {"refurbished", "used"}
+
+
+def test_parse_filters_is_empty_without_constraints():
+    assert not parse_filters("what do you think of these?")
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("Show me the best Laptops with glass") == ["laptop", "glass"]
+
+
+def test_bm25_ranks_matching_listings_first():
+    scores = BM25Index(ITEMS).scores("thinkpad laptop")
+    assert max(range(len(ITEMS)), key=scores.__getitem__) == 2
+    assert scores[0] == scores[3] == 0.0
+
+
+def test_bm25_of_no_listings_scores_nothing():
+    assert BM25Index([]).scores("laptop") == []
+
+
+def test_retrieve_listings_applies_filters_before_ranking():
+    assert retrieve_listings("laptop under $250", ITEMS) == [ITEMS[1], ITEMS[3]]
+    assert retrieve_listings("laptop under 1000", ITEMS) == [ITEMS[1], ITEMS[3]]
+
+
+def test_retrieve_listings_ranks_everything_when_no_listing_passes_the_filters():
+    assert retrieve_listings("laptop under $5", ITEMS, k=2) == [ITEMS[1], ITEMS[2]]
+
+
+def test_retrieve_listings_keeps_unmatched_listings_in_their_original_order():
+    assert retrieve_listings("charger", ITEMS, k=3) == [ITEMS[3], ITEMS[0], ITEMS[1]]
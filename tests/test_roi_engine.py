@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from src.calculations.roi_engine import AI_SPEEDUP, BAND_PERCENTILES, roi_grid, roi_metrics, sensitivity_bands
+
+
+def test_roi_metrics_of_scalars():
+    metrics = roi_metrics(100000, 52, 10)
+    assert float(metrics["cost_savings"]) == 25000
+    assert float(metrics["monetary_roi"]) == 25
+    assert float(metrics["ai_time"]) == 1
+    assert float(metrics["total_time_saved"]) == 510
+    assert float(metrics["time_efficiency_percentage"]) == AI_SPEEDUP * 100
+
+
+def test_roi_metrics_of_zero_inputs():
+    metrics = roi_metrics(0, 0, 10)
+    assert float(metrics["monetary_roi"]) == 0
+    assert float(metrics["time_efficiency_percentage"]) == 0
+
+
+def test_roi_grid_matches_roi_metrics_for_every_combination():
+    grid = roi_grid((1000.0, 2000.0), (5.0, 10.0, 20.0), (1.0, 12.0))
+    assert {values.shape for values in grid.values()} == {(2, 3, 2)}
+    assert grid["total_time_saved"][1, 2, 1] == pytest.approx(float(roi_metrics(2000, 20, 12)["total_time_saved"]))
+    assert np.all(grid["monetary_roi"] == 25)
+
+
+def test_roi_grid_results_are_read_only():
+    grid = roi_grid((1000.0,), (5.0,), (1.0,))
+    with pytest.raises(ValueError):
+        grid["cost_savings"][0, 0, 0] = 0
+
+
+def test_sensitivity_bands_are_ordered_around_the_estimate():
+    bands = sensitivity_bands(100000, 40, 12, samples=2000)
+    low, mid, high = (bands["cost_savings"][p] for p in BAND_PERCENTILES)
+    assert low < mid < high
+    assert mid == pytest.approx(25000, rel=0.05)
+
+
+def test_sensitivity_bands_without_spread_are_exact():
+    bands = sensitivity_bands(100000, 40, 12, spread=0, samples=100)
+    assert set(bands["cost_savings"].values()) == {25000}
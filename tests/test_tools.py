@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+
+from src.components.tools import ToolExecutor
+
+
+def call(name, arguments=None, call_id=None):
+    return {
+        "id": call_id or name,
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments or {})},
+    }
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return f"slept {seconds}"
+
+
+def fail():
+    raise RuntimeError("connection reset")
+
+
+def test_results_come_back_in_call_order():
+    executor = ToolExecutor(functions={"sleep": sleep, "info": lambda: {"ok": True}})
+    results = executor.run([call("sleep", {"seconds": 0.1}, "a"), call("info", call_id="b")])
+    assert results == [
+        {"role": "tool", "tool_call_id": "a", "content": "slept 0.1"},
+        {"role": "tool", "tool_call_id": "b", "content": '{"ok": true}'},
+    ]
+
+
+def test_calls_run_concurrently():
+    executor = ToolExecutor(max_workers=4, functions={"sleep": sleep})
+    start = time.monotonic()
+    executor.run([call("sleep", {"seconds": 0.3}, str(i)) for i in range(4)])
+    assert time.monotonic() - start < 0.9
+
+
+def test_failing_and_unknown_tools_report_errors():
+    executor = ToolExecutor(functions={"fail": fail})
+    bad_arguments = {"id": "c", "type": "function", "function": {"name": "fail", "arguments": "{not json"}}
+    contents = [result["content"] for result in executor.run([call("fail"), call("missing"), bad_arguments])]
+    assert contents[0] == "Error: fail failed: connection reset"
+    assert contents[1] == "Error: unknown tool 'missing'"
+    assert contents[2].startswith("Error: invalid arguments for fail:")
+
+
+def test_call_running_past_its_timeout_reports_a_timeout():
+    executor = ToolExecutor(functions={"sleep": sleep})
+    start = time.monotonic()
+    (result,) = executor.run([call("sleep", {"seconds": 1.0})], timeout=0.2)
+    assert result["content"] == "Error: sleep timed out after 0.2 seconds"
+    assert time.monotonic() - start < 0.8
+
+
+def test_timeout_starts_when_a_queued_call_runs():
+    executor = ToolExecutor(max_workers=1, functions={"sleep": sleep})
+    results = executor.run([call("sleep", {"seconds": 0.3}, str(i)) for i in range(2)], timeout=0.5, queue_timeout=5)
+    assert [result["content"] for result in results] == ["slept 0.3", "slept 0.3"]
+
+
+def test_call_waiting_past_the_queue_timeout_is_not_run():
+    ran = threading.Event()
+    executor = ToolExecutor(max_workers=1, functions={"sleep": sleep, "mark": ran.set})
+    results = executor.run([call("sleep", {"seconds": 0.5}), call("mark")], timeout=2, queue_timeout=0.1)
+    assert results[0]["content"] == "slept 0.5"
+    assert results[1]["content"] == "Error: mark could not be run, the tool workers are busy"
+    time.sleep(0.2)
+    assert not ran.is_set()
@@ -0,0 +1,129 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from src.components.conf_variables import SUMMARY_KEEP_RECENT_MESSAGES
+from src.components.conversation import ConversationLog
+from src.components.summarizer import ConversationSummarizer
+from src.components.transcripts import TranscriptStore
+
+TOKEN = "secret-token"
+
+
+def idle(path, session_id, seconds):
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.execute("UPDATE sessions SET updated = ? WHERE session_id = ?", (time.time() - seconds, session_id))
+
+
+def test_session_resumes_only_with_its_token(tmp_path):
+    store = TranscriptStore(tmp_path / "chat.sqlite3")
+    store.create_session("chat", TOKEN)
+    assert store.verify("chat", TOKEN)
+    assert not store.verify("chat", "someone-else's-token")
+    assert not store.verify("chat", "")
+    assert not store.verify("other-chat", TOKEN)
+
+
+def test_only_a_hash_of_the_token_is_stored(tmp_path):
+    path = tmp_path / "chat.sqlite3"
+    TranscriptStore(path).create_session("chat", TOKEN)
+    assert TOKEN.encode() not in path.read_bytes()
+
+
+def test_resumed_log_has_the_stored_messages_and_summary(tmp_path):
+    store = TranscriptStore(tmp_path / "chat.sqlite3")
+    store.create_session("chat", TOKEN)
+    log = ConversationLog(session_id="chat", store=store)
+    log.append({"role": "user", "content": "Find laptops"})
+    log.append({"role": "assistant", "content": "Here are three."})
+    store.save_summary("chat", 1, "- user: Find laptops")
+
+    resumed = ConversationLog.resume("chat", TranscriptStore(tmp_path / "chat.sqlite3"))
+    assert list(resumed) == list(log)
+    assert resumed.total_tokens == log.total_tokens
+    assert (resumed.summary, resumed.summarized_upto) == ("- user: Find laptops", 1)
+
+
+def test_idle_sessions_are_pruned_with_their_messages(tmp_path):
+    path = tmp_path / "chat.sqlite3"
+    store = TranscriptStore(path, retention_days=1)
+    for session_id in ("old", "recent"):
+        store.create_session(session_id, TOKEN)
+        store.append(session_id, 0, {"role": "user", "content": "hi"}, 2)
+        store.save_summary(session_id, 1, "- user: hi")
+    idle(path, "old", 2 * 24 * 3600)
+
+    store.prune()
+    assert not store.verify("old", TOKEN)
+    assert store.load("old") == ([], None)
+    assert store.verify("recent", TOKEN)
+    assert store.load("recent")[0] == [({"role": "user", "content": "hi"}, 2)]
+
+
+def test_sessions_beyond_the_limit_are_pruned_oldest_first(tmp_path):
+    path = tmp_path / "chat.sqlite3"
+    store = TranscriptStore(path, max_sessions=2)
+    for age, session_id in enumerate(("newest", "newer", "oldest")):
+        store.create_session(session_id, TOKEN)
+        idle(path, session_id, age * 60)
+
+    store.prune()
+    assert [store.verify(session_id, TOKEN) for session_id in ("newest", "newer", "oldest")] == [True, True, False]
+
+
+def test_messages_without_a_session_are_pruned(tmp_path):
+    store = TranscriptStore(tmp_path / "chat.sqlite3")
+    store.append("unregistered", 0, {"role": "user", "content": "hi"}, 2)
+    store.prune()
+    assert store.load("unregistered") == ([], None)
+
+
+def test_compaction_falls_back_to_an_extractive_summary(tmp_path, monkeypatch):
+    store = TranscriptStore(tmp_path / "chat.sqlite3")
+    store.create_session("chat", TOKEN)
+    log = ConversationLog(session_id="chat", store=store)
+    for i in range(2 * SUMMARY_KEEP_RECENT_MESSAGES):
+        role = "user" if i % 2 == 0 else "assistant"
+        log.append({"role": role, "content": f"Turn {i} is about laptops. " + "detail " * 600})
+
+    summarizer = ConversationSummarizer(max_workers=1)
+
+    def unavailable(previous, messages):
+        raise ConnectionError("model unavailable")
+
+    monkeypatch.setattr(summarizer, "_model_summary", unavailable)
+    assert summarizer.maybe_compact(log)
+    for _ in range(500):
+        if store.load("chat")[1]:
+            break
+        time.sleep(0.01)
+
+    upto = log.summarized_upto
+    assert 0 < upto <= len(log) - SUMMARY_KEEP_RECENT_MESSAGES
+    assert log.summary.split("\n")[0] == "- user: Turn 0 is about laptops."
+    assert store.load("chat")[1] == (log.summary, upto)
+
+
+def init_chat_app():
+    from src.components.chatbot import init_chat_state
+
+    init_chat_state()
+
+
+def test_chat_id_without_this_browser_s_token_starts_a_new_chat(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    from src.components.services import get_services
+
+    store = TranscriptStore(tmp_path / "chat.sqlite3")
+    store.create_session("someone-elses-chat", TOKEN)
+    store.append("someone-elses-chat", 0, {"role": "user", "content": "my budget is 5000"}, 6)
+    monkeypatch.setattr(get_services(), "_transcript_store", store)
+
+    app = AppTest.from_function(init_chat_app)
+    app.query_params["chat"] = "someone-elses-chat"
+    app.run()
+    assert not app.exception
+    assert app.query_params["chat"] != ["someone-elses-chat"]
+    assert len(app.session_state["messages"]) == 0
+    assert store.verify("someone-elses-chat", TOKEN)
@@ -0,0 +1,98 @@
+import httpx
+
+from src.components.context_packer import TRUNCATION_MARKER, count_tokens
+from src.components.web_fetch import PageFetcher, extract_text
+
+PAGE = (
+    b"<html><head><title>Dell Latitude 7490</title><style>p{color:red}</style></head>"
+    b"<body><script>track()</script><h1>Specs</h1><p>Intel   Core i5</p><ul><li>8GB RAM</li><li>256GB SSD</li></ul>"
+    b"</body></html>"
+)
+
+
+class Server:
+    """A MockTransport handler that records requests and answers with `respond`."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        return self.respond(request)
+
+
+def fetcher(respond, **kwargs):
+    server = Server(respond)
+    return PageFetcher(client=httpx.Client(transport=httpx.MockTransport(server)), **kwargs), server
+
+
+def html(request):
+    return httpx.Response(200, content=PAGE, headers={"content-type": "text/html; charset=utf-8"})
+
+
+def test_extract_text_keeps_the_title_and_one_block_per_line():
+    assert extract_text(PAGE, "text/html") == "Dell Latitude 7490\nSpecs\nIntel Core i5\n8GB RAM\n256GB SSD"
+
+
+def test_extract_text_decodes_plain_text_as_is():
+    assert extract_text("  caf\xe9 <b>  ".encode("latin-1"), "text/plain", "latin-1") == "caf\xe9 <b>"
+
+
+def test_fetch_returns_extracted_text():
+    page_fetcher, _ = fetcher(html)
+    assert page_fetcher.fetch("https://example.com/") == extract_text(PAGE, "text/html")
+
+
+def test_body_is_read_only_up_to_the_byte_cap():
+    sent = []
+
+    def chunks():
+        for i in range(100):
+            sent.append(i)
+            yield b"x" * 1000
+
+    page_fetcher, _ = fetcher(lambda request: httpx.Response(200, content=chunks()), max_bytes=2500)
+    assert page_fetcher.fetch("https://example.com/big.txt") == "x" * 2500
+    assert len(sent) < 10
+
+
+def test_long_single_line_page_is_truncated_to_the_token_budget():
+    body = b"word " * 5000
+    page_fetcher, _ = fetcher(lambda request: httpx.Response(200, content=body), max_tokens=100)
+    text = page_fetcher.fetch("https://example.com/long.txt")
+    assert text.startswith("word word")
+    assert text.endswith(TRUNCATION_MARKER)
+    assert count_tokens(text) <= 100
+
+
+def test_fresh_page_is_served_from_the_cache():
+    page_fetcher, server = fetcher(html, ttl=60)
+    first = page_fetcher.fetch("https://example.com/")
+    assert page_fetcher.fetch("https://example.com/") == first
+    assert len(server.requests) == 1
+    assert page_fetcher.stats()["hits"] == 1
+
+
+def test_stale_page_is_revalidated_and_kept_on_304():
+    def respond(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, content=PAGE, headers={"etag": '"v1"', "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        )
+
+    page_fetcher, server = fetcher(respond, ttl=0)
+    first = page_fetcher.fetch("https://example.com/")
+    assert page_fetcher.fetch("https://example.com/") == first
+    assert server.requests[1].headers["if-modified-since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    stats = page_fetcher.stats()
+    assert (stats["misses"], stats["revalidated"]) == (1, 1)
+
+
+def test_stale_page_is_replaced_when_it_changed():
+    versions = iter((b"<p>old</p>", b"<p>new</p>"))
+    page_fetcher, server = fetcher(lambda request: httpx.Response(200, content=next(versions)), ttl=0)
+    assert page_fetcher.fetch("https://example.com/") == "old"
+    assert page_fetcher.fetch("https://example.com/") == "new"
+    assert "if-none-match" not in server.requests[1].headers